@@ -25,6 +25,13 @@ DYNAMODB_MEMORY_TABLE = os.getenv('DYNAMODB_MEMORY_TABLE', 'axis-institutional-m
 BEDROCK_MODEL_ID = os.getenv('BEDROCK_MODEL_ID', 'anthropic.claude-3-5-sonnet-20241022-v2:0')
 BEDROCK_BACKUP_MODEL_ID = os.getenv('BEDROCK_BACKUP_MODEL_ID', 'anthropic.claude-3-sonnet-20240229-v1:0')
 BEDROCK_REGION = os.getenv('BEDROCK_REGION', AWS_REGION)
+# Regions Bedrock calls are spread over, in order of preference (comma-separated); each has its
+# own quota. Calls go mostly to the fastest healthy region and fail over on regional throttling.
+BEDROCK_REGIONS = [r.strip() for r in os.getenv('BEDROCK_REGIONS', BEDROCK_REGION).split(',') if r.strip()]
+BEDROCK_REGION_EWMA_ALPHA = float(os.getenv('BEDROCK_REGION_EWMA_ALPHA', '0.2'))
+BEDROCK_REGION_THROTTLE_COOLDOWN = float(os.getenv('BEDROCK_REGION_THROTTLE_COOLDOWN', '15'))
+# Faster, cheaper tier for mechanical stages (see BEDROCK_STAGE_ROUTING)
+BEDROCK_FAST_MODEL_ID = os.getenv('BEDROCK_FAST_MODEL_ID', 'anthropic.claude-3-5-haiku-20241022-v1:0')
 
 # Application Configuration
 APP_ENV = os.getenv('APP_ENV', 'production')
@@ -46,9 +53,112 @@ BEDROCK_MAX_TOKENS_QUESTIONS = int(os.getenv('BEDROCK_MAX_TOKENS_QUESTIONS', '40
 BEDROCK_MAX_TOKENS_ASSEMBLY = int(os.getenv('BEDROCK_MAX_TOKENS_ASSEMBLY', '6000'))
 BEDROCK_MAX_TOKENS_DEFAULT = int(os.getenv('BEDROCK_MAX_TOKENS_DEFAULT', '2000'))
 
+# Per-stage model routing: the model each pipeline stage calls, the models tried after it, and
+# its output token limit. Gaps and schema are extraction-style stages and run on the fast tier;
+# synthesis and assembly stay on the strong model. The BEDROCK_STAGE_ROUTING env var (JSON)
+# overrides entries, e.g. {"gaps": {"model": "anthropic.claude-3-5-sonnet-20241022-v2:0"}}.
+_STRONG_ROUTE = {'model': BEDROCK_MODEL_ID, 'fallbacks': [BEDROCK_BACKUP_MODEL_ID]}
+_FAST_ROUTE = {'model': BEDROCK_FAST_MODEL_ID, 'fallbacks': [BEDROCK_MODEL_ID]}
+BEDROCK_STAGE_ROUTING = {
+    'synthesis': dict(_STRONG_ROUTE, max_tokens=BEDROCK_MAX_TOKENS_SYNTHESIS),
+    'texas': dict(_STRONG_ROUTE, max_tokens=BEDROCK_MAX_TOKENS_DEFAULT),
+    'questions': dict(_STRONG_ROUTE, max_tokens=BEDROCK_MAX_TOKENS_QUESTIONS),
+    'gaps': dict(_FAST_ROUTE, max_tokens=BEDROCK_MAX_TOKENS_DEFAULT),
+    'assembly': dict(_STRONG_ROUTE, max_tokens=BEDROCK_MAX_TOKENS_ASSEMBLY),
+    'schema': dict(_FAST_ROUTE, max_tokens=BEDROCK_MAX_TOKENS_DEFAULT),
+    'express': dict(_STRONG_ROUTE, max_tokens=3500),
+}
+BEDROCK_STAGE_ROUTING_OVERRIDES = os.getenv('BEDROCK_STAGE_ROUTING', '')
+
+# On-demand prices in USD per 1,000 tokens, used to report the cost of a routing
+BEDROCK_MODEL_PRICES = {
+    'anthropic.claude-3-5-sonnet-20241022-v2:0': {'input': 0.003, 'output': 0.015},
+    'anthropic.claude-3-sonnet-20240229-v1:0': {'input': 0.003, 'output': 0.015},
+    'anthropic.claude-3-5-haiku-20241022-v1:0': {'input': 0.0008, 'output': 0.004},
+}
+
+# Bedrock Response Cache
+BEDROCK_CACHE_ENABLED = os.getenv('BEDROCK_CACHE_ENABLED', 'true').lower() == 'true'
+BEDROCK_CACHE_MAX_ENTRIES = int(os.getenv('BEDROCK_CACHE_MAX_ENTRIES', '256'))
+BEDROCK_CACHE_TTL_SECONDS = int(os.getenv('BEDROCK_CACHE_TTL_SECONDS', '604800'))
+BEDROCK_CACHE_MAX_TEMPERATURE = float(os.getenv('BEDROCK_CACHE_MAX_TEMPERATURE', '0.2'))
+BEDROCK_CACHE_S3_PREFIX = os.getenv('BEDROCK_CACHE_S3_PREFIX', '_cache/bedrock/')
+
+# Bedrock prompt caching: shared context prefixes are marked as cache checkpoints
+BEDROCK_PROMPT_CACHING = os.getenv('BEDROCK_PROMPT_CACHING', 'true').lower() == 'true'
+
+# Bedrock retries: throttling and 5xx errors back off exponentially (full jitter) on the same
+# model; a model with BEDROCK_BREAKER_THRESHOLD consecutive 5xx/timeouts is skipped for the cooldown
+BEDROCK_MAX_ATTEMPTS = int(os.getenv('BEDROCK_MAX_ATTEMPTS', '5'))
+BEDROCK_RETRY_BASE_DELAY = float(os.getenv('BEDROCK_RETRY_BASE_DELAY', '0.5'))
+BEDROCK_RETRY_MAX_DELAY = float(os.getenv('BEDROCK_RETRY_MAX_DELAY', '8'))
+BEDROCK_RETRY_MAX_ELAPSED = float(os.getenv('BEDROCK_RETRY_MAX_ELAPSED', '45'))
+BEDROCK_BREAKER_THRESHOLD = int(os.getenv('BEDROCK_BREAKER_THRESHOLD', '5'))
+BEDROCK_BREAKER_COOLDOWN = float(os.getenv('BEDROCK_BREAKER_COOLDOWN', '60'))
+
+# Shared Bedrock rate limiting: per-model request and token buckets in DynamoDB, leased
+# locally in slices (BEDROCK_RATE_LIMIT_LEASE_FRACTION of a bucket) to keep round trips low
+BEDROCK_RATE_LIMIT_ENABLED = os.getenv('BEDROCK_RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+BEDROCK_RATE_LIMIT_TABLE = os.getenv('BEDROCK_RATE_LIMIT_TABLE', 'axis-rate-limits')
+BEDROCK_DEFAULT_RATE_LIMIT = {
+    'requests_per_minute': int(os.getenv('BEDROCK_REQUESTS_PER_MINUTE', '50')),
+    'tokens_per_minute': int(os.getenv('BEDROCK_TOKENS_PER_MINUTE', '200000')),
+}
+BEDROCK_RATE_LIMITS = {
+    BEDROCK_MODEL_ID: BEDROCK_DEFAULT_RATE_LIMIT,
+    BEDROCK_BACKUP_MODEL_ID: {
+        'requests_per_minute': int(os.getenv('BEDROCK_BACKUP_REQUESTS_PER_MINUTE', '50')),
+        'tokens_per_minute': int(os.getenv('BEDROCK_BACKUP_TOKENS_PER_MINUTE', '200000')),
+    },
+    BEDROCK_FAST_MODEL_ID: {
+        'requests_per_minute': int(os.getenv('BEDROCK_FAST_REQUESTS_PER_MINUTE', '50')),
+        'tokens_per_minute': int(os.getenv('BEDROCK_FAST_TOKENS_PER_MINUTE', '200000')),
+    },
+}
+BEDROCK_RATE_LIMIT_LEASE_FRACTION = float(os.getenv('BEDROCK_RATE_LIMIT_LEASE_FRACTION', '0.1'))
+BEDROCK_RATE_LIMIT_LEASE_SECONDS = float(os.getenv('BEDROCK_RATE_LIMIT_LEASE_SECONDS', '10'))
+BEDROCK_RATE_LIMIT_MAX_WAIT = float(os.getenv('BEDROCK_RATE_LIMIT_MAX_WAIT', '30'))
+
+# Hedged requests: when a call outlasts the rolling p90 latency of its stage, the same request
+# is sent to the primary model in the next region (or to the backup model with a single region)
+# and the first answer wins. Latencies are always recorded; hedges fire only when enabled.
+BEDROCK_HEDGE_ENABLED = os.getenv('BEDROCK_HEDGE_ENABLED', 'false').lower() == 'true'
+BEDROCK_HEDGE_QUANTILE = float(os.getenv('BEDROCK_HEDGE_QUANTILE', '0.9'))
+BEDROCK_HEDGE_MIN_SAMPLES = int(os.getenv('BEDROCK_HEDGE_MIN_SAMPLES', '10'))
+BEDROCK_HEDGE_WINDOW = int(os.getenv('BEDROCK_HEDGE_WINDOW', '100'))
+BEDROCK_HEDGE_MIN_DELAY = float(os.getenv('BEDROCK_HEDGE_MIN_DELAY', '2.0'))
+
+# Streaming / progressive results
+STREAM_FLUSH_INTERVAL_SECONDS = float(os.getenv('STREAM_FLUSH_INTERVAL_SECONDS', '2.0'))
+STREAM_FLUSH_MIN_CHARS = int(os.getenv('STREAM_FLUSH_MIN_CHARS', '400'))
+
 # Scraper Configuration
 SCRAPER_MAX_CHARS = int(os.getenv('SCRAPER_MAX_CHARS', '3000'))
 SCRAPER_TIMEOUT = int(os.getenv('SCRAPER_TIMEOUT', '10'))
+SCRAPER_MAX_BYTES = int(os.getenv('SCRAPER_MAX_BYTES', str(2 * 1024 * 1024)))
+SCRAPER_CHUNK_BYTES = int(os.getenv('SCRAPER_CHUNK_BYTES', str(16 * 1024)))
+
+# Scrape cache: seconds a page is served without revalidation, per source type
+SCRAPE_CACHE_ENABLED = os.getenv('SCRAPE_CACHE_ENABLED', 'true').lower() == 'true'
+SCRAPE_CACHE_S3_PREFIX = os.getenv('SCRAPE_CACHE_S3_PREFIX', '_cache/scrape/')
+SCRAPE_CACHE_TTLS = {
+    'homepage': int(os.getenv('SCRAPE_CACHE_TTL_HOMEPAGE', '86400')),
+    'news': int(os.getenv('SCRAPE_CACHE_TTL_NEWS', '3600')),
+    'wiki': int(os.getenv('SCRAPE_CACHE_TTL_WIKI', '604800')),
+    'sitemap': int(os.getenv('SCRAPE_CACHE_TTL_SITEMAP', '604800')),
+}
+
+# Scraped content is deduplicated across sources and packed into this many tokens;
+# each source is guaranteed its share of the budget, leftovers go to the best passages
+SCRAPE_TOKEN_BUDGET = int(os.getenv('SCRAPE_TOKEN_BUDGET', '2000'))
+SCRAPE_SOURCE_QUOTAS = {
+    'website': 0.25,
+    'about': 0.15,
+    'leadership': 0.15,
+    'investors': 0.1,
+    'news': 0.15,
+    'wikipedia': 0.2,
+}
 
 
 def get_cors_headers(origin: Optional[str] = None) -> dict:
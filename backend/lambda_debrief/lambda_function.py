@@ -20,13 +20,38 @@ s3 = boto3.client('s3', region_name='us-east-1')
 # ⚠️ CHANGE THIS to your actual bucket name
 BUCKET_NAME = 'axis-interviews-YOURTEAMNAME'
 
+# Stage count of a full run, for items written before runs recorded `stage_names`
+PIPELINE_STAGE_COUNT = 6
+
+
+# Statuses after which the brief and email objects are expected to exist
+OUTPUT_STATUSES = ('brief_ready', 'complete', 'interview_completed')
+
 
 def get_s3_content(key):
+    """Object text, or '' when it does not exist (yet) or cannot be read"""
     try:
         response = s3.get_object(Bucket=BUCKET_NAME, Key=key)
         return response['Body'].read().decode('utf-8')
     except Exception as e:
-        return f"Could not load: {str(e)}"
+        code = getattr(e, 'response', {}).get('Error', {}).get('Code')
+        if code not in ('NoSuchKey', '404'):
+            print(f"S3 load error ({key}): {str(e)}")
+        return ''
+
+
+def summarize_progress(item):
+    """Summarize per-stage pipeline status for dashboards polling an async run"""
+    stages = item.get('stages', {}) or {}
+    stage_names = item.get('stage_names') or []
+    completed = [name for name, stage in stages.items() if stage.get('status') == 'complete'
+                 and (not stage_names or name in stage_names)]
+    return {
+        'completed_stages': len(completed),
+        'total_stages': len(stage_names) or PIPELINE_STAGE_COUNT,
+        'running': sorted(name for name, stage in stages.items() if stage.get('status') == 'running'),
+        'failed': sorted(name for name, stage in stages.items() if stage.get('status') == 'failed')
+    }
 
 
 def handle_get(interview_id):
@@ -43,8 +68,14 @@ def handle_get(interview_id):
                 'body': json.dumps({'error': 'Interview not found'})
             }
 
-        brief = get_s3_content(item['brief_s3_key']) if item.get('brief_s3_key') else ''
-        interviewee_email = get_s3_content(item['email_s3_key']) if item.get('email_s3_key') else ''
+        # A queued run has written nothing yet; a generating or failed run may
+        # have a partial brief (streamed during assembly) or none at all
+        status = item.get('status')
+        has_output = status != 'queued'
+        brief = get_s3_content(item['brief_s3_key']) if has_output and item.get('brief_s3_key') else ''
+        # The email is only written once the run finishes
+        interviewee_email = get_s3_content(item['email_s3_key']) \
+            if status in OUTPUT_STATUSES and item.get('email_s3_key') else ''
 
         return {
             'statusCode': 200,
@@ -56,6 +87,10 @@ def handle_get(interview_id):
                 'status': item.get('status', ''),
                 'created_at': item.get('created_at', ''),
                 'elapsed_seconds': item.get('elapsed_seconds', ''),
+                'stages': item.get('stages', {}),
+                'progress': summarize_progress(item),
+                'error': item.get('error', ''),
+                'failed_stage': item.get('failed_stage', ''),
                 'brief': brief,
                 'interviewee_email': interviewee_email,
                 'schema': item.get('schema_preview', {}),
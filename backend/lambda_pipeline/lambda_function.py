@@ -7,15 +7,30 @@ Role: axis-lambda-role
 Memory: 512 MB recommended
 """
 
+import functools
 import json
+import os
 import boto3
+import threading
 import uuid
 import time
 
+# Bedrock regions calls are spread over (BEDROCK_REGIONS env, comma-separated, preferred first)
+from config import BEDROCK_REGIONS
+from utils.bedrock_client import BedrockClient
+from utils.model_routing import Route, load_routing, resolve_route
+from utils.payloads import compact_stage_output, estimate_tokens, extract_json
+from utils.response_cache import ResponseCache
+from utils.stage_graph import Stage, StageGraphError, downstream_of, run_stage_graph
+from utils.streaming import ProgressiveWriter
+
 # AWS clients
-bedrock = boto3.client('bedrock-runtime', region_name='us-east-1')
 s3 = boto3.client('s3', region_name='us-east-1')
-dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+lambda_client = boto3.client('lambda', region_name='us-east-1')
+
+# boto3 resources are not thread-safe and stages run on a thread pool,
+# so each thread gets its own DynamoDB resource (see get_table)
+_thread_local = threading.local()
 
 # ⚠️ CHANGE THIS to your actual bucket name
 BUCKET_NAME = 'axis-interviews-YOURTEAMNAME'
@@ -23,38 +38,141 @@ BUCKET_NAME = 'axis-interviews-YOURTEAMNAME'
 # Model ID — do not change
 MODEL_ID = 'anthropic.claude-3-5-sonnet-20241022-v2:0'
 BACKUP_MODEL_ID = 'anthropic.claude-3-sonnet-20240229-v1:0'
+# Stage → model, fallback chain and max_tokens (config BEDROCK_STAGE_ROUTING); gaps and schema
+# run on the fast tier. Stages missing from the table use DEFAULT_ROUTE.
+STAGE_ROUTING = load_routing()
+DEFAULT_ROUTE = Route(MODEL_ID, [BACKUP_MODEL_ID], max_tokens=4000)
 
 # ============================================================
-# PASTE ALL 6 PROMPTS HERE FROM prompts/all_prompts.py
+# PASTE ALL PROMPTS HERE FROM prompts/all_prompts.py (or run scripts/inject_prompts.py)
 # ============================================================
 SYNTHESIS_PROMPT = """[PASTE SYNTHESIS_PROMPT HERE]"""
 TEXAS_PROMPT = """[PASTE TEXAS_PROMPT HERE]"""
+CONTEXT_PREFIX_PROMPT = """[PASTE CONTEXT_PREFIX_PROMPT HERE]"""
 QUESTIONS_PROMPT = """[PASTE QUESTIONS_PROMPT HERE]"""
 GAPS_PROMPT = """[PASTE GAPS_PROMPT HERE]"""
 ASSEMBLY_PROMPT = """[PASTE ASSEMBLY_PROMPT HERE]"""
 SCHEMA_PROMPT = """[PASTE SCHEMA_PROMPT HERE]"""
+EXPRESS_PROMPT = """[PASTE EXPRESS_PROMPT HERE]"""
+PROMPT_VERSION = "[PASTE PROMPT_VERSION HERE]"
 
+# Module-level so the in-process response cache survives warm invocations
+bedrock_client = BedrockClient(
+    regions=BEDROCK_REGIONS,
+    primary_model=MODEL_ID,
+    backup_model=BACKUP_MODEL_ID,
+    cache=ResponseCache(s3_client=s3, bucket=BUCKET_NAME)
+)
 
-def call_bedrock(prompt, temperature=0.3, max_tokens=4000):
-    """Call Bedrock with fallback to backup model"""
-    for model_id in [MODEL_ID, BACKUP_MODEL_ID]:
-        try:
-            response = bedrock.invoke_model(
-                modelId=model_id,
-                body=json.dumps({
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": max_tokens,
-                    "temperature": temperature,
-                    "messages": [{"role": "user", "content": prompt}]
-                })
-            )
-            result = json.loads(response['body'].read())
-            return result['content'][0]['text']
-        except Exception as e:
-            print(f"Bedrock error with {model_id}: {str(e)}")
-            if model_id == BACKUP_MODEL_ID:
-                return f"Error calling Bedrock: {str(e)}"
+# Attributes describing a failed run, cleared when a run starts and when it succeeds
+FAILURE_FIELDS = ('error', 'failed_stage')
+
+# S3 checkpoint written as soon as each stage finishes
+STAGE_ARTIFACTS = {
+    'synthesis': 'raw_profile.json',
+    'texas': 'texas_context.json',
+    'questions': 'questions.json',
+    'gaps': 'gaps.json',
+    'assembly': 'final_brief.txt',
+    'schema': 'schema_raw.json',
+    'express': 'express_raw.txt',
+    'scrape': 'scraped_content.txt',
+}
+
+# Generation modes: the full six-call chain, or one combined call for same-day interviews
+MODE_FULL = 'full'
+MODE_EXPRESS = 'express'
+
+# Request inputs, saved before any stage runs so the run can be resumed
+PIPELINE_INPUT_FILE = 'input.json'
+
+# Fused /generate: the scraper is invoked directly and writes its full response here
+SCRAPER_FUNCTION_NAME = os.environ.get('SCRAPER_FUNCTION_NAME', 'axis-scraper')
+SCRAPE_OUTPUT_FILE = 'scrape.json'
+
+# Institutional memory Call 2 actually saw, compared on regenerate to detect new debriefs
+MEMORY_SNAPSHOT_FILE = 'institutional_memory.json'
+
+# Calls 3+4 and then 5+6 run side by side, so two Bedrock calls are in flight at most
+PIPELINE_MAX_WORKERS = 2
+
+SECTORS = ["energy", "agriculture", "agtech", "defense", "aerospace",
+           "healthcare", "financial", "technology", "manufacturing",
+           "retail", "logistics", "real estate"]
+
+
+def call_bedrock(prompt, temperature=0.3, max_tokens=None, prefix=None, call_name=None):
+    """
+    Call Bedrock with fallback to backup model (cached for low-temperature calls).
+
+    `prefix` is shared context sent ahead of the prompt as a prompt-cache checkpoint.
+    `call_name` (the stage name) picks the stage's route (model, fallbacks and
+    max_tokens unless given) and keys the latency history slow calls are hedged against.
+    Throttling is retried inside BedrockClient; BedrockError is raised only once
+    both models are exhausted, so the stage fails instead of feeding an error
+    message into the prompts downstream.
+    """
+    route = resolve_route(call_name, DEFAULT_ROUTE, STAGE_ROUTING)
+    return bedrock_client.invoke_model(
+        prompt,
+        temperature=temperature,
+        max_tokens=max_tokens or route.max_tokens,
+        prompt_version=PROMPT_VERSION,
+        prefix=prefix,
+        call_name=call_name,
+        models=route.models
+    )
+
+
+def call_bedrock_stream(prompt, temperature=0.3, max_tokens=None, on_progress=None, prefix=None, call_name=None):
+    """Stream a Bedrock completion, handing partial text to on_progress as it grows"""
+    route = resolve_route(call_name, DEFAULT_ROUTE, STAGE_ROUTING)
+    writer = ProgressiveWriter(on_progress or (lambda text: None))
+    try:
+        for delta in bedrock_client.invoke_model_stream(
+            prompt,
+            temperature=temperature,
+            max_tokens=max_tokens or route.max_tokens,
+            prompt_version=PROMPT_VERSION,
+            prefix=prefix,
+            call_name=call_name,
+            models=route.models
+        ):
+            writer.append(delta)
+    finally:
+        writer.flush()
+    return writer.text
+
+
+def is_bedrock_error(output):
+    """Checkpoints from runs before failures were raised may hold an in-band error message"""
+    return not isinstance(output, str) or output.startswith("Error calling Bedrock")
+
+
+def get_table(name):
+    """DynamoDB table handle bound to the calling thread's resource"""
+    if not hasattr(_thread_local, 'dynamodb'):
+        _thread_local.dynamodb = boto3.session.Session().resource('dynamodb', region_name='us-east-1')
+    return _thread_local.dynamodb.Table(name)
+
+
+@functools.lru_cache(maxsize=32)
+def compact_payload(text):
+    """Minified JSON form of a stage output, as injected into downstream prompts"""
+    return compact_stage_output(text)[0]
+
+
+def payload_token_savings(stages, results, skipped=()):
+    """Estimate input tokens this run saved by compacting each stage output it fed forward"""
+    saved = {}
+    for name, output in results.items():
+        if name == 'scrape':
+            # Scraped content is fed to Call 1 as-is, never compacted
             continue
+        consumers = sum(1 for stage in stages if name in stage.deps and stage.name not in skipped)
+        if consumers and isinstance(output, str):
+            saved[name] = (estimate_tokens(output) - estimate_tokens(compact_payload(output))) * consumers
+    return saved
 
 
 def fill_prompt(template, replacements):
@@ -68,7 +186,7 @@ def fill_prompt(template, replacements):
 def get_institutional_memory(sector="general"):
     """Pull relevant past interview insights from DynamoDB"""
     try:
-        table = dynamodb.Table('axis-institutional-memory')
+        table = get_table('axis-institutional-memory')
         response = table.query(
             KeyConditionExpression=boto3.dynamodb.conditions.Key('sector').eq(sector),
             Limit=3
@@ -122,10 +240,30 @@ def save_to_s3(interview_id, content, filename):
         return False
 
 
+def load_from_s3(interview_id, filename):
+    """Load a previously saved artifact, or None if it is missing"""
+    try:
+        response = s3.get_object(Bucket=BUCKET_NAME, Key=f'{interview_id}/{filename}')
+        return response['Body'].read().decode('utf-8')
+    except Exception as e:
+        print(f"S3 load error ({filename}): {str(e)}")
+        return None
+
+
+def get_interview(interview_id):
+    """Fetch the axis-interviews item, or None"""
+    try:
+        response = get_table('axis-interviews').get_item(Key={'interview_id': interview_id})
+        return response.get('Item')
+    except Exception as e:
+        print(f"DynamoDB get error: {str(e)}")
+        return None
+
+
 def save_to_dynamodb(item):
     """Save interview metadata to DynamoDB"""
     try:
-        table = dynamodb.Table('axis-interviews')
+        table = get_table('axis-interviews')
         table.put_item(Item=item)
         return True
     except Exception as e:
@@ -133,157 +271,590 @@ def save_to_dynamodb(item):
         return False
 
 
-def lambda_handler(event, context):
-    # Parse input from API Gateway or direct invocation
-    if 'body' in event:
-        body = json.loads(event['body']) if isinstance(event['body'], str) else event['body']
-    else:
-        body = event
+def update_interview(interview_id, fields, remove=()):
+    """Set a few attributes on an existing interview item, optionally removing others"""
+    try:
+        names = {f'#f{i}': key for i, key in enumerate(fields)}
+        names.update({f'#r{i}': key for i, key in enumerate(remove)})
+        values = {f':v{i}': value for i, value in enumerate(fields.values())}
+        expression = 'SET ' + ', '.join(f'#f{i} = :v{i}' for i in range(len(fields)))
+        if remove:
+            expression += ' REMOVE ' + ', '.join(f'#r{i}' for i in range(len(remove)))
+        table = get_table('axis-interviews')
+        table.update_item(
+            Key={'interview_id': interview_id},
+            UpdateExpression=expression,
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values
+        )
+        return True
+    except Exception as e:
+        print(f"DynamoDB update error: {str(e)}")
+        return False
 
-    company_name = body.get('company_name', '').strip()
-    scraped_content = body.get('scraped_content', '')
-    tamu_notes = body.get('tamu_notes', 'No proprietary notes provided.')
 
-    if not company_name:
-        return {
-            'statusCode': 400,
-            'headers': {'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': 'company_name is required'})
-        }
+def split_brief(final_brief):
+    """Split the assembly output into interviewer brief and interviewee email"""
+    for delimiter in ("===INTERVIEWEE_EMAIL===", "===INTERVIEWEE_PACKET==="):
+        if delimiter in final_brief:
+            parts = final_brief.split(delimiter)
+            return parts[0].strip(), parts[1].strip()
+    return final_brief, ""
 
-    interview_id = str(uuid.uuid4())[:8].upper()
-    start_time = time.time()
 
-    print(f"[{interview_id}] Starting AXIS pipeline for: {company_name}")
+def publish_partial_brief(interview_id):
+    """Progress callback that keeps the S3 brief in step with the assembly stream"""
+    def publish(text):
+        interviewer_brief, _ = split_brief(text)
+        save_to_s3(interview_id, interviewer_brief, 'interviewer_brief.txt')
+        update_interview(interview_id, {
+            'brief_partial_chars': len(interviewer_brief),
+            'updated_at': str(int(time.time()))
+        })
+    return publish
+
+
+def detect_sector(profile):
+    """Detect sector from the Call 1 profile for institutional memory lookup"""
+    profile_lower = profile.lower()
+    for s in SECTORS:
+        if s in profile_lower:
+            return s
+    return "general"
 
-    # ── CALL 1: Research Synthesis ──────────────────────────
-    print(f"[{interview_id}] Call 1: Synthesis...")
-    profile = call_bedrock(
-        fill_prompt(SYNTHESIS_PROMPT, {
-            "SCRAPED_CONTENT": scraped_content,
-            "TAMU_UPLOADED_NOTES": tamu_notes
-        }),
-        temperature=0.2,
-        max_tokens=3000
-    )
 
-    # Detect sector from profile for institutional memory lookup
-    sector = "general"
-    for s in ["energy", "agriculture", "agtech", "defense", "aerospace",
-              "healthcare", "financial", "technology", "manufacturing",
-              "retail", "logistics", "real estate"]:
-        if s in profile.lower():
-            sector = s
-            break
+def build_pipeline_stages(interview_id, scraped_content, tamu_notes):
+    """
+    Declare the six Bedrock calls and the outputs each one consumes.
+
+    Calls 3 (questions) and 4 (gaps) only need Calls 1-2, and Call 6 (schema)
+    does not need Call 5, so the critical path is 4 round trips instead of 6.
+    """
+
+    # ── CALL 1: Research Synthesis ──────────────────────────
+    def synthesis(results):
+        print(f"[{interview_id}] Call 1: Synthesis...")
+        return call_bedrock(
+            fill_prompt(SYNTHESIS_PROMPT, {
+                "SCRAPED_CONTENT": results.get('scrape', scraped_content),
+                "TAMU_UPLOADED_NOTES": tamu_notes
+            }),
+            temperature=0.2,
+            call_name='synthesis'
+        )
 
     # ── CALL 2: Texas Context ────────────────────────────────
-    print(f"[{interview_id}] Call 2: Texas Context (sector: {sector})...")
-    memory = get_institutional_memory(sector)
-    texas = call_bedrock(
-        fill_prompt(TEXAS_PROMPT, {
-            "OUTPUT_FROM_CALL_1": profile,
-            "INSTITUTIONAL_MEMORY": memory
-        }),
-        temperature=0.2,
-        max_tokens=2000
-    )
+    def texas(results):
+        sector = detect_sector(results['synthesis'])
+        print(f"[{interview_id}] Call 2: Texas Context (sector: {sector})...")
+        memory = get_institutional_memory(sector)
+        save_to_s3(interview_id, memory, MEMORY_SNAPSHOT_FILE)
+        return call_bedrock(
+            fill_prompt(TEXAS_PROMPT, {
+                "OUTPUT_FROM_CALL_1": compact_payload(results['synthesis']),
+                "INSTITUTIONAL_MEMORY": memory
+            }),
+            temperature=0.2,
+            call_name='texas'
+        )
+
+    # Calls 3-6 share this profile + Texas context prefix (a prompt-cache checkpoint)
+    def shared_context(results):
+        return fill_prompt(CONTEXT_PREFIX_PROMPT, {
+            "OUTPUT_FROM_CALL_1": compact_payload(results['synthesis']),
+            "OUTPUT_FROM_CALL_2": compact_payload(results['texas'])
+        })
 
     # ── CALL 3: Questions ────────────────────────────────────
-    print(f"[{interview_id}] Call 3: Questions...")
-    questions = call_bedrock(
-        fill_prompt(QUESTIONS_PROMPT, {
-            "OUTPUT_FROM_CALL_1": profile,
-            "OUTPUT_FROM_CALL_2": texas
-        }),
-        temperature=0.7,
-        max_tokens=4000
-    )
+    def questions(results):
+        print(f"[{interview_id}] Call 3: Questions...")
+        return call_bedrock(
+            QUESTIONS_PROMPT,
+            temperature=0.7,
+            prefix=shared_context(results),
+            call_name='questions'
+        )
 
     # ── CALL 4: Knowledge Gaps ───────────────────────────────
-    print(f"[{interview_id}] Call 4: Knowledge Gaps...")
-    gaps = call_bedrock(
-        fill_prompt(GAPS_PROMPT, {
-            "OUTPUT_FROM_CALL_1": profile,
-            "OUTPUT_FROM_CALL_2": texas
-        }),
-        temperature=0.2,
-        max_tokens=2000
-    )
+    def gaps(results):
+        print(f"[{interview_id}] Call 4: Knowledge Gaps...")
+        return call_bedrock(
+            GAPS_PROMPT,
+            temperature=0.2,
+            prefix=shared_context(results),
+            call_name='gaps'
+        )
 
-    # ── CALL 5: Final Assembly ───────────────────────────────
-    print(f"[{interview_id}] Call 5: Assembly...")
-    final_brief = call_bedrock(
-        fill_prompt(ASSEMBLY_PROMPT, {
-            "OUTPUT_FROM_CALL_1": profile,
-            "OUTPUT_FROM_CALL_2": texas,
-            "OUTPUT_FROM_CALL_3": questions,
-            "OUTPUT_FROM_CALL_4": gaps
-        }),
-        temperature=0.4,
-        max_tokens=6000
-    )
+    # ── CALL 5: Final Assembly (streamed — the dashboard shows the brief as it grows)
+    def assembly(results):
+        print(f"[{interview_id}] Call 5: Assembly...")
+        return call_bedrock_stream(
+            fill_prompt(ASSEMBLY_PROMPT, {
+                "OUTPUT_FROM_CALL_3": compact_payload(results['questions']),
+                "OUTPUT_FROM_CALL_4": compact_payload(results['gaps'])
+            }),
+            temperature=0.4,
+            on_progress=publish_partial_brief(interview_id),
+            prefix=shared_context(results),
+            call_name='assembly'
+        )
 
     # ── CALL 6: Texas Insights Schema (Document 4) ──────────
-    print(f"[{interview_id}] Call 6: Intelligence Schema...")
-    schema_raw = call_bedrock(
-        fill_prompt(SCHEMA_PROMPT, {
-            "OUTPUT_FROM_CALL_1": profile,
-            "OUTPUT_FROM_CALL_2": texas,
-            "OUTPUT_FROM_CALL_4": gaps
-        }),
-        temperature=0.2,
-        max_tokens=2000
+    def schema(results):
+        print(f"[{interview_id}] Call 6: Intelligence Schema...")
+        return call_bedrock(
+            fill_prompt(SCHEMA_PROMPT, {
+                "OUTPUT_FROM_CALL_4": compact_payload(results['gaps'])
+            }),
+            temperature=0.2,
+            prefix=shared_context(results),
+            call_name='schema'
+        )
+
+    return [
+        Stage('synthesis', synthesis),
+        Stage('texas', texas, deps=['synthesis']),
+        Stage('questions', questions, deps=['synthesis', 'texas']),
+        Stage('gaps', gaps, deps=['synthesis', 'texas']),
+        Stage('assembly', assembly, deps=['synthesis', 'texas', 'questions', 'gaps']),
+        Stage('schema', schema, deps=['synthesis', 'texas', 'gaps']),
+    ]
+
+
+def build_express_stages(interview_id, scraped_content, tamu_notes):
+    """Single combined call producing a reduced brief (mode: express)"""
+
+    def express(results):
+        print(f"[{interview_id}] Express: combined brief...")
+        return call_bedrock_stream(
+            fill_prompt(EXPRESS_PROMPT, {
+                "SCRAPED_CONTENT": results.get('scrape', scraped_content),
+                "TAMU_UPLOADED_NOTES": tamu_notes
+            }),
+            temperature=0.4,
+            on_progress=publish_partial_brief(interview_id),
+            call_name='express'
+        )
+
+    return [Stage('express', express)]
+
+
+def build_stages(mode, interview_id, scraped_content, tamu_notes, company_name='', company_url=''):
+    """
+    Stages for a run in the given mode.
+
+    When scraped_content is None the scraper runs first, as stage 'scrape',
+    and the stages that read the scraped content wait for it.
+    """
+    if mode == MODE_EXPRESS:
+        stages = build_express_stages(interview_id, scraped_content, tamu_notes)
+    else:
+        stages = build_pipeline_stages(interview_id, scraped_content, tamu_notes)
+    if scraped_content is not None:
+        return stages
+
+    def scrape(results):
+        print(f"[{interview_id}] Scrape: {company_name} ({company_url or 'no website'})...")
+        return invoke_scraper(interview_id, company_name, company_url)
+
+    return [Stage('scrape', scrape)] + [Stage(s.name, s.fn, deps=s.deps or ['scrape']) for s in stages]
+
+
+def invoke_scraper(interview_id, company_name, company_url):
+    """
+    Run the scraper Lambda and return its scraped content.
+
+    The scraper writes its full response to S3 and returns only the key, so the
+    content never passes through the invoke payload or API Gateway.
+    """
+    output_key = f'{interview_id}/{SCRAPE_OUTPUT_FILE}'
+    response = lambda_client.invoke(
+        FunctionName=SCRAPER_FUNCTION_NAME,
+        InvocationType='RequestResponse',
+        Payload=json.dumps({
+            'company_name': company_name,
+            'company_url': company_url,
+            'output_key': output_key
+        }).encode('utf-8')
     )
+    payload = json.loads(response['Payload'].read() or b'{}')
+    if response.get('FunctionError') or payload.get('statusCode') != 200:
+        raise RuntimeError(f"Scraper failed: {str(payload)[:300]}")
+
+    summary = json.loads(payload['body'])
+    output = load_from_s3(interview_id, SCRAPE_OUTPUT_FILE)
+    if output is None:
+        raise RuntimeError(f"Scraper output missing at {output_key}")
+    update_interview(interview_id, {
+        'logo_url': summary.get('logo_url', ''),
+        'sources_scraped': summary.get('sources_scraped', [])
+    })
+    return json.loads(output)['scraped_content']
+
+
+def parse_schema(schema_raw):
+    """Pull the schema JSON object out of the Call 6 output"""
     try:
         import re as _re
-        schema_text = schema_raw
         json_match = _re.search(r'\{.*\}', schema_raw, _re.DOTALL)
-        schema = json.loads(json_match.group()) if json_match else {}
+        return json.loads(json_match.group()) if json_match else {}
     except:
-        schema = {}
-
-    # ── Split brief and interviewee email ───────────────────
-    interviewer_brief = final_brief
-    interviewee_email = ""
-    if "===INTERVIEWEE_EMAIL===" in final_brief:
-        parts = final_brief.split("===INTERVIEWEE_EMAIL===")
-        interviewer_brief = parts[0].strip()
-        interviewee_email = parts[1].strip()
-    elif "===INTERVIEWEE_PACKET===" in final_brief:
-        parts = final_brief.split("===INTERVIEWEE_PACKET===")
-        interviewer_brief = parts[0].strip()
-        interviewee_email = parts[1].strip()
-
-    # ── Save to S3 ───────────────────────────────────────────
+        return {}
+
+
+def finish_full(interview_id, results):
+    """Turn the six call outputs into the brief, email, sector and schema"""
+    interviewer_brief, interviewee_email = split_brief(results['assembly'])
+    return {
+        'sector': detect_sector(results['synthesis']),
+        'interviewer_brief': interviewer_brief,
+        'interviewee_email': interviewee_email,
+        'schema': parse_schema(results['schema'])
+    }
+
+
+def finish_express(interview_id, results):
+    """Split the express output and write it to the same S3 keys the full chain uses"""
+    output = results['express']
+    data = {}
+    if "===EXPRESS_DATA===" in output:
+        output, data_raw = output.split("===EXPRESS_DATA===", 1)
+        data = extract_json(data_raw) or {}
+    interviewer_brief, interviewee_email = split_brief(output)
+
+    profile = json.dumps(data.get('profile_highlights', {}), indent=2)
+    save_to_s3(interview_id, profile, 'raw_profile.json')
+    save_to_s3(interview_id, json.dumps({
+        'interviewer_questions': data.get('interviewer_questions', []),
+        'interviewee_questions': data.get('interviewee_questions', [])
+    }, indent=2), 'questions.json')
+    save_to_s3(interview_id, json.dumps({'critical_unknowns': data.get('top_gaps', [])}, indent=2), 'gaps.json')
+
+    return {
+        'sector': detect_sector(profile + interviewer_brief),
+        'interviewer_brief': interviewer_brief,
+        'interviewee_email': interviewee_email,
+        'schema': {}
+    }
+
+
+def create_interview_record(interview_id, company_name, status):
+    """Create the axis-interviews item before any stage runs"""
+    return save_to_dynamodb({
+        'interview_id': interview_id,
+        'company_name': company_name,
+        'created_at': str(int(time.time())),
+        'status': status,
+        'brief_s3_key': f'{interview_id}/interviewer_brief.txt',
+        'email_s3_key': f'{interview_id}/interviewee_email.txt',
+        'stages': {},
+        'post_interview_debrief': {},
+        'debrief_completed': False
+    })
+
+
+def record_stage(interview_id, stage_name, stage_status):
+    """Write one stage's status map under stages.<name> on the interview item"""
+    try:
+        table = get_table('axis-interviews')
+        table.update_item(
+            Key={'interview_id': interview_id},
+            UpdateExpression='SET stages.#stage = :status, updated_at = :now',
+            ExpressionAttributeNames={'#stage': stage_name},
+            ExpressionAttributeValues={':status': stage_status, ':now': str(int(time.time()))}
+        )
+        return True
+    except Exception as e:
+        print(f"Stage status error ({stage_name}): {str(e)}")
+        return False
+
+
+def stage_tracker(interview_id):
+    """Build on_stage_start/on_stage_end hooks that checkpoint artifacts and record progress"""
+    started = {}
+
+    def on_start(name):
+        started[name] = time.time()
+        print(f"[{interview_id}] Stage {name} started")
+        record_stage(interview_id, name, {
+            'status': 'running',
+            'started_at': str(int(started[name]))
+        })
+
+    def on_end(name, output, error):
+        ended = time.time()
+        failed = error is not None or is_bedrock_error(output)
+        s3_key = None
+        if not failed:
+            filename = STAGE_ARTIFACTS[name]
+            if save_to_s3(interview_id, output, filename):
+                s3_key = f'{interview_id}/{filename}'
+        print(f"[{interview_id}] Stage {name} {'failed' if failed else 'complete'} in {ended - started[name]:.1f}s")
+        record_stage(interview_id, name, {
+            'status': 'failed' if failed else 'complete',
+            'started_at': str(int(started[name])),
+            'ended_at': str(int(ended)),
+            'elapsed_seconds': str(round(ended - started[name], 1)),
+            's3_key': s3_key
+        })
+
+    return on_start, on_end
+
+
+def save_pipeline_input(interview_id, company_name, scraped_content, tamu_notes, mode=MODE_FULL, company_url=''):
+    """
+    Persist the request inputs so a run can be resumed later.
+
+    scraped_content is None for a fused run until its scrape stage finishes.
+    """
+    return save_to_s3(interview_id, json.dumps({
+        'company_name': company_name,
+        'company_url': company_url,
+        'scraped_content': scraped_content,
+        'tamu_notes': tamu_notes,
+        'mode': mode
+    }), PIPELINE_INPUT_FILE)
+
+
+def load_checkpoints(interview_id, item):
+    """Load outputs of stages the interview item records as complete"""
+    checkpoints = {}
+    for name, stage in (item.get('stages') or {}).items():
+        if name not in STAGE_ARTIFACTS or stage.get('status') != 'complete':
+            continue
+        output = load_from_s3(interview_id, STAGE_ARTIFACTS[name])
+        if output is not None and not is_bedrock_error(output):
+            checkpoints[name] = output
+    return checkpoints
+
+
+def run_pipeline(interview_id, company_name, scraped_content, tamu_notes, completed=None, mode=MODE_FULL,
+                 company_url=''):
+    """
+    Run the calls for an existing interview record and save the results.
+
+    Stages present in `completed` (checkpointed outputs) are not run again.
+    With scraped_content None the scraper runs first (fused /generate).
+    """
+    start_time = time.time()
+    completed = completed or {}
+    if completed:
+        print(f"[{interview_id}] Resuming AXIS pipeline ({mode}) for: {company_name} "
+              f"(reusing {', '.join(sorted(completed))})")
+    else:
+        print(f"[{interview_id}] Starting AXIS pipeline ({mode}) for: {company_name}")
+    stages = build_stages(mode, interview_id, scraped_content, tamu_notes, company_name, company_url)
+    # The stage list varies (express: 1, fused scrape: 7), so progress reads it from the item
+    update_interview(interview_id, {
+        'status': 'generating',
+        'mode': mode,
+        'stage_names': [stage.name for stage in stages]
+    }, remove=FAILURE_FIELDS)
+
+    on_start, on_end = stage_tracker(interview_id)
+    results = run_stage_graph(
+        stages,
+        max_workers=PIPELINE_MAX_WORKERS,
+        on_stage_start=on_start,
+        on_stage_end=on_end,
+        completed=completed
+    )
+    if scraped_content is None:
+        # Later resumes and regenerations use the scraped content like any other input
+        save_pipeline_input(interview_id, company_name, results['scrape'], tamu_notes, mode, company_url)
+    tokens_saved = payload_token_savings(stages, results, skipped=completed)
+    if tokens_saved:
+        print(f"[{interview_id}] Compact payloads saved ~{sum(tokens_saved.values())} input tokens {tokens_saved}")
+
+    outputs = finish_express(interview_id, results) if mode == MODE_EXPRESS else finish_full(interview_id, results)
+    sector = outputs['sector']
+    interviewer_brief = outputs['interviewer_brief']
+    interviewee_email = outputs['interviewee_email']
+    schema = outputs['schema']
+
+    # ── Save to S3 (stage artifacts were checkpointed as each call finished)
     save_to_s3(interview_id, interviewer_brief, 'interviewer_brief.txt')
     save_to_s3(interview_id, interviewee_email, 'interviewee_email.txt')
-    save_to_s3(interview_id, profile, 'raw_profile.json')
-    save_to_s3(interview_id, questions, 'questions.json')
-    save_to_s3(interview_id, gaps, 'gaps.json')
     save_to_s3(interview_id, json.dumps(schema, indent=2), 'schema.json')
 
     # ── Save to DynamoDB ─────────────────────────────────────
     elapsed = round(time.time() - start_time, 1)
-    save_to_dynamodb({
-        'interview_id': interview_id,
-        'company_name': company_name,
+    update_interview(interview_id, {
         'sector': sector,
-        'created_at': str(int(time.time())),
         'elapsed_seconds': str(elapsed),
         'status': 'brief_ready',
-        'brief_s3_key': f'{interview_id}/interviewer_brief.txt',
-        'email_s3_key': f'{interview_id}/interviewee_email.txt',
         'schema_s3_key': f'{interview_id}/schema.json',
         'questions_s3_key': f'{interview_id}/questions.json',
         'schema_preview': schema,
-        'post_interview_debrief': {},
-        'debrief_completed': False
-    })
+        'payload_tokens_saved': sum(tokens_saved.values())
+    }, remove=FAILURE_FIELDS)
 
     print(f"[{interview_id}] Pipeline complete in {elapsed}s")
+    if bedrock_client.hedging:
+        print(f"[{interview_id}] Bedrock hedging (process lifetime): {bedrock_client.hedge_stats.snapshot()}")
+    if len(bedrock_client.regions) > 1:
+        print(f"[{interview_id}] Bedrock region health: {bedrock_client.router.snapshot()}")
 
     return {
-        'statusCode': 200,
+        'interview_id': interview_id,
+        'company_name': company_name,
+        'sector': sector,
+        'mode': mode,
+        'brief': interviewer_brief,
+        'interviewee_email': interviewee_email,
+        'schema': schema,
+        'elapsed_seconds': elapsed,
+        'payload_tokens_saved': sum(tokens_saved.values())
+    }
+
+
+def resume_pipeline(interview_id):
+    """Re-run only the stages of an earlier run that never produced a checkpoint"""
+    item = get_interview(interview_id)
+    saved_input = load_from_s3(interview_id, PIPELINE_INPUT_FILE)
+    if not item or saved_input is None:
+        raise ValueError(f"No resumable run found for interview {interview_id}")
+    inputs = json.loads(saved_input)
+    return run_pipeline(
+        interview_id,
+        inputs['company_name'],
+        inputs['scraped_content'],
+        inputs['tamu_notes'],
+        completed=load_checkpoints(interview_id, item),
+        mode=inputs.get('mode', MODE_FULL),
+        company_url=inputs.get('company_url', '')
+    )
+
+
+def plan_regeneration(interview_id, item, inputs, tamu_notes=None, refresh_memory=True):
+    """
+    Work out which stages a changed input invalidates.
+
+    Notes feed Call 1, so new notes invalidate everything; institutional memory
+    feeds Call 2, so new debriefs invalidate Call 2 and everything below it.
+
+    Returns:
+        (checkpoints still valid, names of stages to re-run)
+    """
+    mode = inputs.get('mode', MODE_FULL)
+    if mode == MODE_EXPRESS:
+        # One combined call consumes every input, so any refresh re-runs it
+        return {}, {'express'}
+
+    checkpoints = load_checkpoints(interview_id, item)
+    stages = build_pipeline_stages(interview_id, inputs['scraped_content'], inputs['tamu_notes'])
+
+    changed = set()
+    if tamu_notes is not None and tamu_notes != inputs['tamu_notes']:
+        changed.add('synthesis')
+    if refresh_memory and 'synthesis' in checkpoints:
+        current_memory = get_institutional_memory(detect_sector(checkpoints['synthesis']))
+        if current_memory != load_from_s3(interview_id, MEMORY_SNAPSHOT_FILE):
+            changed.add('texas')
+
+    # Stages that never checkpointed (failed or interrupted) have to run as well
+    changed.update(stage.name for stage in stages if stage.name not in checkpoints)
+
+    stale = downstream_of(stages, changed)
+    return {name: output for name, output in checkpoints.items() if name not in stale}, stale
+
+
+def regenerate_pipeline(interview_id, tamu_notes=None, refresh_memory=True):
+    """Re-run only the stages affected by new notes and/or new institutional memory"""
+    item = get_interview(interview_id)
+    saved_input = load_from_s3(interview_id, PIPELINE_INPUT_FILE)
+    if not item or saved_input is None:
+        raise ValueError(f"No saved run found for interview {interview_id}")
+    inputs = json.loads(saved_input)
+
+    completed, stale = plan_regeneration(interview_id, item, inputs, tamu_notes, refresh_memory)
+    print(f"[{interview_id}] Regenerating stages: {', '.join(sorted(stale)) or 'none'}")
+
+    mode = inputs.get('mode', MODE_FULL)
+    if tamu_notes is not None:
+        inputs['tamu_notes'] = tamu_notes
+        save_pipeline_input(interview_id, inputs['company_name'], inputs['scraped_content'], tamu_notes, mode,
+                            inputs.get('company_url', ''))
+
+    result = run_pipeline(
+        interview_id,
+        inputs['company_name'],
+        inputs['scraped_content'],
+        inputs['tamu_notes'],
+        completed=completed,
+        mode=mode,
+        company_url=inputs.get('company_url', '')
+    )
+    result['regenerated_stages'] = sorted(stale)
+    return result
+
+
+def run_pipeline_job(event):
+    """Entry point for the detached (InvocationType=Event) half of an async request"""
+    interview_id = event['interview_id']
+    try:
+        if event['job'] == 'resume':
+            resume_pipeline(interview_id)
+        elif event['job'] == 'regenerate':
+            regenerate_pipeline(interview_id, event.get('tamu_notes'), event.get('refresh_memory', True))
+        else:
+            # Inputs travel through S3: async invoke payloads are capped at 256 KB
+            saved_input = load_from_s3(interview_id, PIPELINE_INPUT_FILE)
+            if saved_input is None:
+                raise ValueError(f"No saved input found for interview {interview_id}")
+            inputs = json.loads(saved_input)
+            run_pipeline(
+                interview_id,
+                inputs['company_name'],
+                inputs['scraped_content'],
+                inputs['tamu_notes'],
+                mode=inputs.get('mode', event.get('mode', MODE_FULL)),
+                company_url=inputs.get('company_url', '')
+            )
+    except Exception as e:
+        print(f"[{interview_id}] Pipeline job failed: {str(e)}")
+        update_interview(interview_id, failure_fields(e))
+        raise
+    return {'interview_id': interview_id, 'status': 'brief_ready'}
+
+
+def failure_fields(error):
+    """Item attributes recording a failed run (FAILURE_FIELDS plus status)"""
+    fields = {'status': 'failed', 'error': str(error)}
+    if getattr(error, 'stage', None):
+        fields['failed_stage'] = error.stage
+    return fields
+
+
+def submit_pipeline_job(job, context):
+    """Invoke this function asynchronously so the API call can return immediately"""
+    lambda_client.invoke(
+        FunctionName=context.function_name,
+        InvocationType='Event',
+        Payload=json.dumps(job).encode('utf-8')
+    )
+
+
+def failed_response(interview_id, error):
+    """503 for a synchronous run whose stage failed; completed stages are checkpointed for resume"""
+    print(f"[{interview_id}] Pipeline failed: {str(error)}")
+    update_interview(interview_id, failure_fields(error))
+    return {
+        'statusCode': 503,
+        'headers': {'Access-Control-Allow-Origin': '*'},
+        'body': json.dumps({
+            'error': str(error),
+            'interview_id': interview_id,
+            'failed_stage': getattr(error, 'stage', None),
+            'resume': {'resume_interview_id': interview_id}
+        })
+    }
+
+
+def accepted_response(interview_id, company_name, status):
+    """202 response for a job that will continue after this request returns"""
+    return {
+        'statusCode': 202,
         'headers': {
             'Access-Control-Allow-Origin': '*',
             'Content-Type': 'application/json'
@@ -291,10 +862,165 @@ def lambda_handler(event, context):
         'body': json.dumps({
             'interview_id': interview_id,
             'company_name': company_name,
-            'sector': sector,
-            'brief': interviewer_brief,
-            'interviewee_email': interviewee_email,
-            'schema': schema,
-            'elapsed_seconds': elapsed
+            'status': status,
+            'status_url': f'/brief/{interview_id}'
         })
     }
+
+
+def handle_resume(interview_id, run_async, context):
+    """POST /generate with resume_interview_id: finish an interrupted run"""
+    item = get_interview(interview_id)
+    if not item:
+        return {
+            'statusCode': 404,
+            'headers': {'Access-Control-Allow-Origin': '*'},
+            'body': json.dumps({'error': 'Interview not found'})
+        }
+
+    if run_async:
+        update_interview(interview_id, {'status': 'queued'})
+        submit_pipeline_job({'job': 'resume', 'interview_id': interview_id}, context)
+        return accepted_response(interview_id, item.get('company_name', ''), 'queued')
+
+    try:
+        result = resume_pipeline(interview_id)
+    except StageGraphError as e:
+        return failed_response(interview_id, e)
+    except ValueError as e:
+        return {
+            'statusCode': 409,
+            'headers': {'Access-Control-Allow-Origin': '*'},
+            'body': json.dumps({'error': str(e)})
+        }
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Access-Control-Allow-Origin': '*',
+            'Content-Type': 'application/json'
+        },
+        'body': json.dumps(result)
+    }
+
+
+def handle_regenerate(interview_id, body, run_async, context):
+    """POST /generate with regenerate_interview_id: refresh a brief after notes or memory change"""
+    item = get_interview(interview_id)
+    if not item:
+        return {
+            'statusCode': 404,
+            'headers': {'Access-Control-Allow-Origin': '*'},
+            'body': json.dumps({'error': 'Interview not found'})
+        }
+
+    tamu_notes = body.get('tamu_notes')
+    refresh_memory = bool(body.get('refresh_memory', True))
+
+    if run_async:
+        update_interview(interview_id, {'status': 'queued'})
+        submit_pipeline_job({
+            'job': 'regenerate',
+            'interview_id': interview_id,
+            'tamu_notes': tamu_notes,
+            'refresh_memory': refresh_memory
+        }, context)
+        return accepted_response(interview_id, item.get('company_name', ''), 'queued')
+
+    try:
+        result = regenerate_pipeline(interview_id, tamu_notes, refresh_memory)
+    except StageGraphError as e:
+        return failed_response(interview_id, e)
+    except ValueError as e:
+        return {
+            'statusCode': 409,
+            'headers': {'Access-Control-Allow-Origin': '*'},
+            'body': json.dumps({'error': str(e)})
+        }
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Access-Control-Allow-Origin': '*',
+            'Content-Type': 'application/json'
+        },
+        'body': json.dumps(result)
+    }
+
+
+def lambda_handler(event, context):
+    # Detached pipeline run submitted by an async /generate request
+    if event.get('job') in ('generate', 'resume', 'regenerate'):
+        return run_pipeline_job(event)
+
+    # Parse input from API Gateway or direct invocation
+    if 'body' in event:
+        body = json.loads(event['body']) if isinstance(event['body'], str) else event['body']
+    else:
+        body = event
+
+    company_name = body.get('company_name', '').strip()
+    scraped_content = body.get('scraped_content', '')
+    tamu_notes = body.get('tamu_notes', 'No proprietary notes provided.')
+    run_async = bool(body.get('async', False))
+    mode = body.get('mode', MODE_FULL)
+    company_url = body.get('company_url', '').strip()
+    # Fused flow: scrape server-side instead of the client calling /scrape first.
+    # Opt-in only, so a request with neither content nor a URL is not sent to the scraper.
+    if body.get('scrape') is True or (not scraped_content and company_url):
+        scraped_content = None
+
+    if body.get('resume_interview_id'):
+        return handle_resume(body['resume_interview_id'].strip().upper(), run_async, context)
+    if body.get('regenerate_interview_id'):
+        return handle_regenerate(body['regenerate_interview_id'].strip().upper(), body, run_async, context)
+
+    if not company_name:
+        return {
+            'statusCode': 400,
+            'headers': {'Access-Control-Allow-Origin': '*'},
+            'body': json.dumps({'error': 'company_name is required'})
+        }
+
+    if mode not in (MODE_FULL, MODE_EXPRESS):
+        return {
+            'statusCode': 400,
+            'headers': {'Access-Control-Allow-Origin': '*'},
+            'body': json.dumps({'error': f"mode must be '{MODE_FULL}' or '{MODE_EXPRESS}'"})
+        }
+
+    interview_id = str(uuid.uuid4())[:8].upper()
+
+    if run_async:
+        create_interview_record(interview_id, company_name, 'queued')
+        try:
+            # The job reads its inputs back from S3, keeping the event payload small
+            if not save_pipeline_input(interview_id, company_name, scraped_content, tamu_notes, mode, company_url):
+                raise RuntimeError("could not save pipeline input")
+            submit_pipeline_job({'job': 'generate', 'interview_id': interview_id, 'mode': mode}, context)
+        except Exception as e:
+            print(f"[{interview_id}] Could not submit pipeline job: {str(e)}")
+            update_interview(interview_id, {'status': 'failed', 'error': str(e)})
+            return {
+                'statusCode': 500,
+                'headers': {'Access-Control-Allow-Origin': '*'},
+                'body': json.dumps({'error': f'Could not start pipeline: {str(e)}'})
+            }
+        print(f"[{interview_id}] Queued async pipeline for: {company_name}")
+        return accepted_response(interview_id, company_name, 'queued')
+
+    # Create the item up front so GET /brief/{id} can serve progress while the calls run
+    create_interview_record(interview_id, company_name, 'generating')
+    save_pipeline_input(interview_id, company_name, scraped_content, tamu_notes, mode, company_url)
+    try:
+        result = run_pipeline(interview_id, company_name, scraped_content, tamu_notes, mode=mode,
+                              company_url=company_url)
+    except StageGraphError as e:
+        return failed_response(interview_id, e)
+
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Access-Control-Allow-Origin': '*',
+            'Content-Type': 'application/json'
+        },
+        'body': json.dumps(result)
+    }
@@ -7,79 +7,196 @@ Role: axis-lambda-role
 """
 
 import json
-import urllib.request
+import boto3
+import urllib.error
 import urllib.parse
-import re
-from html.parser import HTMLParser
 
+from utils.content_extractor import ContentExtractor
+from utils.fetch_group import FetchGroup, STATUS_OK
+from utils.feeds import read_feed
+from utils.html_stream import iter_chunks, read_capped, stream_extract
+from utils.http_pool import HTTPPool
+from utils.link_discovery import discover_pages, parse_sitemap
+from utils.packing import pack_sources
+from utils.scrape_cache import ScrapeCache
 
-class TextExtractor(HTMLParser):
-    def __init__(self):
-        super().__init__()
-        self.text = []
-        self.skip_tags = {'script', 'style', 'nav', 'footer', 'head', 'header'}
-        self.current_skip = False
+BUCKET_NAME = 'axis-interviews-YOURTEAMNAME'
+s3 = boto3.client('s3')
+scrape_cache = ScrapeCache(s3_client=s3, bucket=BUCKET_NAME)
+# Keep-alive connections per host, shared by concurrent fetches and warm invocations
+http_pool = HTTPPool()
 
-    def handle_starttag(self, tag, attrs):
-        if tag in self.skip_tags:
-            self.current_skip = True
+BROWSER_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/91.0.4472.124 Safari/537.36'
 
-    def handle_endtag(self, tag):
-        if tag in self.skip_tags:
-            self.current_skip = False
+# All sources are fetched concurrently; whatever has finished by the deadline is used.
+# The deadline comes from the invocation's remaining time, less a reserve for the response.
+SCRAPE_DEADLINE_SECONDS = 25
+SCRAPE_RESPONSE_RESERVE_SECONDS = 2
+SCRAPE_SOURCE_TIMEOUT = 10
+SCRAPE_MIN_SOURCE_SECONDS = 1
+SCRAPE_MAX_WORKERS = 8
+# Guessed paths, used only when the homepage links and sitemap offer no candidates
+LEADERSHIP_PATHS = ['/team', '/leadership', '/about/leadership', '/about/team']
+# Discovered candidates fetched per page kind; the first that loads wins
+DISCOVERY_CANDIDATES = 2
+SITEMAP_TIMEOUT = 3
+SCRAPE_SITEMAP_ENABLED = True
+# Headlines kept, out of the first NEWS_SCAN_ITEMS feed items (deduplicated, newest first)
+NEWS_ITEMS = 5
+NEWS_SCAN_ITEMS = 30
+# Characters of main content collected per source before packing; the packed
+# text is trimmed to SCRAPE_TOKEN_BUDGET, so these only bound download and parse work
+COLLECT_CHARS = {
+    'website': 6000,
+    'about': 4000,
+    'leadership': 3000,
+    'investors': 3000,
+    'wikipedia': 5000,
+}
 
-    def handle_data(self, data):
-        if not self.current_skip and data.strip():
-            self.text.append(data.strip())
 
+def cached_fetch(url, source_type, parse, timeout=SCRAPE_SOURCE_TIMEOUT, user_agent=BROWSER_USER_AGENT,
+                 max_chars=None):
+    """
+    Fetch a URL through the scrape cache and return the parsed document.
 
-def scrape_url(url, max_chars=3000):
+    parse(response) returns {'text': ..., 'links': [...]} ('links' optional).
+    Fresh entries are served from S3. Stale ones are revalidated with the
+    stored ETag / Last-Modified, and a 304 reuses the cached document.
+    max_chars is the cap parse extracts to; entries are cached per cap.
+    """
+    cached = scrape_cache.lookup(url, max_chars)
+    if scrape_cache.is_fresh(cached, source_type):
+        print(f"Scrape cache hit: {url}")
+        return cached
+
+    headers = {'User-Agent': user_agent}
+    headers.update(scrape_cache.conditional_headers(cached))
     try:
-        if not url.startswith('http'):
-            url = 'https://' + url
-        req = urllib.request.Request(
-            url,
-            headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/91.0.4472.124 Safari/537.36'
-            }
-        )
-        response = urllib.request.urlopen(req, timeout=10)
-        html = response.read().decode('utf-8', errors='ignore')
-        parser = TextExtractor()
-        parser.feed(html)
-        text = ' '.join(parser.text)
-        # Clean up whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text[:max_chars]
+        response = http_pool.get(url, headers=headers, timeout=timeout)
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and cached:
+            print(f"Scrape cache revalidated: {url}")
+            scrape_cache.revalidated(url, cached, max_chars)
+            return cached
+        raise
+
+    with response:
+        document = parse(response)
+    scrape_cache.store(
+        url, source_type, document['text'],
+        etag=response.headers.get('ETag'),
+        last_modified=response.headers.get('Last-Modified'),
+        links=document.get('links'),
+        max_chars=max_chars
+    )
+    return document
+
+
+def extract_text(response, max_chars, with_links=False):
+    """Stream the body through ContentExtractor, stopping once max_chars of main content is collected"""
+    parser = stream_extract(response, ContentExtractor(), max_chars)
+    document = {'text': parser.extract(max_chars)}
+    if with_links:
+        document['links'] = [list(link) for link in parser.links]
+    return document
+
+
+def fetch_page(url, max_chars=3000, timeout=SCRAPE_SOURCE_TIMEOUT, source_type='homepage'):
+    """Fetch a page and return its visible text; raises on any failure"""
+    return fetch_homepage(url, max_chars, timeout, source_type)['text']
+
+
+def fetch_homepage(url, max_chars=3000, timeout=SCRAPE_SOURCE_TIMEOUT, source_type='homepage'):
+    """Fetch a page and return {'text', 'links'}; the links feed page discovery"""
+    if not url.startswith('http'):
+        url = 'https://' + url
+    document = cached_fetch(url, source_type, lambda response: extract_text(response, max_chars, with_links=True),
+                            timeout=timeout, max_chars=max_chars)
+    return {'text': document['text'][:max_chars], 'links': document.get('links') or []}
+
+
+def fetch_sitemap(base_url, timeout=SITEMAP_TIMEOUT):
+    """URLs listed in /sitemap.xml; a missing sitemap is cached as empty"""
+    url = base_url + '/sitemap.xml'
+    try:
+        document = cached_fetch(url, 'sitemap', lambda response: {'text': '\n'.join(parse_sitemap(read_capped(response)))},
+                                timeout=timeout)
+    except urllib.error.HTTPError as e:
+        if e.code in (403, 404, 410):
+            scrape_cache.store(url, 'sitemap', '')
+            return []
+        raise
+    return [line for line in document['text'].split('\n') if line]
+
+
+def fetch_first(urls, max_chars, timeout):
+    """Fetch candidate pages in rank order and return the first that loads"""
+    error = None
+    for url in urls:
+        try:
+            return fetch_page(url, max_chars=max_chars, timeout=timeout)
+        except Exception as e:
+            error = e
+    raise error or LookupError("no candidate pages")
+
+
+def scrape_url(url, max_chars=3000, timeout=SCRAPE_SOURCE_TIMEOUT):
+    try:
+        return fetch_page(url, max_chars=max_chars, timeout=timeout)
     except Exception as e:
         return f"Could not scrape {url}: {str(e)}"
 
 
-def get_google_news(company_name):
+def parse_news(response):
+    """Stream the RSS feed and format the most recent distinct headlines"""
+    news_items = []
+    for item in read_feed(iter_chunks(response), limit=NEWS_ITEMS, scan=NEWS_SCAN_ITEMS):
+        title = item['title']
+        date = f" ({item['published']:%Y-%m-%d})" if item['published'] else ""
+        desc = item['description']
+        # Aggregator descriptions often just repeat the headline
+        if desc and not title.startswith(desc[:60]):
+            news_items.append(f"- {title}{date}: {desc[:200]}")
+        else:
+            news_items.append(f"- {title}{date}")
+
+    return "\n".join(news_items) if news_items else "No recent news found."
+
+
+def fetch_news(company_name, timeout=SCRAPE_SOURCE_TIMEOUT):
+    """Fetch Google News RSS headlines; raises on network failure"""
+    query = urllib.parse.quote(f"{company_name} Texas company")
+    url = f"https://news.google.com/rss/search?q={query}&hl=en-US&gl=US&ceid=US:en"
+    return cached_fetch(url, 'news', lambda response: {'text': parse_news(response)},
+                        timeout=timeout, user_agent='Mozilla/5.0')['text']
+
+
+def get_google_news(company_name, timeout=SCRAPE_SOURCE_TIMEOUT):
     try:
-        query = urllib.parse.quote(f"{company_name} Texas company")
-        url = f"https://news.google.com/rss/search?q={query}&hl=en-US&gl=US&ceid=US:en"
-        req = urllib.request.Request(
-            url,
-            headers={'User-Agent': 'Mozilla/5.0'}
-        )
-        response = urllib.request.urlopen(req, timeout=10)
-        content = response.read().decode('utf-8', errors='ignore')
-
-        titles = re.findall(r'<title><!\[CDATA\[(.*?)\]\]></title>', content)[1:6]
-        descriptions = re.findall(r'<description><!\[CDATA\[(.*?)\]\]></description>', content)[1:6]
-
-        news_items = []
-        for i, title in enumerate(titles):
-            desc = descriptions[i] if i < len(descriptions) else ""
-            desc_clean = re.sub(r'<[^>]+>', '', desc)[:200]
-            news_items.append(f"- {title}: {desc_clean}")
-
-        return "\n".join(news_items) if news_items else "No recent news found."
+        return fetch_news(company_name, timeout=timeout)
     except Exception as e:
         return f"News unavailable: {str(e)}"
 
 
+def fetch_wikipedia(company_name, max_chars=2000, timeout=SCRAPE_SOURCE_TIMEOUT):
+    wiki_query = urllib.parse.quote(company_name.replace(' ', '_'))
+    text = fetch_page(f"https://en.wikipedia.org/wiki/{wiki_query}", max_chars=max_chars,
+                      timeout=timeout, source_type='wiki')
+    if "Wikipedia does not have" in text:
+        raise LookupError(f"No Wikipedia article for {company_name}")
+    return text
+
+
+def scrape_budget(context):
+    """Seconds available for fetching in this invocation"""
+    try:
+        remaining = context.get_remaining_time_in_millis() / 1000.0
+    except AttributeError:
+        return SCRAPE_DEADLINE_SECONDS
+    return min(SCRAPE_DEADLINE_SECONDS, remaining - SCRAPE_RESPONSE_RESERVE_SECONDS)
+
+
 def get_company_logo_url(company_url):
     """Returns a Clearbit logo URL for use in the frontend"""
     try:
@@ -98,6 +215,7 @@ def lambda_handler(event, context):
 
     company_name = body.get('company_name', '').strip()
     company_url = body.get('company_url', '').strip()
+    output_key = None if 'body' in event else event.get('output_key')
 
     if not company_name:
         return {
@@ -109,53 +227,117 @@ def lambda_handler(event, context):
     print(f"Scraping data for: {company_name}")
     scraped_text = f"COMPANY: {company_name}\n\n"
 
-    # Source 1: Main company website
+    # Start every independent source at once. Each source's socket timeout is
+    # its slice of what is left of the budget.
+    group = FetchGroup(scrape_budget(context), max_workers=SCRAPE_MAX_WORKERS)
+    source_timeout = group.slice(SCRAPE_SOURCE_TIMEOUT)
+
+    def start(name, fn, *args, **kwargs):
+        if source_timeout < SCRAPE_MIN_SOURCE_SECONDS:
+            group.skip(name, 'no time left in invocation')
+        else:
+            group.submit(name, fn, *args, timeout=source_timeout, **kwargs)
+
     if company_url:
         print(f"Scraping website: {company_url}")
-        website_content = scrape_url(company_url, max_chars=3000)
-        scraped_text += f"FROM COMPANY WEBSITE (Homepage):\n{website_content}\n\n"
+        base_url = company_url.rstrip('/')
+        start('website', fetch_homepage, company_url, max_chars=COLLECT_CHARS['website'])
+        if SCRAPE_SITEMAP_ENABLED and source_timeout >= SCRAPE_MIN_SOURCE_SECONDS:
+            group.submit('sitemap', fetch_sitemap, base_url, timeout=min(SITEMAP_TIMEOUT, source_timeout))
+    else:
+        for name in ('website', 'about', 'leadership'):
+            group.skip(name, 'no company_url')
+    print(f"Fetching news for: {company_name}")
+    start('news', fetch_news, company_name)
+    start('wikipedia', fetch_wikipedia, company_name, max_chars=COLLECT_CHARS['wikipedia'])
+
+    # Pick about/leadership/investor pages from the homepage's own links (and
+    # sitemap) instead of probing guessed paths
+    if company_url:
+        group.wait_for('website', 'sitemap')
+        homepage = group.peek('website') or {}
+        pages = discover_pages(base_url, homepage.get('links', []), group.peek('sitemap', []),
+                               per_kind=DISCOVERY_CANDIDATES)
+        print(f"Discovered pages: {pages}")
+        source_timeout = group.slice(SCRAPE_SOURCE_TIMEOUT)
+        start('about', fetch_first, pages['about'] or [base_url + '/about'],
+              max_chars=COLLECT_CHARS['about'])
+        if source_timeout < SCRAPE_MIN_SOURCE_SECONDS:
+            group.skip('leadership', 'no time left in invocation')
+        elif pages['leadership']:
+            start('leadership', fetch_first, pages['leadership'], max_chars=COLLECT_CHARS['leadership'])
+        else:
+            group.submit_race('leadership', [
+                lambda url=base_url + path: fetch_page(url, max_chars=COLLECT_CHARS['leadership'],
+                                                     timeout=source_timeout)
+                for path in LEADERSHIP_PATHS
+            ])
+        if pages['investors']:
+            start('investors', fetch_first, pages['investors'], max_chars=COLLECT_CHARS['investors'])
+
+    sources = group.collect()
+    source_status = group.report
+
+    for name, entry in source_status.items():
+        print(f"Source {name}: {entry['status']} ({entry['elapsed_ms']}ms) {entry.get('error', '')}")
+
+    # Sections in priority order: when two sources share a passage, the earlier one keeps it
+    sections = []
+
+    # Source 1: Main company website
+    if company_url:
+        website_content = (sources['website'] or {}).get('text') or \
+            f"Could not scrape {company_url}: {source_status['website'].get('error', source_status['website']['status'])}"
+        sections.append(('website', "FROM COMPANY WEBSITE (Homepage):", website_content))
 
         # Source 2: About page
-        about_url = company_url.rstrip('/') + '/about'
-        about_content = scrape_url(about_url, max_chars=1500)
-        if "Could not scrape" not in about_content:
-            scraped_text += f"FROM ABOUT PAGE:\n{about_content}\n\n"
+        if sources['about']:
+            sections.append(('about', "FROM ABOUT PAGE:", sources['about']))
 
         # Source 3: Leadership/Team page
-        for path in ['/team', '/leadership', '/about/leadership', '/about/team']:
-            leadership_url = company_url.rstrip('/') + path
-            leadership_content = scrape_url(leadership_url, max_chars=1000)
-            if "Could not scrape" not in leadership_content:
-                scraped_text += f"FROM LEADERSHIP PAGE:\n{leadership_content}\n\n"
-                break
+        if sources['leadership']:
+            sections.append(('leadership', "FROM LEADERSHIP PAGE:", sources['leadership']))
+
+        # Source 3b: Investor relations page (only when the site links one)
+        if sources.get('investors'):
+            sections.append(('investors', "FROM INVESTOR RELATIONS PAGE:", sources['investors']))
 
     # Source 4: Google News
-    print(f"Fetching news for: {company_name}")
-    news = get_google_news(company_name)
-    scraped_text += f"RECENT NEWS:\n{news}\n\n"
+    news = sources['news'] or f"News unavailable: {source_status['news'].get('error', source_status['news']['status'])}"
+    sections.append(('news', "RECENT NEWS:", news))
 
     # Source 5: Wikipedia attempt
-    wiki_query = urllib.parse.quote(company_name.replace(' ', '_'))
-    wiki_url = f"https://en.wikipedia.org/wiki/{wiki_query}"
-    wiki_content = scrape_url(wiki_url, max_chars=2000)
-    if "Could not scrape" not in wiki_content and "Wikipedia does not have" not in wiki_content:
-        scraped_text += f"FROM WIKIPEDIA:\n{wiki_content}\n\n"
+    if sources['wikipedia']:
+        sections.append(('wikipedia', "FROM WIKIPEDIA:", sources['wikipedia']))
+
+    packed, source_tokens = pack_sources(sections)
+    print(f"Packed tokens per source: {source_tokens}")
+    scraped_text += packed + "\n\n"
 
     logo_url = get_company_logo_url(company_url) if company_url else ""
 
-    result = {
+    output = {
+        'scraped_content': scraped_text,
+        'company_name': company_name,
+        'logo_url': logo_url,
+        'sources_scraped': [name for name, entry in source_status.items() if entry['status'] == STATUS_OK],
+        'sources': source_status,
+        'source_tokens': source_tokens
+    }
+    print(f"Scraping complete. Total chars: {len(scraped_text)}")
+
+    # Invoked by the pipeline (fused /generate): hand the content over through S3
+    # and return only the key. Only direct invocations may choose the key.
+    if output_key:
+        s3.put_object(Bucket=BUCKET_NAME, Key=output_key, Body=json.dumps(output), ContentType='application/json')
+        output = {key: value for key, value in output.items() if key != 'scraped_content'}
+        output.update({'output_key': output_key, 'chars': len(scraped_text)})
+
+    return {
         'statusCode': 200,
         'headers': {
             'Access-Control-Allow-Origin': '*',
             'Content-Type': 'application/json'
         },
-        'body': json.dumps({
-            'scraped_content': scraped_text,
-            'company_name': company_name,
-            'logo_url': logo_url,
-            'sources_scraped': ['website', 'about', 'news', 'wikipedia']
-        })
+        'body': json.dumps(output)
     }
-
-    print(f"Scraping complete. Total chars: {len(scraped_text)}")
-    return result
@@ -0,0 +1,23 @@
+"""
+Shared fixtures for the unit tests.
+"""
+import pytest
+
+
+class FakeClock:
+    """Manually advanced time source; pass it as `clock` and its `sleep` as `sleep`."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    """A FakeClock starting at 0."""
+    return FakeClock()
@@ -0,0 +1,97 @@
+"""
+Unit tests for the resumable batch runner.
+"""
+import threading
+import time
+from backend.utils.batch_runner import STATUS_SUBMITTED, BatchState, run_batch
+
+
+def _key(item):
+    return item['company_name'].lower()
+
+
+def test_run_batch_records_done_and_failed(tmp_path):
+    """Test that outcomes are persisted per item."""
+    def worker(item):
+        if item['company_name'] == 'Bad Co':
+            raise RuntimeError("scrape failed")
+        return {'interview_id': item['company_name'][:3].upper()}
+
+    state = BatchState(str(tmp_path / 'state.jsonl'))
+    summary = run_batch(
+        [{'company_name': 'H-E-B'}, {'company_name': 'Bad Co'}],
+        worker, state, key_fn=_key, concurrency=2
+    )
+    assert summary['done'] == ['h-e-b']
+    assert summary['failed'] == ['bad co']
+
+    reloaded = BatchState(str(tmp_path / 'state.jsonl'))
+    assert reloaded.status('h-e-b') == 'done'
+    assert reloaded.status('bad co') == 'failed'
+    assert reloaded.records['bad co']['error'] == 'scrape failed'
+
+
+def test_run_batch_resumes_and_retries_failures(tmp_path):
+    """Test that completed items are skipped and failures retried on request."""
+    path = str(tmp_path / 'state.jsonl')
+    state = BatchState(path)
+    state.record('a', 'done', result={})
+    state.record('b', 'failed', error='boom')
+
+    calls = []
+    summary = run_batch(
+        [{'company_name': 'A'}, {'company_name': 'B'}],
+        lambda item: calls.append(item['company_name']),
+        BatchState(path), key_fn=_key
+    )
+    assert calls == []
+    assert sorted(summary['skipped']) == ['a', 'b']
+
+    summary = run_batch(
+        [{'company_name': 'A'}, {'company_name': 'B'}],
+        lambda item: calls.append(item['company_name']),
+        BatchState(path), key_fn=_key, retry_failed=True
+    )
+    assert calls == ['B']
+    assert summary['done'] == ['b']
+    assert BatchState(path).attempts('b') == 2
+
+
+def test_checkpoints_survive_restarts_and_failures(tmp_path):
+    """Test that a submitted item is rerun with its checkpoint, which later records keep."""
+    path = str(tmp_path / 'state.jsonl')
+    BatchState(path).record('a', STATUS_SUBMITTED, checkpoint={'interview_id': 'A1B2C3D4'})
+
+    seen = []
+    state = BatchState(path)
+    assert state.attempts('a') == 0
+
+    def worker(item):
+        seen.append(state.checkpoint(_key(item)))
+        raise RuntimeError("pipeline failed")
+
+    summary = run_batch([{'company_name': 'A'}], worker, state, key_fn=_key)
+    assert seen == [{'interview_id': 'A1B2C3D4'}]
+    assert summary['failed'] == ['a']
+    reloaded = BatchState(path)
+    assert reloaded.checkpoint('a') == {'interview_id': 'A1B2C3D4'}
+    assert reloaded.attempts('a') == 1
+
+
+def test_run_batch_bounds_concurrency(tmp_path):
+    """Test that no more than `concurrency` workers run at once."""
+    lock = threading.Lock()
+    active = [0]
+    peak = [0]
+
+    def worker(item):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+
+    items = [{'company_name': f'Company {i}'} for i in range(8)]
+    run_batch(items, worker, BatchState(str(tmp_path / 's.jsonl')), key_fn=_key, concurrency=3)
+    assert peak[0] <= 3
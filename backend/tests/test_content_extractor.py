@@ -0,0 +1,51 @@
+"""
+Unit tests for boilerplate-aware content extraction.
+"""
+import io
+import json
+from pathlib import Path
+import pytest
+from backend.utils.content_extractor import ContentExtractor, extract_content
+from backend.utils.html_stream import stream_extract
+
+FIXTURES = Path(__file__).parent / 'fixtures' / 'extraction'
+PAGES = sorted(p.stem for p in FIXTURES.glob('*.html'))
+
+
+@pytest.mark.parametrize('page', PAGES)
+def test_corpus_keeps_content_and_drops_boilerplate(page):
+    """Test every saved page against its expected useful and boilerplate phrases."""
+    html = (FIXTURES / f'{page}.html').read_text()
+    expected = json.loads((FIXTURES / f'{page}.json').read_text())
+    text = extract_content(html, max_chars=3000)
+    for phrase in expected['useful']:
+        assert phrase in text, f"missing useful text: {phrase}"
+    for phrase in expected['boilerplate']:
+        assert phrase not in text, f"boilerplate leaked: {phrase}"
+
+
+def test_nested_skip_tags_do_not_leak():
+    """Test that closing an inner skipped element keeps the outer one skipped."""
+    html = ('<nav><form><input></form><a href="/">Home</a><a href="/shop">Shop all departments</a></nav>'
+            '<p>Lone Star Grocers operates more than 340 stores across Texas and northern Mexico today.</p>')
+    text = extract_content(html)
+    assert 'Shop all departments' not in text
+    assert 'more than 340 stores' in text
+
+
+def test_main_content_comes_before_short_blocks():
+    """Test that body text is emitted first when the budget is tight."""
+    html = ('<div>Open 24 hours</div><div>Call 555-0100</div>'
+            '<p>The company was founded in 1905 in Kerrville and now runs stores in over 300 Texas communities.</p>')
+    text = extract_content(html, max_chars=60)
+    assert text.startswith('The company was founded in 1905')
+
+
+def test_streaming_stops_after_enough_main_content():
+    """Test the `chars` counter used by stream_extract to stop downloading."""
+    paragraph = '<p>Distribution center {} supplies stores from Laredo to Lubbock every day of the week.</p>'
+    page = ('<html><body>' + ''.join(paragraph.format(i) for i in range(5000)) + '</body></html>').encode('utf-8')
+    response = io.BytesIO(page)
+    parser = stream_extract(response, ContentExtractor(), max_chars=3000, chunk_size=4096)
+    assert response.tell() < len(page) // 10
+    assert parser.chars >= 3000
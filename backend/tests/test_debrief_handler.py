@@ -0,0 +1,74 @@
+"""
+Handler-level tests for GET /brief/{id} progress in the debrief Lambda, with DynamoDB and S3 stubbed.
+"""
+import importlib.util
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('boto3')
+
+BACKEND = Path(__file__).resolve().parents[1]
+_spec = importlib.util.spec_from_file_location('debrief_lambda', BACKEND / 'lambda_debrief' / 'lambda_function.py')
+debrief = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(debrief)
+
+FULL = ['synthesis', 'texas', 'questions', 'gaps', 'assembly', 'schema']
+
+
+class MissingS3:
+    """S3 stand-in holding no objects."""
+
+    def get_object(self, Bucket, Key):
+        raise KeyError(Key)
+
+
+@pytest.fixture
+def items(monkeypatch):
+    """Interview items served by the stubbed axis-interviews table."""
+    items = {}
+    table = SimpleNamespace(get_item=lambda Key: {'Item': items.get(Key['interview_id'])})
+    monkeypatch.setattr(debrief, 'dynamodb', SimpleNamespace(Table=lambda name: table))
+    monkeypatch.setattr(debrief, 's3', MissingS3())
+    return items
+
+
+def progress(interview_id):
+    response = debrief.lambda_handler({'pathParameters': {'id': interview_id}, 'httpMethod': 'GET'}, None)
+    assert response['statusCode'] == 200
+    return json.loads(response['body'])['progress']
+
+
+def stages(**statuses):
+    return {name: {'status': status} for name, status in statuses.items()}
+
+
+def test_progress_totals_follow_the_runs_stage_list(items):
+    """Test that express and fused-scrape runs report against their own stage count."""
+    items['EXPRESS1'] = {'interview_id': 'EXPRESS1', 'status': 'generating', 'stage_names': ['express'],
+                         'stages': stages(express='running')}
+    items['FUSED001'] = {'interview_id': 'FUSED001', 'status': 'generating', 'stage_names': ['scrape'] + FULL,
+                         'stages': stages(scrape='complete', synthesis='complete', texas='complete',
+                                          questions='running')}
+    assert progress('EXPRESS1') == {'completed_stages': 0, 'total_stages': 1, 'running': ['express'], 'failed': []}
+    assert progress('FUSED001')['completed_stages'] == 3
+    assert progress('FUSED001')['total_stages'] == 7
+
+
+def test_progress_ignores_stages_of_an_earlier_run(items):
+    """Test that stage entries outside the current run's list do not count as completed."""
+    items['REGEN001'] = {'interview_id': 'REGEN001', 'status': 'generating', 'stage_names': ['express'],
+                         'stages': stages(synthesis='complete', texas='complete', express='complete')}
+    assert progress('REGEN001')['completed_stages'] == 1
+    assert progress('REGEN001')['total_stages'] == 1
+
+
+def test_items_without_a_stage_list_assume_a_full_run(items):
+    """Test that items written before stage_names existed report against the six full-run stages."""
+    items['LEGACY01'] = {'interview_id': 'LEGACY01', 'status': 'generating',
+                         'stages': stages(synthesis='complete', texas='failed')}
+    assert progress('LEGACY01') == {
+        'completed_stages': 1, 'total_stages': 6, 'running': [], 'failed': ['texas']
+    }
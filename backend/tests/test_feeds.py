@@ -0,0 +1,116 @@
+"""
+Unit tests for streaming RSS/Atom parsing.
+"""
+import pytest
+import xml.etree.ElementTree as ET
+from backend.utils.feeds import dedupe_items, iter_feed_items, read_feed
+
+RSS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel>
+<title>"H-E-B" - Google News</title>
+<item>
+  <title>H-E-B opens new store in Temple - KWTX</title>
+  <link>https://news.example.com/1</link>
+  <pubDate>Mon, 09 Feb 2026 14:00:00 GMT</pubDate>
+  <description>&lt;a href="https://kwtx.com/x"&gt;H-E-B opens new store in Temple&lt;/a&gt;</description>
+  <source url="https://kwtx.com">KWTX</source>
+</item>
+<item>
+  <title>H-E-B expands curbside delivery - Houston Chronicle</title>
+  <link>https://news.example.com/2</link>
+  <pubDate>Wed, 11 Feb 2026 09:30:00 GMT</pubDate>
+  <source url="https://houstonchronicle.com">Houston Chronicle</source>
+</item>
+<item>
+  <title>H-E-B opens new store in Temple - Temple Daily Telegram</title>
+  <link>https://news.example.com/3</link>
+  <pubDate>Mon, 09 Feb 2026 16:00:00 GMT</pubDate>
+  <description>Grocer adds 120 jobs.</description>
+  <source url="https://tdtnews.com">Temple Daily Telegram</source>
+</item>
+<item>
+  <title>H-E-B names new chief digital officer - Austin Business Journal</title>
+  <link>https://news.example.com/4</link>
+  <pubDate>Tue, 03 Feb 2026 10:00:00 GMT</pubDate>
+  <description>Hire follows &amp;quot;digital first&amp;quot; push.</description>
+</item>
+</channel></rss>"""
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Company newsroom</title>
+  <entry>
+    <title>Q4 results</title>
+    <link rel="alternate" href="https://example.com/q4"/>
+    <updated>2026-01-30T12:00:00Z</updated>
+    <summary>Revenue grew 8%.</summary>
+  </entry>
+  <entry>
+    <title>New CEO named</title>
+    <link rel="alternate" href="https://example.com/ceo"/>
+    <updated>2026-02-05T08:00:00Z</updated>
+  </entry>
+</feed>"""
+
+
+def chunked(data, size=37):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+def test_items_keep_their_own_fields():
+    """Test that an item without a description does not shift later pairs."""
+    items = list(iter_feed_items(chunked(RSS)))
+    assert [i['link'] for i in items] == [f'https://news.example.com/{n}' for n in range(1, 5)]
+    assert items[1]['description'] == ''
+    assert items[2]['description'] == 'Grocer adds 120 jobs.'
+    assert items[3]['description'] == 'Hire follows "digital first" push.'
+    assert items[0]['source'] == 'KWTX'
+
+
+def test_read_feed_dedupes_and_sorts_by_recency():
+    """Test syndicated duplicate removal and newest-first ordering."""
+    items = read_feed(chunked(RSS), limit=5)
+    assert [i['link'] for i in items] == [
+        'https://news.example.com/2',
+        'https://news.example.com/1',
+        'https://news.example.com/4',
+    ]
+
+
+def test_atom_entries():
+    """Test Atom link/summary/updated handling."""
+    items = read_feed(chunked(ATOM), limit=1)
+    assert items[0]['title'] == 'New CEO named'
+    assert items[0]['link'] == 'https://example.com/ceo'
+    assert items[0]['published'].year == 2026
+
+
+def test_parsing_stops_after_max_items():
+    """Test that the byte stream is not consumed past the last needed item."""
+    consumed = []
+
+    def tracking(data):
+        for chunk in chunked(data, 64):
+            consumed.append(chunk)
+            yield chunk
+
+    feed = RSS.replace(b'</channel></rss>', b'<item><title>filler</title></item>' * 5000 + b'</channel></rss>')
+    assert len(list(iter_feed_items(tracking(feed), max_items=2))) == 2
+    assert sum(len(c) for c in consumed) < len(RSS)
+
+
+def test_truncated_feed_keeps_complete_items():
+    """Test that a byte-capped feed still yields the items that arrived whole."""
+    cut = RSS[:RSS.index(b'<item>', RSS.index(b'/news.example.com/2'))] + b'<item><title>half'
+    assert len(list(iter_feed_items([cut]))) == 2
+    with pytest.raises(ET.ParseError):
+        list(iter_feed_items([b'<rss><channel><item><title>x']))
+
+
+def test_dedupe_by_link():
+    """Test exact-link duplicates with different titles."""
+    items = [
+        {'title': 'A story', 'link': 'https://x/1', 'source': ''},
+        {'title': 'Completely different', 'link': 'https://x/1', 'source': ''},
+    ]
+    assert len(dedupe_items(items)) == 1
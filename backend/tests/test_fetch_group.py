@@ -0,0 +1,91 @@
+"""
+Unit tests for concurrent deadline-bounded fetching.
+"""
+import threading
+import time
+from backend.utils.fetch_group import FetchGroup, is_timeout
+
+
+def test_fetches_run_concurrently():
+    """Test that independent fetches overlap instead of running back to back."""
+    barrier = threading.Barrier(3, timeout=2)
+
+    def fetch(value):
+        barrier.wait()
+        return value
+
+    group = FetchGroup(timeout=5)
+    for name in ('website', 'news', 'wikipedia'):
+        group.submit(name, fetch, name.upper())
+    assert group.collect() == {'website': 'WEBSITE', 'news': 'NEWS', 'wikipedia': 'WIKIPEDIA'}
+
+
+def test_collect_returns_at_deadline():
+    """Test that a straggler does not hold up the other results."""
+    release = threading.Event()
+    group = FetchGroup(timeout=0.1)
+    group.submit('fast', lambda: 'ok')
+    group.submit('slow', release.wait, 5)
+
+    started = time.monotonic()
+    results = group.collect()
+    release.set()
+    assert time.monotonic() - started < 1
+    assert results == {'fast': 'ok', 'slow': None}
+    assert group.report['fast']['status'] == 'ok'
+    assert group.report['slow']['status'] == 'timeout'
+
+
+def test_failed_fetch_maps_to_default():
+    """Test that an exception in one fetch is contained."""
+    def boom():
+        raise RuntimeError("connection reset")
+
+    group = FetchGroup(timeout=1)
+    group.submit('bad', boom)
+    group.submit('good', lambda: 'text')
+    assert group.collect(default='') == {'bad': '', 'good': 'text'}
+    assert group.report['bad'] == {'status': 'error', 'error': 'connection reset',
+                                   'elapsed_ms': group.report['bad']['elapsed_ms']}
+
+
+def test_race_takes_first_accepted_result():
+    """Test that the fastest acceptable probe wins even if listed last."""
+    def probe(result, delay):
+        return lambda: (time.sleep(delay), result)[1]
+
+    group = FetchGroup(timeout=2)
+    group.submit_race('leadership', [
+        probe('Could not scrape /team', 0.0),
+        probe('Leadership (slow)', 0.5),
+        probe('Leadership (fast)', 0.05),
+    ], accept=lambda r: 'Could not scrape' not in r)
+    assert group.collect()['leadership'] == 'Leadership (fast)'
+
+
+def test_race_without_winner_reports_last_error():
+    """Test the all-probes-failed case."""
+    def not_found():
+        raise OSError("HTTP Error 404: Not Found")
+
+    group = FetchGroup(timeout=1)
+    group.submit_race('leadership', [not_found, not_found])
+    assert group.collect() == {'leadership': None}
+    assert group.report['leadership']['status'] == 'error'
+    assert '404' in group.report['leadership']['error']
+
+
+def test_skipped_sources_and_timeout_classification():
+    """Test skip() and the socket-timeout check used for status."""
+    group = FetchGroup(timeout=1)
+    group.skip('website', 'no company_url')
+    assert group.collect() == {'website': None}
+    assert group.report['website']['status'] == 'skipped'
+
+    class URLError(OSError):
+        def __init__(self, reason):
+            self.reason = reason
+
+    assert is_timeout(TimeoutError())
+    assert is_timeout(URLError(TimeoutError('timed out')))
+    assert not is_timeout(URLError('Name or service not known'))
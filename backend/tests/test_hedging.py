@@ -0,0 +1,112 @@
+"""
+Unit tests for latency-threshold hedging.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.utils.hedging import HedgeStats, LatencyTracker, run_hedged
+
+
+@pytest.fixture
+def executor():
+    pool = ThreadPoolExecutor(max_workers=4)
+    yield pool
+    pool.shutdown(wait=True)
+
+
+def test_threshold_waits_for_samples_and_is_floored():
+    """Test that no threshold exists below min_samples and the learned p90 never drops under the floor."""
+    tracker = LatencyTracker(quantile=0.9, min_samples=5, window=100, min_delay=1.0)
+    for seconds in [2, 3, 4, 5]:
+        tracker.record('m:synthesis', seconds)
+    assert tracker.threshold('m:synthesis') is None
+    for seconds in [6, 7, 8, 9, 10, 11]:
+        tracker.record('m:synthesis', seconds)
+    assert tracker.threshold('m:synthesis') == 10
+    # Keys are independent
+    assert tracker.threshold('m:texas') is None
+
+    fast = LatencyTracker(quantile=0.9, min_samples=1, window=100, min_delay=1.0)
+    fast.record('k', 0.2)
+    assert fast.threshold('k') == 1.0
+
+
+def test_window_forgets_old_samples():
+    """Test that only the most recent `window` samples shape the threshold."""
+    tracker = LatencyTracker(quantile=0.9, min_samples=1, window=3, min_delay=0)
+    for seconds in [30, 30, 30, 1, 1, 1]:
+        tracker.record('k', seconds)
+    assert tracker.threshold('k') == 1
+
+
+def test_fast_primary_is_not_hedged(executor):
+    """Test that a primary finishing inside the threshold never starts the hedge."""
+    hedge_calls = []
+    result = run_hedged(executor, lambda: 'primary', lambda: hedge_calls.append(1), delay=1.0)
+    assert result == ('primary', False, False)
+    assert hedge_calls == []
+
+
+def test_slow_primary_loses_to_hedge(executor):
+    """Test that the hedge answer is returned without waiting for a slow primary."""
+    release = threading.Event()
+
+    def slow_primary():
+        release.wait(5)
+        return 'primary'
+
+    started = time.time()
+    result = run_hedged(executor, slow_primary, lambda: 'hedge', delay=0.05)
+    assert result == ('hedge', True, True)
+    assert time.time() - started < 1
+    release.set()
+
+
+def test_primary_can_still_win_after_hedge_starts(executor):
+    """Test that a hedged primary finishing first is used and the hedge is abandoned."""
+    release = threading.Event()
+
+    def slow_hedge():
+        release.wait(5)
+        return 'hedge'
+
+    def primary():
+        time.sleep(0.1)
+        return 'primary'
+
+    assert run_hedged(executor, primary, slow_hedge, delay=0.02) == ('primary', True, False)
+    release.set()
+
+
+def test_failures_fall_through_to_the_other_request(executor):
+    """Test that a fast primary failure runs the hedge at once, and only a double failure raises."""
+    def failing():
+        raise TimeoutError('primary down')
+
+    assert run_hedged(executor, failing, lambda: 'hedge', delay=5) == ('hedge', False, True)
+
+    def slow_failing():
+        time.sleep(0.1)
+        raise TimeoutError('primary down')
+
+    def hedge_failing():
+        raise ConnectionError('hedge down')
+
+    with pytest.raises((TimeoutError, ConnectionError)):
+        run_hedged(executor, slow_failing, hedge_failing, delay=0.02)
+
+
+def test_hedge_stats_rates():
+    """Test that hedge rate is per call and win rate is per hedge."""
+    stats = HedgeStats()
+    stats.add(hedged=False, hedge_won=False)
+    stats.add(hedged=True, hedge_won=True)
+    stats.add(hedged=True, hedge_won=False)
+    stats.add(hedged=False, hedge_won=False)
+    snapshot = stats.snapshot()
+    assert snapshot['calls'] == 4 and snapshot['hedged'] == 2 and snapshot['hedge_wins'] == 1
+    assert snapshot['hedge_rate'] == 0.5
+    assert snapshot['win_rate'] == 0.5
@@ -0,0 +1,56 @@
+"""
+Unit tests for capped, incremental response reading.
+"""
+import io
+from html.parser import HTMLParser
+from backend.utils.html_stream import read_capped, stream_extract
+
+
+class CountingResponse(io.BytesIO):
+    """BytesIO that records how many bytes were requested from it."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+class ParagraphParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.text = []
+        self.chars = 0
+
+    def handle_data(self, data):
+        if data.strip():
+            self.text.append(data.strip())
+            self.chars += len(data.strip())
+
+
+def test_stream_extract_stops_once_enough_text_is_collected():
+    """Test that a huge page is not downloaded in full."""
+    page = b'<html><body>' + b'<p>Grocery stores across Texas.</p>' * 100000 + b'</body></html>'
+    response = CountingResponse(page)
+    parser = stream_extract(response, ParagraphParser(), max_chars=3000, chunk_size=4096)
+    assert sum(len(t) for t in parser.text) >= 3000
+    assert response.bytes_read < 16 * 1024
+    assert response.bytes_read < len(page)
+
+
+def test_stream_extract_respects_byte_cap():
+    """Test the hard cap on raw bytes when the page yields little text."""
+    page = b'<html>' + b'<div></div>' * 200000 + b'<p>late text</p></html>'
+    response = CountingResponse(page)
+    parser = stream_extract(response, ParagraphParser(), max_chars=3000, max_bytes=64 * 1024, chunk_size=8192)
+    assert response.bytes_read == 64 * 1024
+    assert parser.text == []
+
+
+def test_multibyte_characters_split_across_chunks_survive():
+    """Test incremental decoding of UTF-8 sequences that straddle chunk boundaries."""
+    text = 'Café Olé — San Antonio ' * 50
+    assert read_capped(io.BytesIO(text.encode('utf-8')), chunk_size=7) == text
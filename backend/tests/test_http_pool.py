@@ -0,0 +1,130 @@
+"""
+Unit tests for the keep-alive connection pool, against a local HTTP server.
+"""
+import gzip
+import threading
+import urllib.error
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from backend.utils.html_stream import read_capped
+from backend.utils.http_pool import HTTPPool
+
+BOMB = gzip.compress(b' ' * (16 * 1024 * 1024))
+PAGE = ('<html><body><p>' + 'Lone Star Grocers serves Texas. ' * 200 + '</p></body></html>').encode('utf-8')
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    connections = set()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        Handler.connections.add(self.client_address)
+        accepts = self.headers.get('Accept-Encoding', '')
+        if self.path == '/gzip' and 'gzip' in accepts:
+            self._send(200, gzip.compress(PAGE), {'Content-Encoding': 'gzip'})
+        elif self.path == '/bomb':
+            self._send(200, BOMB, {'Content-Encoding': 'gzip'})
+        elif self.path == '/deflate' and 'deflate' in accepts:
+            raw = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+            self._send(200, raw.compress(PAGE) + raw.flush(), {'Content-Encoding': 'deflate'})
+        elif self.path == '/old-about':
+            self._send(301, b'moved', {'Location': '/about'})
+        elif self.path == '/etag':
+            if self.headers.get('If-None-Match') == '"v1"':
+                self._send(304)
+            else:
+                self._send(200, PAGE, {'ETag': '"v1"'})
+        elif self.path == '/big':
+            self._send(200, PAGE * 20)
+        elif self.path in ('/', '/about'):
+            self._send(200, PAGE, {'Content-Type': 'text/html; charset=utf-8'})
+        else:
+            self._send(404, b'not found')
+
+
+@pytest.fixture
+def server():
+    Handler.connections = set()
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_same_host_requests_reuse_one_connection(server):
+    """Test keep-alive reuse across sequential same-host fetches, including 404s."""
+    pool = HTTPPool()
+    for path in ('/', '/about', '/team'):
+        try:
+            with pool.get(server + path) as response:
+                assert read_capped(response) == PAGE.decode('utf-8')
+        except urllib.error.HTTPError as e:
+            assert e.code == 404
+    assert pool.stats == {'opened': 1, 'reused': 2}
+    assert len(Handler.connections) == 1
+    pool.close()
+
+
+@pytest.mark.parametrize('path', ['/gzip', '/deflate'])
+def test_compressed_bodies_are_decoded_incrementally(server, path):
+    """Test gzip and raw-deflate decoding with small reads."""
+    pool = HTTPPool()
+    with pool.get(server + path) as response:
+        assert read_capped(response, chunk_size=100) == PAGE.decode('utf-8')
+    assert pool.get(server + '/').read() == PAGE
+    assert pool.stats['reused'] == 1
+
+
+def test_decoding_stops_at_the_read_size(server):
+    """Test that a highly compressed body is only inflated as far as each read asks."""
+    pool = HTTPPool()
+    with pool.get(server + '/bomb') as response:
+        assert response.read(1000) == b' ' * 1000
+        assert len(response._buffer) == 0
+        assert response.read(500) == b' ' * 500
+        assert len(response._buffer) == 0
+
+
+def test_redirects_and_not_modified(server):
+    """Test redirect following and the 304 path the scrape cache relies on."""
+    pool = HTTPPool()
+    response = pool.get(server + '/old-about')
+    assert response.url == server + '/about'
+    assert response.read() == PAGE
+
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        pool.get(server + '/etag', headers={'If-None-Match': '"v1"'})
+    assert excinfo.value.code == 304
+    assert pool.stats['opened'] == 1
+
+
+def test_partly_read_body_is_drained_or_dropped(server):
+    """Test that an abandoned response never poisons the pool."""
+    pool = HTTPPool()
+    small = pool.get(server + '/')
+    small.read(10)
+    small.close()
+    pool.get(server + '/about').read()
+    # The small remainder was drained, so the connection was reused
+    assert pool.stats == {'opened': 1, 'reused': 1}
+
+    big = pool.get(server + '/big')
+    big.read(10)
+    big.close()
+    assert pool.get(server + '/').read() == PAGE
+    # Too much left to drain: that connection was closed and a new one opened
+    assert pool.stats == {'opened': 2, 'reused': 2}
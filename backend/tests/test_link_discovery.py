@@ -0,0 +1,70 @@
+"""
+Unit tests for about/leadership/investor page discovery.
+"""
+from pathlib import Path
+from backend.utils.content_extractor import ContentExtractor
+from backend.utils.link_discovery import discover_pages, parse_sitemap, rank_links
+
+FIXTURES = Path(__file__).parent / 'fixtures' / 'extraction'
+
+
+def test_homepage_anchors_yield_about_page():
+    """Test discovery from real anchors, including ones in skipped nav/footer markup."""
+    parser = ContentExtractor()
+    parser.feed((FIXTURES / 'corporate_homepage.html').read_text())
+    assert ('/about', 'About Us') in parser.links
+
+    pages = discover_pages('https://www.lonestargrocers.com', parser.links)
+    assert pages['about'] == ['https://www.lonestargrocers.com/about']
+    assert pages['leadership'] == []
+
+
+def test_ranking_prefers_text_and_shallow_paths():
+    """Test scoring by anchor text, path pattern and depth."""
+    links = [
+        ('/about/leadership/maria-delgado', 'Maria Delgado'),
+        ('/who-we-are/leadership', 'Leadership'),
+        ('/company/executive-team', 'Our executive team'),
+        ('https://twitter.com/lonestar', 'Follow our team'),
+        ('/leadership-report.pdf', 'Leadership report'),
+        ('/investors', 'Investor Relations'),
+        ('#team', 'Team'),
+    ]
+    ranked = rank_links('https://lonestar.com', links)
+    assert ranked['leadership'][:2] == ['https://lonestar.com/who-we-are/leadership',
+                                        'https://lonestar.com/company/executive-team']
+    assert 'https://lonestar.com/about/leadership/maria-delgado' in ranked['leadership']
+    assert all('twitter.com' not in url and not url.endswith('.pdf') for url in ranked['leadership'])
+    assert ranked['investors'] == ['https://lonestar.com/investors']
+
+
+def test_sitemap_urls_fill_in_missing_links():
+    """Test that sitemap paths add candidates the homepage does not link."""
+    xml = ('<?xml version="1.0"?><urlset>'
+           '<url><loc>https://www.lonestar.com/our-story</loc></url>'
+           '<url><loc> https://www.lonestar.com/people/leadership </loc></url>'
+           '<url><loc>https://www.lonestar.com/products?a=1&amp;b=2</loc></url>'
+           '</urlset>')
+    urls = parse_sitemap(xml)
+    assert urls[2] == 'https://www.lonestar.com/products?a=1&b=2'
+
+    pages = discover_pages('https://lonestar.com', [('/contact', 'Contact')], urls)
+    assert pages['leadership'] == ['https://www.lonestar.com/people/leadership']
+    assert pages['about'] == ['https://www.lonestar.com/our-story']
+
+
+def test_one_url_is_not_fetched_for_two_kinds():
+    """Test that a page matching both kinds goes to leadership, not about."""
+    pages = discover_pages('https://x.com', [('/about/team', 'About our team'), ('/about', 'About')])
+    assert pages['leadership'][0] == 'https://x.com/about/team'
+    assert pages['about'][0] == 'https://x.com/about'
+
+
+def test_fallback_picks_are_not_reused_for_another_kind():
+    """Test that a URL chosen as one kind's second candidate is not offered to another kind."""
+    links = [('/leadership', 'Leadership'), ('/about/team', 'About our team'), ('/about', 'About')]
+    pages = discover_pages('https://x.com', links)
+    assert pages['leadership'] == ['https://x.com/leadership', 'https://x.com/about/team']
+    assert 'https://x.com/about/team' not in pages['about']
+    chosen = [url for urls in pages.values() for url in urls]
+    assert len(chosen) == len(set(chosen))
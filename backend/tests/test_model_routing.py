@@ -0,0 +1,54 @@
+"""
+Unit tests for per-stage model routing and cost estimates.
+"""
+import pytest
+
+from backend.utils.model_routing import Route, estimate_cost, load_routing, resolve_route
+
+STRONG = 'strong-model'
+BACKUP = 'backup-model'
+FAST = 'fast-model'
+DEFAULT = Route(STRONG, [BACKUP], max_tokens=4000)
+ROUTING = {
+    'synthesis': {'model': STRONG, 'fallbacks': [BACKUP], 'max_tokens': 3000},
+    'schema': {'model': FAST, 'fallbacks': [STRONG], 'max_tokens': 2000},
+}
+
+
+def test_route_chain_never_repeats_a_model():
+    """Test that the routed model and duplicate fallbacks are dropped from the fallback chain."""
+    route = Route(FAST, [FAST, STRONG, STRONG, BACKUP])
+    assert route.models == [FAST, STRONG, BACKUP]
+
+
+def test_resolve_route_uses_table_then_default():
+    """Test that routed stages get their model, chain and limit, and unknown stages the default."""
+    schema = resolve_route('schema', DEFAULT, ROUTING)
+    assert schema.models == [FAST, STRONG]
+    assert schema.max_tokens == 2000
+    assert resolve_route('debrief', DEFAULT, ROUTING) is DEFAULT
+    assert resolve_route(None, DEFAULT, ROUTING) is DEFAULT
+
+
+def test_partial_entry_inherits_default_chain_and_limit():
+    """Test that an entry naming only a model keeps the default's fallbacks and max_tokens."""
+    route = resolve_route('gaps', DEFAULT, {'gaps': {'model': FAST}})
+    assert route.models == [FAST, STRONG, BACKUP]
+    assert route.max_tokens == 4000
+
+
+def test_overrides_merge_per_key():
+    """Test that JSON overrides replace only the keys they name and can add stages."""
+    routing = load_routing(ROUTING, '{"synthesis": {"model": "fast-model"}, "express": {"max_tokens": 100}}')
+    assert routing['synthesis'] == {'model': FAST, 'fallbacks': [BACKUP], 'max_tokens': 3000}
+    assert routing['express'] == {'max_tokens': 100}
+    # The base table is not modified
+    assert ROUTING['synthesis']['model'] == STRONG
+    assert load_routing(ROUTING, '') == ROUTING
+
+
+def test_estimate_cost():
+    """Test that cost is priced per thousand input and output tokens, and unknown models have none."""
+    prices = {FAST: {'input': 0.001, 'output': 0.005}}
+    assert estimate_cost(FAST, 2000, 1000, prices) == pytest.approx(0.007)
+    assert estimate_cost(STRONG, 2000, 1000, prices) is None
@@ -0,0 +1,90 @@
+"""
+Unit tests for cross-source deduplication and token-budgeted packing.
+"""
+from backend.utils.packing import informativeness, is_near_duplicate, pack_sources, shingles, split_passages
+from backend.utils.payloads import estimate_tokens
+
+SHARED = ("H-E-B was founded in 1905 in Kerrville, Texas by Florence Butt and is headquartered "
+          "in San Antonio with more than 145,000 employees.")
+
+
+def test_split_passages_groups_sentences_up_to_limit():
+    """Test that sentences are grouped into passages no longer than the limit, and lines never merge."""
+    text = "First sentence here. Second sentence here. Third sentence here.\nA new line."
+    passages = split_passages(text, max_chars=45)
+    assert passages == ["First sentence here. Second sentence here.", "Third sentence here.", "A new line."]
+
+
+def test_split_passages_cuts_oversized_sentences_on_words():
+    """Test that a sentence longer than the limit is cut on word boundaries, and an overlong word mid-word."""
+    text = "Stores in Austin Dallas Houston San Antonio El Paso and Waco " + "x" * 25
+    passages = split_passages(text, max_chars=20)
+    assert all(len(p) <= 20 for p in passages)
+    assert passages[:3] == ["Stores in Austin", "Dallas Houston San", "Antonio El Paso and"]
+    assert ''.join(passages).replace(' ', '') == text.replace(' ', '')
+
+
+def test_near_duplicate_detects_overlap_and_containment():
+    """Test that reworded copies and passages quoted inside longer ones count as duplicates."""
+    reworded = SHARED.replace("more than", "over")
+    longer = SHARED + " The company operates stores across Texas and Mexico and runs its own dairy."
+    unrelated = "Our weekly ad features fresh produce, bakery specials and digital coupons for members."
+    assert is_near_duplicate(shingles(SHARED), shingles(reworded))
+    assert is_near_duplicate(shingles(SHARED), shingles(longer))
+    assert not is_near_duplicate(shingles(SHARED), shingles(unrelated))
+
+
+def test_informativeness_prefers_facts_over_marketing():
+    """Test that a passage with names, numbers and fact words outranks generic copy of similar length."""
+    marketing = "We are passionate about quality and we love to serve you and your family every day with a smile."
+    assert informativeness(SHARED) > informativeness(marketing)
+
+
+def test_pack_drops_duplicates_across_sources_keeping_earliest():
+    """Test that a paragraph repeated by a later source is kept only under the first source."""
+    packed, used = pack_sources([
+        ('website', 'FROM COMPANY WEBSITE (Homepage):', SHARED),
+        ('wikipedia', 'FROM WIKIPEDIA:', SHARED + "\nThe chain is privately held by the Butt family."),
+    ], budget_tokens=1000, quotas={'website': 0.5, 'wikipedia': 0.5})
+    assert packed.count("founded in 1905") == 1
+    assert packed.index('FROM COMPANY WEBSITE') < packed.index("founded in 1905") < packed.index('FROM WIKIPEDIA')
+    assert "privately held" in packed
+    assert used['website'] == estimate_tokens(SHARED)
+
+
+def test_pack_respects_budget_and_quotas():
+    """Test that the packed text fits the budget and a long source cannot crowd out a short one's quota."""
+    long_source = "\n".join(f"Store {i} opened in Austin, Texas in {1990 + i} with {i * 10} employees." for i in range(60))
+    news = "- H-E-B announces $100 million distribution center in Houston (2026-02-01)"
+    packed, used = pack_sources([
+        ('website', 'FROM COMPANY WEBSITE (Homepage):', long_source),
+        ('news', 'RECENT NEWS:', news),
+    ], budget_tokens=200, quotas={'website': 0.8, 'news': 0.2})
+    assert sum(used.values()) <= 200
+    assert "RECENT NEWS:\n" + news in packed
+    assert used['website'] > 0.8 * 200 * 0.5
+
+
+def test_pack_gives_unused_quota_to_other_sources():
+    """Test that budget a source does not need is filled with other sources' best passages."""
+    body = "\n".join(f"Plant {i} in Dallas produces {i * 3} million units for customers in {i + 2} states." for i in range(20))
+    packed, used = pack_sources([
+        ('website', 'FROM COMPANY WEBSITE (Homepage):', body),
+        ('about', 'FROM ABOUT PAGE:', "Founded in 1950."),
+    ], budget_tokens=300, quotas={'website': 0.3, 'about': 0.7})
+    assert used['about'] == estimate_tokens("Founded in 1950.")
+    assert used['website'] > 0.3 * 300
+    # Selected passages keep their original order within a source
+    lines = packed.split('\n')
+    numbers = [int(line.split()[1]) for line in lines if line.startswith('Plant ')]
+    assert numbers == sorted(numbers)
+
+
+def test_pack_omits_empty_sections():
+    """Test that sources with no text produce no header."""
+    packed, used = pack_sources([
+        ('website', 'FROM COMPANY WEBSITE (Homepage):', ''),
+        ('news', 'RECENT NEWS:', 'No recent news found.'),
+    ], budget_tokens=100)
+    assert packed == "RECENT NEWS:\nNo recent news found."
+    assert used == {'website': 0, 'news': estimate_tokens('No recent news found.')}
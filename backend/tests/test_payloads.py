@@ -0,0 +1,46 @@
+"""
+Unit tests for inter-stage payload normalization.
+"""
+import json
+from backend.utils.payloads import compact_stage_output, estimate_tokens, extract_json, prune_empty
+
+
+def test_extract_json_ignores_fences_and_preamble():
+    """Test parsing JSON wrapped in markdown and chatter."""
+    text = 'Here is the profile:\n```json\n{\n  "company_name": "H-E-B"\n}\n```\nLet me know!'
+    assert extract_json(text) == {'company_name': 'H-E-B'}
+    assert extract_json('Sure. {"a": [1, 2]} Done.') == {'a': [1, 2]}
+    assert extract_json('no json here') is None
+
+
+def test_prune_empty_drops_placeholders_recursively():
+    """Test removal of empty and "Unknown" fields."""
+    data = {
+        'founded': 'Unknown',
+        'headquarters': 'San Antonio, TX',
+        'recent_news': [],
+        'key_leadership': [{'name': 'Charles Butt', 'title': '', 'background': 'unknown'}],
+        'tamu_connection': {'known_alumni_at_company': 'Unknown unless confirmed'},
+        'employee_count': 0,
+    }
+    assert prune_empty(data) == {
+        'headquarters': 'San Antonio, TX',
+        'key_leadership': [{'name': 'Charles Butt'}],
+        'employee_count': 0,
+    }
+
+
+def test_compact_stage_output_minifies_json():
+    """Test that compacted output is smaller and still equivalent JSON."""
+    raw = '```json\n' + json.dumps({'company_name': 'H-E-B', 'founded': 'Unknown', 'segments': ['grocery']}, indent=2) + '\n```'
+    compact, parsed = compact_stage_output(raw)
+    assert parsed
+    assert compact == '{"company_name":"H-E-B","segments":["grocery"]}'
+    assert estimate_tokens(compact) < estimate_tokens(raw)
+
+
+def test_compact_stage_output_passes_through_non_json():
+    """Test that free text is left alone."""
+    compact, parsed = compact_stage_output('  Error calling Bedrock: throttled  ')
+    assert not parsed
+    assert compact == 'Error calling Bedrock: throttled'
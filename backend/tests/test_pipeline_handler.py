@@ -0,0 +1,257 @@
+"""
+Handler-level tests for the pipeline Lambda, with Bedrock, S3, DynamoDB and Lambda stubbed.
+"""
+import importlib
+import importlib.util
+import io
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('boto3')
+
+BACKEND = Path(__file__).resolve().parents[1]
+# The Lambda imports its helpers as utils.* and config, as inside its deployment zip
+sys.path.insert(0, str(BACKEND))
+
+
+def load_pipeline():
+    spec = importlib.util.spec_from_file_location('pipeline_lambda', BACKEND / 'lambda_pipeline' / 'lambda_function.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+pipeline = load_pipeline()
+
+OUTPUTS = {
+    'synthesis': '{"company": "Lone Star Grocers", "sector": "retail"}',
+    'texas': '{"texas_footprint": "Austin"}',
+    'questions': '{"interviewee_questions": ["What comes next?"]}',
+    'gaps': '{"critical_unknowns": ["Margins"]}',
+    'assembly': 'Interviewer brief ===INTERVIEWEE_EMAIL=== Interviewee email',
+    'schema': '{"sector": "retail"}',
+    'express': 'Express brief ===INTERVIEWEE_EMAIL=== Hi ===EXPRESS_DATA=== {"top_gaps": ["Margins"]}',
+}
+
+
+class FakeS3:
+    """In-memory stand-in for the S3 calls the pipeline makes."""
+
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body, ContentType=None):
+        self.objects[Key] = Body.encode('utf-8') if isinstance(Body, str) else Body
+
+    def get_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise KeyError(Key)
+        return {'Body': io.BytesIO(self.objects[Key])}
+
+    def text(self, key):
+        return self.objects[key].decode('utf-8')
+
+
+class FakeTable:
+    """In-memory axis-interviews table understanding the SET / REMOVE expressions the pipeline writes."""
+
+    def __init__(self):
+        self.items = {}
+
+    def put_item(self, Item):
+        self.items[Item['interview_id']] = dict(Item)
+
+    def get_item(self, Key):
+        return {'Item': self.items.get(Key['interview_id'])}
+
+    def update_item(self, Key, UpdateExpression, ExpressionAttributeNames, ExpressionAttributeValues):
+        item = self.items.setdefault(Key['interview_id'], {'interview_id': Key['interview_id']})
+        set_part, _, remove_part = UpdateExpression.partition(' REMOVE ')
+        for assignment in set_part[len('SET '):].split(', '):
+            path, value = assignment.split(' = ')
+            *parents, name = [ExpressionAttributeNames.get(p, p) for p in path.split('.')]
+            target = item
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[name] = ExpressionAttributeValues[value]
+        for name in filter(None, remove_part.split(', ')):
+            item.pop(ExpressionAttributeNames[name], None)
+
+    def query(self, **kwargs):
+        return {'Items': []}
+
+
+class FakeLambda:
+    """Records invocations; the scraper writes its output to S3 like the real one."""
+
+    def __init__(self, s3):
+        self.s3 = s3
+        self.invocations = []
+
+    def invoke(self, FunctionName, InvocationType, Payload):
+        event = json.loads(Payload)
+        self.invocations.append((InvocationType, event))
+        if InvocationType == 'Event':
+            return {'StatusCode': 202}
+        self.s3.put_object(None, event['output_key'], json.dumps({'scraped_content': 'Scraped: Lone Star Grocers'}))
+        body = json.dumps({'logo_url': 'https://logo.example/lsg', 'sources_scraped': ['website']})
+        return {'Payload': io.BytesIO(json.dumps({'statusCode': 200, 'body': body}).encode('utf-8'))}
+
+
+class FakeContext:
+    function_name = 'axis-pipeline'
+
+
+@pytest.fixture
+def aws(monkeypatch):
+    """Stub every AWS dependency of the pipeline; Bedrock answers from OUTPUTS and records each stage."""
+    s3 = FakeS3()
+    table = FakeTable()
+    stub = SimpleNamespace(s3=s3, table=table, lambda_client=FakeLambda(s3), calls=[], prompts={}, fail=set())
+
+    def call_bedrock(prompt, temperature=0.3, max_tokens=None, prefix=None, call_name=None):
+        stub.calls.append(call_name)
+        stub.prompts[call_name] = prompt
+        if call_name in stub.fail:
+            stub.fail.discard(call_name)
+            raise RuntimeError(f"All Bedrock models failed for {call_name}")
+        return OUTPUTS[call_name]
+
+    def call_bedrock_stream(prompt, temperature=0.3, max_tokens=None, on_progress=None, prefix=None, call_name=None):
+        output = call_bedrock(prompt, temperature, max_tokens, prefix, call_name)
+        (on_progress or (lambda text: None))(output)
+        return output
+
+    monkeypatch.setattr(pipeline, 's3', s3)
+    monkeypatch.setattr(pipeline, 'lambda_client', stub.lambda_client)
+    monkeypatch.setattr(pipeline, 'get_table', lambda name: table)
+    monkeypatch.setattr(pipeline, 'call_bedrock', call_bedrock)
+    monkeypatch.setattr(pipeline, 'call_bedrock_stream', call_bedrock_stream)
+    monkeypatch.setattr(pipeline, 'SYNTHESIS_PROMPT', 'Research: {{SCRAPED_CONTENT}} Notes: {{TAMU_UPLOADED_NOTES}}')
+    return stub
+
+
+def generate(**body):
+    response = pipeline.lambda_handler({'body': json.dumps(body)}, FakeContext())
+    return response['statusCode'], json.loads(response['body'])
+
+
+def test_region_list_tolerates_spaces(monkeypatch):
+    """Test that a comma-plus-space BEDROCK_REGIONS value builds the module-level client with clean region names."""
+    import config
+    monkeypatch.setenv('BEDROCK_REGIONS', 'us-east-1, us-west-2,')
+    try:
+        importlib.reload(config)
+        assert load_pipeline().bedrock_client.regions == ['us-east-1', 'us-west-2']
+    finally:
+        monkeypatch.undo()
+        importlib.reload(config)
+
+
+def test_async_generate_submits_a_small_job_that_runs_from_saved_input(aws):
+    """Test that async /generate queues a job carrying only the id and mode, and the job reads its inputs from S3."""
+    status, body = generate(company_name='Lone Star Grocers', scraped_content='Grocery chain', **{'async': True})
+    interview_id = body['interview_id']
+    assert status == 202
+    assert aws.table.items[interview_id]['status'] == 'queued'
+    assert aws.lambda_client.invocations == [
+        ('Event', {'job': 'generate', 'interview_id': interview_id, 'mode': 'full'})
+    ]
+    assert aws.calls == []
+
+    job = aws.lambda_client.invocations[0][1]
+    assert pipeline.lambda_handler(job, FakeContext())['status'] == 'brief_ready'
+    assert 'Grocery chain' in aws.prompts['synthesis']
+    assert aws.table.items[interview_id]['status'] == 'brief_ready'
+    assert aws.s3.text(f'{interview_id}/interviewer_brief.txt') == 'Interviewer brief'
+
+
+def test_failed_stage_is_recorded_and_resume_reuses_checkpoints(aws):
+    """Test that a failed run records its stage, and resume re-runs only unfinished stages and clears the failure."""
+    aws.fail.add('gaps')
+    status, body = generate(company_name='Lone Star Grocers', scraped_content='Grocery chain')
+    interview_id = body['interview_id']
+    assert status == 503
+    assert body['failed_stage'] == 'gaps'
+    assert aws.table.items[interview_id]['failed_stage'] == 'gaps'
+    assert aws.table.items[interview_id]['status'] == 'failed'
+
+    aws.calls.clear()
+    status, body = generate(resume_interview_id=interview_id.lower())
+    assert status == 200
+    assert 'synthesis' not in aws.calls and 'texas' not in aws.calls
+    assert {'gaps', 'assembly', 'schema'} <= set(aws.calls)
+    item = aws.table.items[interview_id]
+    assert item['status'] == 'brief_ready'
+    assert 'error' not in item and 'failed_stage' not in item
+
+
+def test_regenerate_reruns_only_what_changed(aws):
+    """Test that regenerate with unchanged inputs re-runs nothing and new notes re-run every stage."""
+    _, body = generate(company_name='Lone Star Grocers', scraped_content='Grocery chain')
+    interview_id = body['interview_id']
+
+    aws.calls.clear()
+    status, body = generate(regenerate_interview_id=interview_id)
+    assert status == 200
+    assert body['regenerated_stages'] == [] and aws.calls == []
+
+    status, body = generate(regenerate_interview_id=interview_id, tamu_notes='New notes from the visit')
+    assert status == 200
+    assert body['regenerated_stages'] == sorted(OUTPUTS.keys() - {'express'})
+    assert 'New notes from the visit' in aws.prompts['synthesis']
+    assert json.loads(aws.s3.text(f'{interview_id}/input.json'))['tamu_notes'] == 'New notes from the visit'
+
+
+def test_express_mode_runs_one_combined_call(aws):
+    """Test that express mode makes a single call and writes the same outputs as the full chain."""
+    status, body = generate(company_name='Lone Star Grocers', scraped_content='Grocery chain', mode='express')
+    interview_id = body['interview_id']
+    assert status == 200
+    assert aws.calls == ['express']
+    assert aws.table.items[interview_id]['stage_names'] == ['express']
+    assert body['brief'] == 'Express brief'
+    assert json.loads(aws.s3.text(f'{interview_id}/gaps.json')) == {'critical_unknowns': ['Margins']}
+
+    assert generate(company_name='Lone Star Grocers', mode='deep')[0] == 400
+
+
+def test_fused_scrape_runs_only_when_requested(aws):
+    """Test that a company_url triggers the server-side scrape, and a request with neither scrapes nothing."""
+    status, body = generate(company_name='Lone Star Grocers', company_url='lonestargrocers.com')
+    interview_id = body['interview_id']
+    assert status == 200
+    assert [event['company_url'] for _, event in aws.lambda_client.invocations] == ['lonestargrocers.com']
+    assert 'Scraped: Lone Star Grocers' in aws.prompts['synthesis']
+    item = aws.table.items[interview_id]
+    assert item['stage_names'][0] == 'scrape'
+    assert item['sources_scraped'] == ['website']
+    # Resume and regenerate read the scraped content back from the saved input
+    assert json.loads(aws.s3.text(f'{interview_id}/input.json'))['scraped_content'] == 'Scraped: Lone Star Grocers'
+
+    aws.lambda_client.invocations.clear()
+    status, body = generate(company_name='Lone Star Grocers')
+    assert status == 200
+    assert aws.lambda_client.invocations == []
+    assert aws.table.items[body['interview_id']]['stage_names'][0] == 'synthesis'
+
+
+def test_stage_list_is_on_the_item_before_the_first_stage_runs(aws, monkeypatch):
+    """Test that progress pollers can read the run's stage list while its first stage is still running."""
+    seen = {}
+    original = pipeline.call_bedrock
+
+    def spy(prompt, temperature=0.3, max_tokens=None, prefix=None, call_name=None):
+        if call_name == 'synthesis':
+            item = next(iter(aws.table.items.values()))
+            seen.update(stage_names=item.get('stage_names'), status=item['status'])
+        return original(prompt, temperature, max_tokens, prefix, call_name)
+
+    monkeypatch.setattr(pipeline, 'call_bedrock', spy)
+    generate(company_name='Lone Star Grocers', company_url='lonestargrocers.com')
+    assert seen == {'stage_names': ['scrape', 'synthesis', 'texas', 'questions', 'gaps', 'assembly', 'schema'],
+                    'status': 'generating'}
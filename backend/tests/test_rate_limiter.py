@@ -0,0 +1,150 @@
+"""
+Unit tests for the shared token-bucket rate limiter.
+"""
+import threading
+
+from backend.utils.rate_limiter import InMemoryBucketStore, RateLimiter, refill
+
+LIMITS = {'model-a': {'requests_per_minute': 60, 'tokens_per_minute': 6000}}
+
+
+class CountingStore(InMemoryBucketStore):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def take(self, *args):
+        self.calls += 1
+        return super().take(*args)
+
+
+class SlowStore(InMemoryBucketStore):
+    """Blocks takes for one key until released, like a slow DynamoDB round trip."""
+
+    def __init__(self, slow_key):
+        super().__init__()
+        self.slow_key = slow_key
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def take(self, key, *args):
+        if key.startswith(self.slow_key):
+            self.entered.set()
+            self.release.wait(2)
+        return super().take(key, *args)
+
+
+class BrokenStore:
+    def take(self, *args):
+        raise ConnectionError("dynamodb unreachable")
+
+
+def make_limiter(store, clock, **kwargs):
+    kwargs.setdefault('lease_fraction', 0.1)
+    kwargs.setdefault('lease_seconds', 10)
+    kwargs.setdefault('max_wait', 30)
+    return RateLimiter(store, limits=LIMITS, default_limit=LIMITS['model-a'], clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_refill_is_capped_and_ignores_clock_skew():
+    """Test that a bucket refills at its rate up to capacity and never drains when time runs backwards."""
+    assert refill(0, 0, 10, capacity=100, rate=2) == 20
+    assert refill(90, 0, 10, capacity=100, rate=2) == 100
+    assert refill(50, 10, 5, capacity=100, rate=2) == 50
+
+
+def test_in_memory_store_grants_until_empty_and_reports_wait():
+    """Test that takes succeed while capacity lasts and a refused take says how long to wait."""
+    store = InMemoryBucketStore()
+    assert store.take('k', 8, 10, 1, now=0) == (True, 0.0)
+    granted, wait = store.take('k', 5, 10, 1, now=0)
+    assert not granted and wait == 3
+    assert store.take('k', 5, 10, 1, now=3)[0]
+
+
+def test_local_lease_avoids_store_round_trips(clock):
+    """Test that capacity is leased in slices and spent locally until the slice runs out."""
+    store = CountingStore()
+    limiter = make_limiter(store, clock)
+    # Lease slice is 10% of 60 requests = 6 requests per store call (token bucket not used here)
+    for _ in range(6):
+        assert limiter.acquire('model-a')
+    assert store.calls == 1
+    assert limiter.acquire('model-a')
+    assert store.calls == 2
+
+
+def test_two_processes_share_the_quota(clock):
+    """Test that limiters sharing a store together never exceed the bucket, and wait for refill."""
+    store = InMemoryBucketStore()
+    first = make_limiter(store, clock, lease_fraction=0.5)
+    second = make_limiter(store, clock, lease_fraction=0.5)
+    started = clock.now
+    # 6000 tokens per minute: each limiter leases half the bucket
+    assert first.acquire('model-a', tokens=2000)
+    assert second.acquire('model-a', tokens=2000)
+    assert clock.now == started
+    # Both leases have 1000 left; the bucket is empty, so a larger request waits for refill
+    assert first.acquire('model-a', tokens=2500)
+    assert clock.now > started
+    assert first.stats['waited_seconds'] > 0
+
+
+def test_expired_lease_is_not_spent(clock):
+    """Test that leased capacity left unused past its lifetime is dropped."""
+    store = CountingStore()
+    limiter = make_limiter(store, clock, lease_seconds=5)
+    limiter.acquire('model-a')
+    clock.now += 6
+    limiter.acquire('model-a')
+    assert store.calls == 2
+
+
+def test_release_returns_over_reserved_tokens(clock):
+    """Test that releasing unused tokens lets the next call proceed without a store call."""
+    store = CountingStore()
+    limiter = make_limiter(store, clock, lease_fraction=0.0)
+    limiter.acquire('model-a', tokens=1000)
+    calls = store.calls
+    limiter.release('model-a', 800)
+    limiter.acquire('model-a', tokens=500)
+    # The request bucket still needs a store call, the token bucket does not
+    assert store.calls == calls + 1
+
+
+def test_acquire_fails_open(clock):
+    """Test that a broken store or an exceeded wait limit lets the call through."""
+    assert make_limiter(BrokenStore(), clock).acquire('model-a', tokens=10) is False
+
+    limiter = make_limiter(InMemoryBucketStore(), clock, max_wait=2)
+    assert limiter.acquire('model-a', tokens=6000)
+    started = clock.now
+    assert limiter.acquire('model-a', tokens=3000) is False
+    assert clock.now - started <= 2
+    assert limiter.stats['timeouts'] == 1
+
+
+def test_oversized_request_is_capped_to_capacity(clock):
+    """Test that a reservation bigger than the bucket waits for a full bucket instead of forever."""
+    limiter = make_limiter(InMemoryBucketStore(), clock)
+    assert limiter.acquire('model-a', tokens=50000)
+
+
+def test_store_round_trip_does_not_block_leased_callers(clock):
+    """Test that a thread covered by its lease is not queued behind another thread's store call."""
+    store = SlowStore('model-b')
+    limiter = make_limiter(store, clock)
+    assert limiter.acquire('model-a')
+
+    slow = threading.Thread(target=limiter.acquire, args=('model-b',))
+    slow.start()
+    assert store.entered.wait(2)
+    try:
+        fast = threading.Thread(target=limiter.acquire, args=('model-a',))
+        fast.start()
+        fast.join(1)
+        assert not fast.is_alive()
+    finally:
+        store.release.set()
+        slow.join(2)
+    assert limiter.stats['store_calls'] == 2
@@ -0,0 +1,84 @@
+"""
+Unit tests for latency- and error-aware Bedrock region routing.
+"""
+import random
+from collections import Counter
+
+from backend.utils.rate_limiter import InMemoryBucketStore, RateLimiter
+from backend.utils.region_router import RegionRouter
+from backend.utils.retry import FATAL, THROTTLED, TRANSIENT
+
+REGIONS = ['us-east-1', 'us-west-2', 'eu-central-1']
+
+
+def first_choices(router, n=2000):
+    return Counter(router.order()[0] for _ in range(n))
+
+
+def test_single_region_is_always_first():
+    """Test that a one-region router returns that region without drawing."""
+    router = RegionRouter(['us-east-1'], rng=lambda: 1 / 0)
+    assert router.order() == ['us-east-1']
+
+
+def test_faster_region_gets_most_calls_but_not_all(clock):
+    """Test that calls are spread in favour of the lower-latency region without starving the others."""
+    router = RegionRouter(REGIONS, preference=1.0, clock=clock, rng=random.Random(7).random)
+    for _ in range(10):
+        router.record_success('us-east-1', 8.0)
+        router.record_success('us-west-2', 2.0)
+        router.record_success('eu-central-1', 8.0)
+    counts = first_choices(router)
+    assert counts.most_common(1)[0][0] == 'us-west-2'
+    assert counts['us-east-1'] > 0 and counts['eu-central-1'] > 0
+
+
+def test_errors_push_a_region_down(clock):
+    """Test that a rising error rate steers calls away from an otherwise equal region."""
+    router = RegionRouter(REGIONS[:2], preference=1.0, clock=clock, rng=random.Random(3).random)
+    for _ in range(5):
+        router.record_success('us-east-1', 3.0)
+        router.record_success('us-west-2', 3.0)
+        router.record_failure('us-east-1', TRANSIENT)
+    counts = first_choices(router)
+    assert counts['us-west-2'] > counts['us-east-1']
+
+
+def test_throttled_region_cools_down_then_returns(clock):
+    """Test that throttling sends a region to the back until its cool-down passes."""
+    router = RegionRouter(REGIONS, throttle_cooldown=10, clock=clock, rng=random.Random(1).random)
+    router.record_failure('us-east-1', THROTTLED)
+    for _ in range(50):
+        assert router.order()[-1] == 'us-east-1'
+    assert router.snapshot()['us-east-1']['cooling_down']
+    clock.now = 11
+    assert any(router.order()[0] == 'us-east-1' for _ in range(200))
+
+
+def test_fatal_errors_do_not_count_against_a_region(clock):
+    """Test that request errors such as validation failures leave region health untouched."""
+    router = RegionRouter(REGIONS, clock=clock)
+    router.record_failure('us-west-2', FATAL)
+    assert router.snapshot()['us-west-2'] == {
+        'latency': None, 'error_rate': 0.0, 'calls': 0, 'cooling_down': False
+    }
+
+
+def test_unmeasured_regions_follow_configured_preference(clock):
+    """Test that with no history the first configured region leads most often."""
+    router = RegionRouter(REGIONS, preference=0.5, clock=clock, rng=random.Random(5).random)
+    counts = first_choices(router)
+    assert counts['us-east-1'] > counts['us-west-2'] > counts['eu-central-1']
+
+
+def test_rate_limits_apply_per_region(clock):
+    """Test that model quotas are looked up without the region suffix and metered per region."""
+    limits = {'model-a': {'requests_per_minute': 2, 'tokens_per_minute': 100}}
+    limiter = RateLimiter(
+        InMemoryBucketStore(), limits=limits, default_limit={'requests_per_minute': 1000, 'tokens_per_minute': 1},
+        lease_fraction=0.0, max_wait=0, clock=clock, sleep=lambda s: None
+    )
+    assert limiter.acquire('model-a@us-east-1', tokens=100)
+    # The east bucket is spent, the west one is not
+    assert limiter.acquire('model-a@us-east-1', tokens=100) is False
+    assert limiter.acquire('model-a@us-west-2', tokens=100)
@@ -0,0 +1,73 @@
+"""
+Unit tests for the Bedrock response cache.
+"""
+import io
+import json
+from backend.utils.response_cache import ResponseCache, make_cache_key
+
+
+class FakeS3:
+    """Minimal in-memory stand-in for the S3 calls the cache makes."""
+
+    def __init__(self):
+        self.objects = {}
+
+    def get_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise KeyError(Key)
+        return {'Body': io.BytesIO(self.objects[Key])}
+
+    def put_object(self, Bucket, Key, Body, ContentType=None):
+        self.objects[Key] = Body
+
+
+def test_make_cache_key_varies_with_inputs():
+    """Test that every keyed input changes the hash."""
+    base = make_cache_key('model-a', 'prompt', 0.2, 2000, 'v2')
+    assert base == make_cache_key('model-a', 'prompt', 0.2, 2000, 'v2')
+    assert base != make_cache_key('model-b', 'prompt', 0.2, 2000, 'v2')
+    assert base != make_cache_key('model-a', 'prompt!', 0.2, 2000, 'v2')
+    assert base != make_cache_key('model-a', 'prompt', 0.3, 2000, 'v2')
+    assert base != make_cache_key('model-a', 'prompt', 0.2, 3000, 'v2')
+    assert base != make_cache_key('model-a', 'prompt', 0.2, 2000, 'v3')
+    assert base != make_cache_key('model-a', 'prompt', 0.2, 2000, 'v2', prefix='shared context')
+
+
+def test_memory_tier_evicts_least_recently_used():
+    """Test LRU eviction in the in-process tier."""
+    cache = ResponseCache(max_entries=2, enabled=True)
+    cache.put('a', 'A')
+    cache.put('b', 'B')
+    assert cache.get('a') == 'A'
+    cache.put('c', 'C')
+    assert cache.get('b') is None
+    assert cache.get('a') == 'A'
+    assert cache.get('c') == 'C'
+
+
+def test_shared_tier_serves_other_containers():
+    """Test that a fresh process reads entries written to S3."""
+    s3 = FakeS3()
+    ResponseCache(s3_client=s3, bucket='bucket', enabled=True).put('k', 'text')
+
+    cold = ResponseCache(s3_client=s3, bucket='bucket', enabled=True)
+    assert cold.get('k') == 'text'
+    assert cold.stats['s3_hits'] == 1
+    assert cold.get('k') == 'text'
+    assert cold.stats['memory_hits'] == 1
+
+
+def test_expired_shared_entry_is_a_miss():
+    """Test TTL handling in the S3 tier."""
+    s3 = FakeS3()
+    s3.objects['_cache/bedrock/k.json'] = json.dumps({'text': 'old', 'expires_at': 1}).encode('utf-8')
+    cache = ResponseCache(s3_client=s3, bucket='bucket', prefix='_cache/bedrock/', enabled=True)
+    assert cache.get('k') is None
+
+
+def test_only_low_temperature_calls_are_cacheable():
+    """Test the temperature gate."""
+    cache = ResponseCache(max_temperature=0.2, enabled=True)
+    assert cache.is_cacheable(0.2)
+    assert not cache.is_cacheable(0.7)
+    assert not ResponseCache(enabled=False).is_cacheable(0.0)
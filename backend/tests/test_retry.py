@@ -0,0 +1,102 @@
+"""
+Unit tests for error classification, backoff and the circuit breaker.
+"""
+import socket
+from backend.utils.retry import (
+    FATAL, THROTTLED, TRANSIENT, CircuitBreaker, RetryPolicy, backoff_delay, classify_error,
+    is_prompt_cache_rejection
+)
+
+
+class FakeClientError(Exception):
+    """Shaped like botocore's ClientError: the error code lives in .response."""
+
+    def __init__(self, code, status=400, message=None):
+        super().__init__(code)
+        self.response = {'Error': {'Code': code, 'Message': message or code},
+                         'ResponseMetadata': {'HTTPStatusCode': status}}
+
+
+class ReadTimeoutError(Exception):
+    pass
+
+
+def test_classify_error_by_code_status_and_type():
+    """Test that throttling, 5xx and network errors are retryable and validation errors are fatal."""
+    assert classify_error(FakeClientError('ThrottlingException')) == THROTTLED
+    assert classify_error(FakeClientError('SomethingNew', status=429)) == THROTTLED
+    assert classify_error(FakeClientError('ServiceUnavailableException', status=503)) == TRANSIENT
+    assert classify_error(FakeClientError('UnknownServerThing', status=500)) == TRANSIENT
+    assert classify_error(FakeClientError('ValidationException')) == FATAL
+    assert classify_error(FakeClientError('AccessDeniedException', status=403)) == FATAL
+    assert classify_error(ReadTimeoutError()) == TRANSIENT
+    assert classify_error(socket.timeout()) == TRANSIENT
+    assert classify_error(KeyError('content')) == FATAL
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    """Test that the backoff ceiling doubles per attempt up to the cap and jitter scales it."""
+    assert backoff_delay(0, base=0.5, cap=8, rng=lambda: 1.0) == 0.5
+    assert backoff_delay(3, base=0.5, cap=8, rng=lambda: 1.0) == 4.0
+    assert backoff_delay(10, base=0.5, cap=8, rng=lambda: 1.0) == 8.0
+    assert backoff_delay(3, base=0.5, cap=8, rng=lambda: 0.25) == 1.0
+
+
+def test_retry_policy_stops_on_fatal_attempts_and_elapsed():
+    """Test that the policy gives up on fatal errors, after max attempts and past the elapsed budget."""
+    policy = RetryPolicy(max_attempts=3, base_delay=1, max_delay=10, max_elapsed=5, rng=lambda: 1.0)
+    assert policy.next_delay(0, FATAL, 0) is None
+    assert policy.next_delay(0, THROTTLED, 0) == 1
+    assert policy.next_delay(1, TRANSIENT, 0) == 2
+    assert policy.next_delay(2, THROTTLED, 0) is None
+    assert policy.next_delay(1, THROTTLED, 4) is None
+
+
+def test_breaker_opens_after_threshold_and_half_opens_after_cooldown(clock):
+    """Test the closed → open → half-open → closed cycle of the breaker."""
+    breaker = CircuitBreaker(threshold=3, cooldown=30, clock=clock)
+    for _ in range(2):
+        breaker.record_failure('m')
+    assert breaker.allow('m')
+    breaker.record_failure('m')
+    assert breaker.state('m') == 'open'
+    assert not breaker.allow('m')
+    # Other models are unaffected
+    assert breaker.allow('backup')
+
+    clock.now = 31
+    assert breaker.state('m') == 'half-open'
+    assert breaker.allow('m')
+    # Only one trial request while half-open
+    assert not breaker.allow('m')
+    breaker.record_success('m')
+    assert breaker.state('m') == 'closed'
+    assert breaker.allow('m')
+
+
+def test_failed_trial_reopens_breaker_immediately(clock):
+    """Test that a failing half-open trial restarts the cool-down."""
+    breaker = CircuitBreaker(threshold=2, cooldown=10, clock=clock)
+    breaker.record_failure('m')
+    breaker.record_failure('m')
+    clock.now = 11
+    assert breaker.allow('m')
+    breaker.record_failure('m')
+    assert breaker.state('m') == 'open'
+    clock.now = 15
+    assert not breaker.allow('m')
+    clock.now = 22
+    assert breaker.allow('m')
+
+
+def test_only_cache_validation_errors_count_as_prompt_cache_rejections():
+    """Test that ordinary validation errors are not mistaken for a model rejecting prompt caching."""
+    assert is_prompt_cache_rejection(FakeClientError(
+        'ValidationException', message='extraneous key [cache_control] is not permitted'))
+    assert is_prompt_cache_rejection(FakeClientError(
+        'ValidationException', message='Prompt caching is not supported for this model'))
+    assert not is_prompt_cache_rejection(FakeClientError(
+        'ValidationException', message='Input is too long for requested model'))
+    assert not is_prompt_cache_rejection(FakeClientError(
+        'ValidationException', message='max_tokens: range: 1..4096'))
+    assert not is_prompt_cache_rejection(FakeClientError('ThrottlingException', message='caching'))
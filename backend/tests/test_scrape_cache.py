@@ -0,0 +1,85 @@
+"""
+Unit tests for the scrape cache.
+"""
+import io
+from backend.utils import scrape_cache
+from backend.utils.scrape_cache import ScrapeCache, normalize_url
+
+
+class FakeS3:
+    """Minimal in-memory stand-in for the S3 calls the cache makes."""
+
+    def __init__(self):
+        self.objects = {}
+
+    def get_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise KeyError(Key)
+        return {'Body': io.BytesIO(self.objects[Key])}
+
+    def put_object(self, Bucket, Key, Body, ContentType=None):
+        self.objects[Key] = Body
+
+
+def test_normalize_url_collapses_equivalent_forms():
+    """Test that cosmetic URL differences share one cache entry."""
+    canonical = normalize_url('https://www.heb.com/about')
+    assert normalize_url('www.heb.com/about/') == canonical
+    assert normalize_url('HTTPS://WWW.HEB.COM/about#team') == canonical
+    assert normalize_url('https://www.heb.com/about?utm_source=x') == canonical
+    assert normalize_url('https://x.com/?b=2&a=1') == normalize_url('https://x.com/?a=1&b=2')
+    assert normalize_url('https://www.heb.com/careers') != canonical
+
+
+def test_ttl_depends_on_source_type(clock):
+    """Test per-source-type freshness."""
+    cache = ScrapeCache(FakeS3(), 'bucket', ttls={'news': 60, 'wiki': 3600}, clock=clock)
+    cache.store('https://en.wikipedia.org/wiki/H-E-B', 'wiki', 'H-E-B is a grocery chain')
+    cache.store('https://news.example.com/rss', 'news', '- headline')
+
+    clock.now += 120
+    wiki = cache.lookup('en.wikipedia.org/wiki/H-E-B')
+    news = cache.lookup('https://news.example.com/rss')
+    assert wiki['text'] == 'H-E-B is a grocery chain'
+    assert cache.is_fresh(wiki, 'wiki')
+    assert not cache.is_fresh(news, 'news')
+    assert not cache.is_fresh(None, 'wiki')
+
+
+def test_revalidation_headers_and_refresh(clock):
+    """Test conditional headers from stored validators and TTL restart on 304."""
+    cache = ScrapeCache(FakeS3(), 'bucket', ttls={'homepage': 60}, clock=clock)
+    cache.store('https://heb.com', 'homepage', 'Welcome', etag='"abc"', last_modified='Mon, 01 Jan 2026 00:00:00 GMT')
+
+    clock.now += 300
+    entry = cache.lookup('https://heb.com')
+    assert not cache.is_fresh(entry, 'homepage')
+    assert cache.conditional_headers(entry) == {
+        'If-None-Match': '"abc"',
+        'If-Modified-Since': 'Mon, 01 Jan 2026 00:00:00 GMT'
+    }
+    assert cache.conditional_headers(None) == {}
+
+    cache.revalidated('https://heb.com', entry)
+    refreshed = cache.lookup('https://heb.com')
+    assert cache.is_fresh(refreshed, 'homepage')
+    assert refreshed['etag'] == '"abc"'
+
+
+def test_entries_are_kept_per_max_chars_and_extractor_version(monkeypatch, clock):
+    """Test that text capped for one caller is not served to a caller with another cap or extractor."""
+    cache = ScrapeCache(FakeS3(), 'bucket', ttls={'wiki': 3600}, clock=clock)
+    cache.store('https://en.wikipedia.org/wiki/H-E-B', 'wiki', 'H-E-B', max_chars=5)
+    assert cache.lookup('https://en.wikipedia.org/wiki/H-E-B', max_chars=5)['text'] == 'H-E-B'
+    assert cache.lookup('https://en.wikipedia.org/wiki/H-E-B', max_chars=5000) is None
+    assert cache.lookup('https://en.wikipedia.org/wiki/H-E-B') is None
+
+    monkeypatch.setattr(scrape_cache, 'EXTRACTOR_VERSION', scrape_cache.EXTRACTOR_VERSION + 1)
+    assert cache.lookup('https://en.wikipedia.org/wiki/H-E-B', max_chars=5) is None
+
+
+def test_disabled_without_bucket():
+    """Test that the cache is inert when no S3 tier is configured."""
+    cache = ScrapeCache(None, None)
+    cache.store('https://heb.com', 'homepage', 'Welcome')
+    assert cache.lookup('https://heb.com') is None
@@ -0,0 +1,162 @@
+"""
+Unit tests for the stage-graph executor.
+"""
+import threading
+import pytest
+from backend.utils.stage_graph import Stage, StageGraphError, downstream_of, run_stage_graph, validate_graph
+
+
+def test_run_stage_graph_passes_dependency_outputs():
+    """Test that stages receive upstream outputs."""
+    stages = [
+        Stage('a', lambda r: 1),
+        Stage('b', lambda r: r['a'] + 1, deps=['a']),
+        Stage('c', lambda r: r['a'] + r['b'], deps=['a', 'b']),
+    ]
+    results = run_stage_graph(stages)
+    assert results == {'a': 1, 'b': 2, 'c': 3}
+
+
+def test_independent_stages_run_concurrently():
+    """Test that sibling stages overlap instead of running back to back."""
+    barrier = threading.Barrier(2, timeout=2)
+
+    def sibling(results):
+        # Deadlocks (and times out) unless both siblings are running at once
+        barrier.wait()
+        return results['root']
+
+    stages = [
+        Stage('root', lambda r: 'x'),
+        Stage('left', sibling, deps=['root']),
+        Stage('right', sibling, deps=['root']),
+    ]
+    results = run_stage_graph(stages, max_workers=2)
+    assert results['left'] == results['right'] == 'x'
+
+
+def test_stage_failure_raises_stage_graph_error():
+    """Test that a failing stage is reported by name."""
+    def boom(results):
+        raise ValueError("bad output")
+
+    stages = [Stage('a', lambda r: 1), Stage('b', boom, deps=['a'])]
+    with pytest.raises(StageGraphError) as exc_info:
+        run_stage_graph(stages)
+    assert exc_info.value.stage == 'b'
+
+
+def test_running_siblings_are_settled_when_a_stage_fails():
+    """Test that stages still running when a sibling fails finish and get their end hook before the error is raised."""
+    gaps_started, release = threading.Event(), threading.Event()
+    ends = {}
+
+    def slow(results):
+        gaps_started.set()
+        release.wait(2)
+        return 'kept'
+
+    def fail_while_sibling_runs(results):
+        gaps_started.wait(2)
+        raise ValueError("bad output")
+
+    def on_end(name, output, error):
+        ends[name] = (output, error)
+        # The sibling finishes only after the failure has been seen
+        release.set()
+
+    stages = [
+        Stage('questions', fail_while_sibling_runs),
+        Stage('gaps', slow),
+        Stage('schema', lambda r: 'never', deps=['gaps']),
+    ]
+    with pytest.raises(StageGraphError) as exc_info:
+        run_stage_graph(stages, max_workers=2, on_stage_end=on_end)
+    assert exc_info.value.stage == 'questions'
+    assert ends['gaps'] == ('kept', None)
+    assert isinstance(ends['questions'][1], ValueError)
+    # Downstream stages do not start after a failure
+    assert 'schema' not in ends
+
+
+def test_queued_stages_are_reported_as_abandoned():
+    """Test that stages submitted but not yet started when a sibling fails get an end hook with an error."""
+    started, ends = [], {}
+
+    def boom(results):
+        raise ValueError("bad output")
+
+    stages = [Stage('a', boom), Stage('b', lambda r: 'b'), Stage('c', lambda r: 'c')]
+    with pytest.raises(StageGraphError):
+        run_stage_graph(stages, max_workers=1, on_stage_start=started.append,
+                        on_stage_end=lambda name, output, error: ends.update({name: (output, error)}))
+    # Every stage that was started is settled, either with its output or as abandoned
+    assert set(ends) == set(started)
+    for name in set(started) - {'a'}:
+        output, error = ends[name]
+        assert output == name or isinstance(error, StageGraphError)
+
+
+def test_validate_graph_rejects_unknown_dependency():
+    """Test validation of dependencies on missing stages."""
+    with pytest.raises(StageGraphError):
+        validate_graph([Stage('a', lambda r: 1, deps=['missing'])])
+
+
+def test_validate_graph_rejects_cycle():
+    """Test validation of cyclic graphs."""
+    with pytest.raises(StageGraphError):
+        validate_graph([
+            Stage('a', lambda r: 1, deps=['b']),
+            Stage('b', lambda r: 1, deps=['a']),
+        ])
+
+
+def test_stage_hooks_report_start_and_end():
+    """Test that start/end hooks fire once per stage in dependency order."""
+    events = []
+    stages = [
+        Stage('a', lambda r: 1),
+        Stage('b', lambda r: r['a'] * 10, deps=['a']),
+    ]
+    run_stage_graph(
+        stages,
+        on_stage_start=lambda name: events.append(('start', name)),
+        on_stage_end=lambda name, output, error: events.append(('end', name, output, error)),
+    )
+    assert events == [('start', 'a'), ('end', 'a', 1, None), ('start', 'b'), ('end', 'b', 10, None)]
+
+
+def test_completed_stages_are_not_rerun():
+    """Test resuming a graph from checkpointed outputs."""
+    ran = []
+
+    def stage(name, value):
+        def fn(results):
+            ran.append(name)
+            return value(results)
+        return fn
+
+    stages = [
+        Stage('a', stage('a', lambda r: 1)),
+        Stage('b', stage('b', lambda r: r['a'] + 1), deps=['a']),
+        Stage('c', stage('c', lambda r: r['b'] * 10), deps=['b']),
+    ]
+    results = run_stage_graph(stages, completed={'a': 5, 'b': 6})
+    assert ran == ['c']
+    assert results == {'a': 5, 'b': 6, 'c': 60}
+
+
+def test_downstream_of_follows_transitive_dependencies():
+    """Test invalidation sets for incremental regeneration."""
+    stages = [
+        Stage('synthesis', None),
+        Stage('texas', None, deps=['synthesis']),
+        Stage('questions', None, deps=['synthesis', 'texas']),
+        Stage('gaps', None, deps=['synthesis', 'texas']),
+        Stage('assembly', None, deps=['questions', 'gaps']),
+        Stage('schema', None, deps=['gaps']),
+    ]
+    assert downstream_of(stages, ['texas']) == {'texas', 'questions', 'gaps', 'assembly', 'schema'}
+    assert downstream_of(stages, ['gaps']) == {'gaps', 'assembly', 'schema'}
+    assert downstream_of(stages, []) == set()
@@ -0,0 +1,43 @@
+"""
+Unit tests for progressive writes of streamed output.
+"""
+from backend.utils.streaming import ProgressiveWriter
+
+
+def test_writes_are_throttled_by_size_and_time(clock):
+    """Test that writes wait for enough new text and enough elapsed time."""
+    writes = []
+    writer = ProgressiveWriter(writes.append, min_interval=2.0, min_chars=5, clock=clock)
+
+    assert not writer.append('abc')
+    assert writer.append('def')
+    assert writes == ['abcdef']
+
+    # Enough characters but too soon after the last write
+    clock.now = 1.0
+    assert not writer.append('ghijkl')
+
+    clock.now = 3.0
+    assert writer.append('m')
+    assert writes[-1] == 'abcdefghijklm'
+
+
+def test_flush_writes_remaining_text_once():
+    """Test the final flush."""
+    writes = []
+    writer = ProgressiveWriter(writes.append, min_interval=0, min_chars=100)
+    writer.append('partial')
+    writer.flush()
+    writer.flush()
+    assert writes == ['partial']
+    assert writer.text == 'partial'
+
+
+def test_write_errors_do_not_interrupt_the_stream():
+    """Test that a failing writer is tolerated."""
+    def failing(text):
+        raise IOError("S3 unavailable")
+
+    writer = ProgressiveWriter(failing, min_interval=0, min_chars=1)
+    assert writer.append('x')
+    assert writer.text == 'x'
@@ -0,0 +1,144 @@
+"""
+Bounded-concurrency batch runner with a resumable on-disk state log.
+
+Used to prepare briefs for a whole cohort of companies: each item is handed
+to a worker function on a fixed-size pool, and every outcome is appended to a
+JSONL state file so an interrupted batch can be resumed without redoing work.
+Workers can also record progress mid-item (e.g. the id of a remote job they
+started) as a checkpoint, so a rerun picks that job up instead of starting
+a new one.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+# Written by a worker mid-item; not an outcome, so it does not count as an attempt
+STATUS_SUBMITTED = 'submitted'
+
+
+class BatchState:
+    """Append-only JSONL log of per-item outcomes; the last record for a key wins."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.records: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A torn final line from a killed run; ignore it
+                        continue
+                    self.records[record['key']] = record
+
+    def status(self, key: str) -> Optional[str]:
+        record = self.records.get(key)
+        return record['status'] if record else None
+
+    def attempts(self, key: str) -> int:
+        record = self.records.get(key)
+        return record.get('attempts', 0) if record else 0
+
+    def checkpoint(self, key: str) -> Optional[Dict[str, Any]]:
+        """Progress a worker saved for this item on an earlier run, or None."""
+        record = self.records.get(key)
+        return record.get('checkpoint') if record else None
+
+    def record(self, key: str, status: str, result: Any = None, error: Optional[str] = None,
+               checkpoint: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Persist an outcome immediately so a crash loses at most the in-flight items.
+
+        The item's checkpoint is carried over from its previous record unless
+        a new one is given, so a failure keeps the progress made before it.
+        """
+        with self._lock:
+            entry = {
+                'key': key,
+                'status': status,
+                'attempts': self.attempts(key) + (0 if status == STATUS_SUBMITTED else 1),
+                'result': result,
+                'error': error,
+                'updated_at': int(time.time())
+            }
+            checkpoint = checkpoint if checkpoint is not None else self.checkpoint(key)
+            if checkpoint is not None:
+                entry['checkpoint'] = checkpoint
+            self.records[key] = entry
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(entry, default=str) + '\n')
+            return entry
+
+
+def run_batch(
+    items: Iterable[Dict[str, Any]],
+    worker_fn: Callable[[Dict[str, Any]], Any],
+    state: BatchState,
+    key_fn: Callable[[Dict[str, Any]], str],
+    concurrency: int = 4,
+    submit_interval: float = 0.0,
+    retry_failed: bool = False,
+    max_attempts: int = 3,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Dict[str, List[str]]:
+    """
+    Run worker_fn over items with at most `concurrency` in flight.
+
+    Args:
+        items: Work items (e.g. {"company_name": ..., "company_url": ...})
+        worker_fn: Processes one item; raising marks the item failed
+        state: Resumable state log; items already done are skipped, and
+            items left submitted by a killed run are handed to the worker
+            again (it can read state.checkpoint(key) to resume them)
+        key_fn: Stable identity of an item across runs
+        concurrency: Maximum items processed at the same time
+        submit_interval: Minimum seconds between starting two items, to
+            spread load instead of bursting every worker at once
+        retry_failed: Re-run items whose last outcome was a failure
+        max_attempts: Give up on an item after this many recorded attempts
+        on_result: Called with each state record as it is written
+
+    Returns:
+        Dict with "done", "failed" and "skipped" key lists for this run
+    """
+    summary = {'done': [], 'failed': [], 'skipped': []}
+    todo = []
+    for item in items:
+        key = key_fn(item)
+        status = state.status(key)
+        if status == STATUS_DONE:
+            summary['skipped'].append(key)
+        elif status == STATUS_FAILED and (not retry_failed or state.attempts(key) >= max_attempts):
+            summary['skipped'].append(key)
+        else:
+            todo.append((key, item))
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = {}
+        for key, item in todo:
+            if futures and submit_interval:
+                time.sleep(submit_interval)
+            futures[executor.submit(worker_fn, item)] = key
+
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                record = state.record(key, STATUS_DONE, result=future.result())
+                summary['done'].append(key)
+            except Exception as e:
+                record = state.record(key, STATUS_FAILED, error=str(e))
+                summary['failed'].append(key)
+            if on_result:
+                on_result(record)
+
+    return summary
@@ -1,33 +1,263 @@
 """
-Bedrock client wrapper with retry logic and error handling.
+Bedrock client wrapper with retry logic, error handling and multi-region routing.
 """
 import json
 import time
 import boto3
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Dict, Any, Iterator, List, Tuple
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 try:
-    from config import BEDROCK_MODEL_ID, BEDROCK_BACKUP_MODEL_ID, BEDROCK_REGION
+    from config import (
+        BEDROCK_MODEL_ID, BEDROCK_BACKUP_MODEL_ID, BEDROCK_REGION, BEDROCK_PROMPT_CACHING,
+        BEDROCK_REGIONS, BEDROCK_RATE_LIMIT_ENABLED, BEDROCK_RATE_LIMIT_TABLE, BEDROCK_HEDGE_ENABLED
+    )
     from utils.logger import StructuredLogger
     from utils.errors import BedrockError
+    from utils.response_cache import ResponseCache, make_cache_key
+    from utils.payloads import estimate_tokens
+    from utils.rate_limiter import DynamoDBBucketStore, RateLimiter
+    from utils.retry import (
+        CircuitBreaker, RetryPolicy, THROTTLED, TRANSIENT, classify_error, error_code, is_prompt_cache_rejection
+    )
+    from utils.hedging import HedgeStats, LatencyTracker, run_hedged
+    from utils.region_router import RegionRouter
 except ImportError:
     # Fallback for when running as standalone
     import os
     BEDROCK_MODEL_ID = os.getenv('BEDROCK_MODEL_ID', 'anthropic.claude-3-5-sonnet-20241022-v2:0')
     BEDROCK_BACKUP_MODEL_ID = os.getenv('BEDROCK_BACKUP_MODEL_ID', 'anthropic.claude-3-sonnet-20240229-v1:0')
     BEDROCK_REGION = os.getenv('BEDROCK_REGION', 'us-east-1')
+    BEDROCK_PROMPT_CACHING = os.getenv('BEDROCK_PROMPT_CACHING', 'true').lower() == 'true'
+    BEDROCK_RATE_LIMIT_ENABLED = os.getenv('BEDROCK_RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    BEDROCK_RATE_LIMIT_TABLE = os.getenv('BEDROCK_RATE_LIMIT_TABLE', 'axis-rate-limits')
+    BEDROCK_HEDGE_ENABLED = os.getenv('BEDROCK_HEDGE_ENABLED', 'false').lower() == 'true'
+    BEDROCK_REGIONS = [r.strip() for r in os.getenv('BEDROCK_REGIONS', BEDROCK_REGION).split(',') if r.strip()]
     from utils.logger import StructuredLogger
     from utils.errors import BedrockError
+    from utils.response_cache import ResponseCache, make_cache_key
+    from utils.payloads import estimate_tokens
+    from utils.rate_limiter import DynamoDBBucketStore, RateLimiter
+    from utils.retry import (
+        CircuitBreaker, RetryPolicy, THROTTLED, TRANSIENT, classify_error, error_code, is_prompt_cache_rejection
+    )
+    from utils.hedging import HedgeStats, LatencyTracker, run_hedged
+    from utils.region_router import RegionRouter
+
+# Retries are handled per error class below, so botocore's own retry layer is disabled
+BEDROCK_CLIENT_CONFIG = Config(retries={'total_max_attempts': 1, 'mode': 'standard'})
+
+# Shared by every client in the process, so warm invocations remember a failing model
+model_breaker = CircuitBreaker()
+# Shared so local leases of rate-limit capacity survive across warm invocations
+model_rate_limiter = RateLimiter(DynamoDBBucketStore(BEDROCK_RATE_LIMIT_TABLE, BEDROCK_REGION)) \
+    if BEDROCK_RATE_LIMIT_ENABLED else None
+# Shared so hedge thresholds are learned across warm invocations
+latency_tracker = LatencyTracker()
+hedge_stats = HedgeStats()
+# Runs primary and hedge requests side by side; a losing request finishes here in the background
+hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='bedrock-hedge')
+# Region health per region list, kept for the life of the warm container
+region_routers: Dict[Tuple[str, ...], RegionRouter] = {}
+
+
+def build_request_body(
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+    prefix: Optional[str] = None,
+    cache_prefix: bool = False
+) -> str:
+    """
+    Build the Anthropic messages request body for Bedrock.
+    
+    With a prefix, the user message becomes two content blocks: the shared
+    prefix first (optionally marked as a prompt-cache checkpoint) and the
+    stage-specific prompt after it.
+    """
+    content: Any = prompt
+    if prefix:
+        prefix_block = {"type": "text", "text": prefix}
+        if cache_prefix:
+            prefix_block["cache_control"] = {"type": "ephemeral"}
+        content = [prefix_block, {"type": "text", "text": prompt}]
+    return json.dumps({
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+        "messages": [{"role": "user", "content": content}]
+    })
+
+
+def iter_stream_text(response: Dict[str, Any]) -> Iterator[str]:
+    """Yield text deltas from an invoke_model_with_response_stream response."""
+    for event in response['body']:
+        chunk = event.get('chunk')
+        if not chunk:
+            continue
+        data = json.loads(chunk['bytes'])
+        if data.get('type') == 'content_block_delta' and data.get('delta', {}).get('type') == 'text_delta':
+            yield data['delta']['text']
 
 
 class BedrockClient:
     """Wrapper for Bedrock API calls with retry logic."""
     
-    def __init__(self, region: str = BEDROCK_REGION):
-        self.client = boto3.client('bedrock-runtime', region_name=region)
-        self.primary_model = BEDROCK_MODEL_ID
-        self.backup_model = BEDROCK_BACKUP_MODEL_ID
+    def __init__(
+        self,
+        region: Optional[str] = None,
+        primary_model: Optional[str] = None,
+        backup_model: Optional[str] = None,
+        cache: Optional[ResponseCache] = None,
+        prompt_caching: bool = BEDROCK_PROMPT_CACHING,
+        retry_policy: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        hedging: bool = BEDROCK_HEDGE_ENABLED,
+        latency: Optional[LatencyTracker] = None,
+        regions: Optional[List[str]] = None,
+        clients: Optional[Dict[str, Any]] = None,
+        router: Optional[RegionRouter] = None
+    ):
+        """
+        Args:
+            region: Single Bedrock region (shorthand for `regions=[region]`)
+            regions: Regions to spread calls over, in order of preference
+                (default BEDROCK_REGIONS)
+            clients: bedrock-runtime client per region; built with boto3 when
+                omitted (tests pass stubs)
+            router: Region health and ordering; shared per region list by default
+        """
+        self.regions = list(regions or ([region] if region else BEDROCK_REGIONS))
+        self.clients = dict(clients or {})
+        for name in self.regions:
+            if name not in self.clients:
+                self.clients[name] = boto3.client('bedrock-runtime', region_name=name, config=BEDROCK_CLIENT_CONFIG)
+        self.router = router or region_routers.setdefault(tuple(self.regions), RegionRouter(self.regions))
+        self.primary_model = primary_model or BEDROCK_MODEL_ID
+        self.backup_model = backup_model or BEDROCK_BACKUP_MODEL_ID
+        self.cache = cache if cache is not None else ResponseCache()
+        self.prompt_caching = prompt_caching
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker = breaker or model_breaker
+        self.rate_limiter = rate_limiter or model_rate_limiter
+        self.hedging = hedging
+        self.latency = latency or latency_tracker
+        self.hedge_stats = hedge_stats
+        self._sleep = time.sleep
+        # Models that rejected a cache checkpoint; prefixes are sent to them as plain text
+        self._no_prompt_cache = set()
+    
+    def _send(self, operation, model_id, prompt, temperature, max_tokens, prefix, interview_id, call_name):
+        """
+        Send one request, dropping the prompt-cache checkpoint if the model rejects it.
+
+        Caching is turned off for the model only when the rejection names the
+        checkpoint; any other validation error is raised unchanged.
+        """
+        cache_prefix = bool(prefix) and self.prompt_caching and model_id not in self._no_prompt_cache
+        try:
+            return operation(
+                modelId=model_id,
+                body=build_request_body(prompt, temperature, max_tokens, prefix, cache_prefix)
+            )
+        except ClientError as e:
+            if not cache_prefix or not is_prompt_cache_rejection(e):
+                raise
+            self._no_prompt_cache.add(model_id)
+            StructuredLogger.warning(
+                f"Prompt caching rejected by {model_id}; resending without cache checkpoint",
+                interview_id=interview_id,
+                extra={'call_name': call_name, 'model_id': model_id}
+            )
+            return operation(
+                modelId=model_id,
+                body=build_request_body(prompt, temperature, max_tokens, prefix, False)
+            )
+    
+    def _call_with_retries(self, model_id: str, call: Callable[[], Any], interview_id: Optional[str],
+                           call_name: Optional[str], tokens: int = 0, region: Optional[str] = None,
+                           failover: bool = False) -> Any:
+        """
+        Run `call` against one model, retrying throttling and transient errors.
+        
+        Every attempt first acquires one request and `tokens` tokens from the
+        shared rate limiter, so concurrent pipelines queue instead of being
+        throttled together. A failed attempt returns its tokens; a successful
+        one keeps them for the caller to settle against actual usage. Throttling and 5xx responses are retried with jittered exponential
+        backoff; anything else fails fast. Only transient failures count
+        against the model's circuit breaker: throttling means the model is up
+        but busy, and a validation error means it answered.
+        
+        `model_id` is the breaker and rate-limit key (`model@region`). Each
+        attempt's latency or failure is reported to the region router. With
+        `failover`, throttling is not retried here: another region is tried
+        instead.
+        
+        Raises:
+            BedrockError: If the model's circuit breaker is open
+            Exception: The last error once retries are exhausted
+        """
+        started = time.time()
+        attempt = 0
+        while True:
+            if not self.breaker.allow(model_id):
+                raise BedrockError(f"Circuit open for {model_id}; skipping it for now")
+            if self.rate_limiter:
+                self.rate_limiter.acquire(model_id, tokens)
+            attempt_started = time.time()
+            try:
+                result = call()
+            except Exception as e:
+                if self.rate_limiter:
+                    self.rate_limiter.release(model_id, tokens)
+                error_class = classify_error(e)
+                if error_class == TRANSIENT:
+                    self.breaker.record_failure(model_id)
+                else:
+                    self.breaker.record_success(model_id)
+                if region:
+                    self.router.record_failure(region, error_class)
+                delay = None if failover and error_class == THROTTLED \
+                    else self.retry_policy.next_delay(attempt, error_class, time.time() - started)
+                StructuredLogger.warning(
+                    f"Bedrock call failed with {model_id}",
+                    interview_id=interview_id,
+                    extra={
+                        'call_name': call_name,
+                        'model_id': model_id,
+                        'attempt': attempt + 1,
+                        'error_class': error_class,
+                        'error_code': error_code(e) or type(e).__name__,
+                        'error_message': str(e),
+                        'retry_in_seconds': delay
+                    }
+                )
+                if delay is None:
+                    raise
+                self._sleep(delay)
+                attempt += 1
+                continue
+            self.breaker.record_success(model_id)
+            if region:
+                self.router.record_success(region, time.time() - attempt_started)
+            return result
+    
+    def _targets(self, models: Optional[List[str]] = None) -> List[Tuple[str, str, bool]]:
+        """
+        (model_id, region, failover) for one call, in the order to try them:
+        the first model in each region best first, then the next model
+        (default: primary, then backup). Throttling fails over to the next
+        region except in a model's last one.
+        """
+        regions = self.router.order()
+        return [
+            (model_id, region, index < len(regions) - 1)
+            for model_id in (models or [self.primary_model, self.backup_model])
+            for index, region in enumerate(regions)
+        ]
     
     def invoke_model(
         self,
@@ -35,17 +265,40 @@ class BedrockClient:
         temperature: float = 0.3,
         max_tokens: int = 4000,
         interview_id: Optional[str] = None,
-        call_name: Optional[str] = None
+        call_name: Optional[str] = None,
+        prompt_version: str = '',
+        prefix: Optional[str] = None,
+        models: Optional[List[str]] = None
     ) -> str:
         """
         Invoke Bedrock model with automatic fallback.
         
+        Regions are tried in the router's order (utils/region_router.py):
+        throttling fails over to the next region at once, and the last region
+        retries throttling and transient errors with backoff. The backup model
+        is used only when the primary fails fast, runs out of retries or has an
+        open circuit breaker in every region.
+        
+        With hedging on, a call still running past the learned latency
+        threshold of its call name (utils/hedging.py) is also sent to the
+        primary model in the next region (the backup model when there is only
+        one region), and the first answer wins.
+        
+        Low-temperature calls are served from the response cache when the same
+        prompt was already answered by the first model.
+        
         Args:
             prompt: The prompt to send to the model
             temperature: Temperature setting (0.0-1.0)
             max_tokens: Maximum tokens to generate
             interview_id: Optional interview ID for logging
             call_name: Optional name of the call (e.g., "Call 1: Synthesis")
+            prompt_version: Prompt template version, part of the cache key
+            prefix: Shared context sent ahead of the prompt and marked as a
+                Bedrock prompt-cache checkpoint, so calls repeating it pay less
+                time-to-first-token and input-token cost
+            models: Models to try in order, e.g. a stage's route
+                (utils/model_routing.py); default primary, then backup
         
         Returns:
             Generated text from the model
@@ -53,82 +306,119 @@ class BedrockClient:
         Raises:
             BedrockError: If all model invocations fail
         """
-        models = [self.primary_model, self.backup_model]
-        last_error = None
-        
-        for model_id in models:
-            try:
+        models = models or [self.primary_model, self.backup_model]
+        cache_key = None
+        if self.cache.is_cacheable(temperature):
+            cache_key = make_cache_key(
+                models[0], prompt, temperature, max_tokens, prompt_version, prefix or ''
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
                 StructuredLogger.info(
-                    f"Invoking Bedrock model: {model_id}",
+                    "Bedrock cache hit",
                     interview_id=interview_id,
-                    extra={'call_name': call_name, 'model_id': model_id}
+                    extra={'call_name': call_name, 'model_id': models[0], 'cache_key': cache_key}
                 )
-                
-                start_time = time.time()
-                response = self.client.invoke_model(
-                    modelId=model_id,
-                    body=json.dumps({
-                        "anthropic_version": "bedrock-2023-05-31",
-                        "max_tokens": max_tokens,
-                        "temperature": temperature,
-                        "messages": [{"role": "user", "content": prompt}]
-                    })
+                return cached
+        
+        # Rate-limit reservation: the prompt plus the most the model may generate
+        reserved = estimate_tokens(prompt + (prefix or '')) + max_tokens
+        targets = self._targets(models)
+        # The hedge is the first model in the next region, or the next model with a single region
+        primary = targets[0]
+        hedge = targets[1] if len(targets) > 1 else None
+        latency_key = f"{models[0]}:{call_name or max_tokens}"
+        
+        def attempt(target):
+            model_id, region, failover = target
+            StructuredLogger.info(
+                f"Invoking Bedrock model: {model_id}",
+                interview_id=interview_id,
+                extra={'call_name': call_name, 'model_id': model_id, 'region': region}
+            )
+            
+            def call():
+                response = self._send(
+                    self.clients[region].invoke_model, model_id, prompt, temperature, max_tokens,
+                    prefix, interview_id, call_name
                 )
-                
-                result = json.loads(response['body'].read())
-                text = result['content'][0]['text']
-                duration = time.time() - start_time
-                
-                StructuredLogger.info(
-                    f"Bedrock call successful",
-                    interview_id=interview_id,
-                    extra={
-                        'call_name': call_name,
-                        'model_id': model_id,
-                        'duration_seconds': duration,
-                        'output_length': len(text)
-                    }
+                return json.loads(response['body'].read())
+            
+            start_time = time.time()
+            result = self._call_with_retries(
+                f"{model_id}@{region}", call, interview_id, call_name, reserved, region, failover
+            )
+            # Every finished attempt, including a hedge that lost the race, returns its unused tokens
+            usage = result.get('usage', {})
+            if self.rate_limiter and usage:
+                used = sum(usage.get(k) or 0 for k in (
+                    'input_tokens', 'output_tokens', 'cache_read_input_tokens', 'cache_creation_input_tokens'
+                ))
+                self.rate_limiter.release(f"{model_id}@{region}", reserved - used)
+            text = result['content'][0]['text']
+            duration = time.time() - start_time
+            # Primary latencies are recorded even when hedging is off, so thresholds are ready when it is on
+            if model_id == models[0]:
+                self.latency.record(latency_key, duration)
+            return target, result, text, duration
+        
+        outcome = None
+        last_error = None
+        delay = self.latency.threshold(latency_key) if self.hedging and hedge else None
+        if delay is not None:
+            try:
+                outcome, hedged, from_hedge = run_hedged(
+                    hedge_executor, lambda: attempt(primary), lambda: attempt(hedge), delay
                 )
-                
-                return text
-                
-            except ClientError as e:
-                error_code = e.response.get('Error', {}).get('Code', 'Unknown')
-                error_message = e.response.get('Error', {}).get('Message', str(e))
+                self.hedge_stats.add(hedged, hedged and from_hedge)
+                if hedged:
+                    StructuredLogger.info(
+                        "Bedrock call hedged",
+                        interview_id=interview_id,
+                        extra={
+                            'call_name': call_name,
+                            'threshold_seconds': round(delay, 2),
+                            'hedge_target': f"{hedge[0]}@{hedge[1]}",
+                            'hedge_won': from_hedge,
+                            **self.hedge_stats.snapshot()
+                        }
+                    )
+            except Exception as e:
                 last_error = e
-                
-                StructuredLogger.warning(
-                    f"Bedrock call failed with {model_id}",
-                    interview_id=interview_id,
-                    extra={
-                        'call_name': call_name,
-                        'model_id': model_id,
-                        'error_code': error_code,
-                        'error_message': error_message
-                    }
-                )
-                
-                # If this was the backup model, we're out of options
-                if model_id == self.backup_model:
-                    break
-                
-                # Wait a bit before trying backup
-                time.sleep(1)
-                continue
-                
+            fallbacks = [t for t in targets if t not in (primary, hedge)]
+        else:
+            fallbacks = targets
+        
+        for target in fallbacks if outcome is None else []:
+            try:
+                outcome = attempt(target)
+                break
             except Exception as e:
                 last_error = e
-                StructuredLogger.error(
-                    f"Unexpected error calling Bedrock",
-                    error=e,
-                    interview_id=interview_id,
-                    extra={'call_name': call_name, 'model_id': model_id}
-                )
-                
-                if model_id == self.backup_model:
-                    break
-                time.sleep(1)
-                continue
+        
+        if outcome is not None:
+            (model_id, region, _), result, text, duration = outcome
+            usage = result.get('usage', {})
+            StructuredLogger.info(
+                f"Bedrock call successful",
+                interview_id=interview_id,
+                extra={
+                    'call_name': call_name,
+                    'model_id': model_id,
+                    'region': region,
+                    'duration_seconds': duration,
+                    'output_length': len(text),
+                    'input_tokens': usage.get('input_tokens'),
+                    'cache_read_input_tokens': usage.get('cache_read_input_tokens'),
+                    'cache_creation_input_tokens': usage.get('cache_creation_input_tokens')
+                }
+            )
+            
+            # Fallback-model answers are not cached so a rerun can still get the first model's output
+            if cache_key and model_id == models[0]:
+                self.cache.put(cache_key, text)
+            
+            return text
         
         # All models failed
         error_msg = f"All Bedrock models failed. Last error: {str(last_error)}"
@@ -139,6 +429,135 @@ class BedrockClient:
             extra={'call_name': call_name}
         )
         raise BedrockError(error_msg)
+    
+    def invoke_model_stream(
+        self,
+        prompt: str,
+        temperature: float = 0.3,
+        max_tokens: int = 4000,
+        interview_id: Optional[str] = None,
+        call_name: Optional[str] = None,
+        prompt_version: str = '',
+        prefix: Optional[str] = None,
+        models: Optional[List[str]] = None
+    ) -> Iterator[str]:
+        """
+        Stream a completion as text deltas.
+        
+        Errors before the first token fail over across regions and are retried
+        like invoke_model, then fall back to the backup model; a mid-stream
+        failure cannot be replayed and raises. Streams are not hedged.
+        
+        Args:
+            prompt: The prompt to send to the model
+            temperature: Temperature setting (0.0-1.0)
+            max_tokens: Maximum tokens to generate
+            interview_id: Optional interview ID for logging
+            call_name: Optional name of the call (e.g., "Call 5: Assembly")
+            prompt_version: Prompt template version, part of the cache key
+            prefix: Shared context sent ahead of the prompt as a cache checkpoint
+            models: Models to try in order; default primary, then backup
+        
+        Yields:
+            Successive pieces of generated text
+        
+        Raises:
+            BedrockError: If all model invocations fail
+        """
+        models = models or [self.primary_model, self.backup_model]
+        cache_key = None
+        if self.cache.is_cacheable(temperature):
+            cache_key = make_cache_key(
+                models[0], prompt, temperature, max_tokens, prompt_version, prefix or ''
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        
+        prompt_tokens = estimate_tokens(prompt + (prefix or ''))
+        reserved = prompt_tokens + max_tokens
+        last_error = None
+        for model_id, region, failover in self._targets(models):
+            parts = []
+            StructuredLogger.info(
+                f"Streaming Bedrock model: {model_id}",
+                interview_id=interview_id,
+                extra={'call_name': call_name, 'model_id': model_id, 'region': region}
+            )
+            start_time = time.time()
+            
+            def open_stream() -> Tuple[Optional[str], Iterator[str]]:
+                # Throttling can arrive as the first stream event, so the first
+                # delta is read inside the retried call
+                response = self._send(
+                    self.clients[region].invoke_model_with_response_stream, model_id, prompt, temperature,
+                    max_tokens, prefix, interview_id, call_name
+                )
+                deltas = iter_stream_text(response)
+                return next(deltas, None), deltas
+            
+            try:
+                first, deltas = self._call_with_retries(
+                    f"{model_id}@{region}", open_stream, interview_id, call_name, reserved, region, failover
+                )
+            except Exception as e:
+                last_error = e
+                continue
+            
+            try:
+                if first is not None:
+                    StructuredLogger.info(
+                        "Bedrock stream first token",
+                        interview_id=interview_id,
+                        extra={
+                            'call_name': call_name,
+                            'model_id': model_id,
+                            'region': region,
+                            'time_to_first_token_seconds': time.time() - start_time
+                        }
+                    )
+                    parts.append(first)
+                    yield first
+                for delta in deltas:
+                    parts.append(delta)
+                    yield delta
+            except Exception as e:
+                last_error = e
+                if self.rate_limiter:
+                    streamed = estimate_tokens(''.join(parts))
+                    self.rate_limiter.release(f"{model_id}@{region}", reserved - prompt_tokens - streamed)
+                StructuredLogger.warning(
+                    f"Bedrock stream failed with {model_id}",
+                    interview_id=interview_id,
+                    extra={
+                        'call_name': call_name,
+                        'model_id': model_id,
+                        'error_message': str(e),
+                        'chars_streamed': sum(len(p) for p in parts)
+                    }
+                )
+                break
+            
+            text = ''.join(parts)
+            if self.rate_limiter:
+                self.rate_limiter.release(f"{model_id}@{region}", reserved - prompt_tokens - estimate_tokens(text))
+            StructuredLogger.info(
+                "Bedrock stream complete",
+                interview_id=interview_id,
+                extra={
+                    'call_name': call_name,
+                    'model_id': model_id,
+                    'region': region,
+                    'duration_seconds': time.time() - start_time,
+                    'output_length': len(text)
+                }
+            )
+            if cache_key and model_id == models[0]:
+                self.cache.put(cache_key, text)
+            return
+        
+        raise BedrockError(f"Bedrock stream failed. Last error: {str(last_error)}")
 
 
 # Global instance
@@ -0,0 +1,302 @@
+"""
+Boilerplate-aware text extraction from HTML.
+
+Pages are split into text blocks at block-level element boundaries. Each
+block is classified from its length, sentence structure, link density and
+the class/id/role hints of its ancestors:
+
+    good        - body text (long, few links, sentence-like)
+    heading     - h1-h6 text, kept when it introduces good text
+    short       - plain text that is too short to judge
+    boilerplate - menus, link lists, cookie banners, share bars, legal lines
+
+Output puts the good blocks (with their headings) first in document order,
+then fills any remaining budget with short blocks. Boilerplate is dropped.
+The parser works incrementally, so it can be fed a response chunk by chunk
+and stopped once `chars` of good text has been collected.
+
+Anchors are recorded in `links` as (href, text) pairs, including those in
+skipped navigation and footer subtrees, for link discovery.
+"""
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+# Bump when a change alters the text extracted from the same HTML; it is part
+# of scrape cache keys, so entries written by an older extractor are not served
+EXTRACTOR_VERSION = 1
+
+# Subtrees that never contain readable content
+SKIP_TAGS = {
+    'script', 'style', 'noscript', 'template', 'svg', 'canvas', 'head', 'iframe',
+    'object', 'nav', 'footer', 'form', 'button', 'select', 'textarea'
+}
+
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+    'param', 'source', 'track', 'wbr'
+}
+
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'body', 'dd', 'div', 'dl', 'dt',
+    'figcaption', 'figure', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'html',
+    'li', 'main', 'ol', 'p', 'pre', 'section', 'table', 'tbody', 'td', 'th',
+    'thead', 'tr', 'ul'
+}
+
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+# Key/value cells (infoboxes, fact tables) are short and often a single link
+CELL_TAGS = {'td', 'th', 'dd', 'dt'}
+CELL_MAX_CHARS = 80
+
+# Tags closed implicitly when another of the same kind opens
+SELF_NESTING_TAGS = {'p', 'li', 'dt', 'dd', 'tr', 'td', 'th'}
+
+NEGATIVE_HINT = re.compile(
+    r'nav|menu|footer|header|masthead|cookie|consent|gdpr|banner|breadcrumb|sidebar|'
+    r'social|share|subscribe|newsletter|promo|modal|popup|related|comment|widget|'
+    r'toolbar|login|signup|copyright|legal|skip|disclaimer|advert|sponsor|toc',
+    re.IGNORECASE
+)
+POSITIVE_HINT = re.compile(
+    r'article|content|main|post|story|entry|body|text|about|mission|overview|'
+    r'history|bio|profile|description|summary',
+    re.IGNORECASE
+)
+NEGATIVE_ROLES = {'navigation', 'banner', 'contentinfo', 'complementary', 'search', 'dialog', 'menu'}
+POSITIVE_ROLES = {'main', 'article'}
+TAG_HINTS = {'main': 1, 'article': 1, 'aside': -1, 'header': -1}
+
+SENTENCE_END = re.compile(r'[.!?](?:\s|$)')
+
+GOOD_MIN_CHARS = 80
+GOOD_MIN_WORDS = 12
+GOOD_MAX_LINK_DENSITY = 0.3
+BOILERPLATE_LINK_DENSITY = 0.5
+# Long, link-free text inside a negatively hinted container is still kept as "short"
+OVERRIDE_MIN_CHARS = 200
+MAX_LINKS = 500
+
+
+def element_hint(tag: str, attrs: List[Tuple[str, Optional[str]]]) -> int:
+    """+1 for content containers, -1 for boilerplate containers, 0 if unknown."""
+    values = dict(attrs)
+    role = (values.get('role') or '').lower()
+    if role in NEGATIVE_ROLES:
+        return -1
+    if role in POSITIVE_ROLES:
+        return 1
+    names = f"{values.get('id') or ''} {values.get('class') or ''}"
+    negative = bool(NEGATIVE_HINT.search(names))
+    positive = bool(POSITIVE_HINT.search(names))
+    if negative and not positive:
+        return -1
+    if positive and not negative:
+        return 1
+    return TAG_HINTS.get(tag, 0)
+
+
+class Block:
+    """A run of text between two block-level boundaries."""
+
+    __slots__ = ('text', 'link_chars', 'tag', 'hint', 'kind')
+
+    def __init__(self, text: str, link_chars: int, tag: str, hint: int):
+        self.text = text
+        self.link_chars = link_chars
+        self.tag = tag
+        self.hint = hint
+        self.kind = classify_block(self)
+
+    @property
+    def link_density(self) -> float:
+        return min(1.0, self.link_chars / len(self.text)) if self.text else 0.0
+
+
+def classify_block(block: Block) -> str:
+    text = block.text
+    n = len(text)
+    link_density = block.link_density
+    if block.hint < 0:
+        if n >= OVERRIDE_MIN_CHARS and link_density < GOOD_MAX_LINK_DENSITY:
+            return 'short'
+        return 'boilerplate'
+    if block.tag in CELL_TAGS and n <= CELL_MAX_CHARS:
+        return 'short'
+    if link_density > BOILERPLATE_LINK_DENSITY:
+        return 'boilerplate'
+    if block.tag in HEADING_TAGS:
+        return 'heading'
+    words = len(text.split())
+    if (n >= GOOD_MIN_CHARS and words >= GOOD_MIN_WORDS
+            and link_density <= GOOD_MAX_LINK_DENSITY and SENTENCE_END.search(text)):
+        return 'good'
+    if block.hint > 0 and n >= GOOD_MIN_CHARS and link_density <= GOOD_MAX_LINK_DENSITY:
+        return 'good'
+    return 'short'
+
+
+class ContentExtractor(HTMLParser):
+    """Incremental HTML parser that separates main content from boilerplate."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        # Open elements: (tag, hint, is_skip)
+        self._stack: List[Tuple[str, int, bool]] = []
+        self._skip_depth = 0
+        self._link_depth = 0
+        self._parts: List[str] = []
+        self._link_chars = 0
+        self._seen = set()
+        self.blocks: List[Block] = []
+        self.chars = 0
+        # Open anchor: (href, fallback label, text parts)
+        self._anchor: Optional[Tuple[str, str, List[str]]] = None
+        self.links: List[Tuple[str, str]] = []
+
+    # ── Parser callbacks ───────────────────────────────────
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            if tag == 'br':
+                self._parts.append(' ')
+            return
+        if tag in SELF_NESTING_TAGS and self._stack and self._stack[-1][0] == tag:
+            self._pop_to(tag)
+        if tag in BLOCK_TAGS:
+            self._flush()
+        is_skip = tag in SKIP_TAGS
+        self._stack.append((tag, element_hint(tag, attrs), is_skip))
+        if is_skip:
+            self._skip_depth += 1
+        if tag == 'a':
+            self._link_depth += 1
+            self._close_anchor()
+            values = dict(attrs)
+            href = (values.get('href') or '').strip()
+            if href:
+                self._anchor = (href, values.get('aria-label') or values.get('title') or '', [])
+
+    def handle_startendtag(self, tag, attrs):
+        if tag == 'br':
+            self._parts.append(' ')
+
+    def handle_endtag(self, tag):
+        if not any(open_tag == tag for open_tag, _, _ in self._stack):
+            return
+        if tag in BLOCK_TAGS:
+            self._flush()
+        self._pop_to(tag)
+
+    def handle_data(self, data):
+        if self._anchor is not None:
+            self._anchor[2].append(data)
+        if self._skip_depth or not data.strip():
+            # Keep word boundaries between inline elements
+            if not self._skip_depth and data:
+                self._parts.append(' ')
+            return
+        self._parts.append(data)
+        if self._link_depth:
+            self._link_chars += len(data.strip())
+
+    # ── Internals ──────────────────────────────────────────
+
+    def _pop_to(self, tag: str) -> None:
+        while self._stack:
+            open_tag, _, is_skip = self._stack.pop()
+            if is_skip:
+                self._skip_depth -= 1
+            if open_tag == 'a':
+                self._link_depth -= 1
+                self._close_anchor()
+            if open_tag == tag:
+                return
+
+    def _close_anchor(self) -> None:
+        if self._anchor is None:
+            return
+        href, label, parts = self._anchor
+        self._anchor = None
+        if len(self.links) < MAX_LINKS:
+            text = re.sub(r'\s+', ' ', ''.join(parts)).strip() or label.strip()
+            self.links.append((href, text))
+
+    def _context(self) -> Tuple[str, int]:
+        block_tag = 'body'
+        for tag, _, _ in reversed(self._stack):
+            if tag in BLOCK_TAGS:
+                block_tag = tag
+                break
+        hint = 0
+        for _, element, _ in reversed(self._stack):
+            if element:
+                hint = element
+                break
+        return block_tag, hint
+
+    def _flush(self) -> None:
+        text = re.sub(r'\s+', ' ', ''.join(self._parts)).strip()
+        link_chars = self._link_chars
+        self._parts = []
+        self._link_chars = 0
+        if not text:
+            return
+        key = text.lower()
+        if key in self._seen:
+            return
+        self._seen.add(key)
+        tag, hint = self._context()
+        block = Block(text, link_chars, tag, hint)
+        self.blocks.append(block)
+        if block.kind == 'good':
+            self.chars += len(text) + 1
+
+    # ── Output ─────────────────────────────────────────────
+
+    def finish(self) -> List[Block]:
+        """Flush any pending text and return all blocks in document order."""
+        self._flush()
+        return self.blocks
+
+    def extract(self, max_chars: Optional[int] = None) -> str:
+        """Main content first, then short blocks, within max_chars."""
+        blocks = self.finish()
+        selected = set()
+        for i, block in enumerate(blocks):
+            if block.kind == 'good':
+                selected.add(i)
+                # A heading directly above body text introduces it
+                if i > 0 and blocks[i - 1].kind == 'heading':
+                    selected.add(i - 1)
+
+        ordered = [blocks[i].text for i in sorted(selected)]
+        ordered += [b.text for i, b in enumerate(blocks) if i not in selected and b.kind in ('short', 'heading')]
+        if not ordered:
+            # Nothing survived classification; fall back to anything that is not a link list
+            ordered = [b.text for b in blocks if b.link_density <= BOILERPLATE_LINK_DENSITY]
+
+        out: List[str] = []
+        total = 0
+        for text in ordered:
+            if max_chars is not None and total >= max_chars:
+                break
+            out.append(text)
+            total += len(text) + 1
+        text = ' '.join(out)
+        return text[:max_chars] if max_chars is not None else text
+
+    def summary(self) -> Dict[str, int]:
+        """Character counts per block kind (for benchmarks and logging)."""
+        counts: Dict[str, int] = {}
+        for block in self.finish():
+            counts[block.kind] = counts.get(block.kind, 0) + len(block.text)
+        return counts
+
+
+def extract_content(html: str, max_chars: Optional[int] = None) -> str:
+    """Convenience wrapper for a complete HTML document."""
+    parser = ContentExtractor()
+    parser.feed(html)
+    return parser.extract(max_chars)
@@ -0,0 +1,152 @@
+"""
+Streaming RSS 2.0 / Atom parsing for news feeds.
+
+Feeds are fed to an XMLPullParser chunk by chunk and complete items are
+yielded as soon as their closing tag arrives. Parsing stops once enough items
+have been seen, so a large feed is never buffered whole. Items are then
+deduplicated (news aggregators list the same story from several outlets) and
+sorted newest first.
+"""
+import html
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+ITEM_TAGS = {'item', 'entry'}
+# Title token overlap above which two items are treated as the same story
+DUPLICATE_SIMILARITY = 0.8
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else ''
+
+
+def clean_text(value: Optional[str]) -> str:
+    """Strip markup and entities from a feed field."""
+    if not value:
+        return ''
+    text = html.unescape(_TAG_RE.sub(' ', value))
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def parse_date(value: Optional[str]) -> Optional[datetime]:
+    """Parse an RSS (RFC 822) or Atom (ISO 8601) timestamp into an aware datetime."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _item_from_element(element: ET.Element) -> Dict[str, Any]:
+    fields: Dict[str, Any] = {'title': '', 'description': '', 'link': '', 'published': None, 'source': ''}
+    for child in element:
+        name = _local(child.tag)
+        text = child.text or ''
+        if name == 'title':
+            fields['title'] = clean_text(text)
+        elif name in ('description', 'summary') or (name == 'content' and not fields['description']):
+            fields['description'] = clean_text(text)
+        elif name == 'link':
+            # RSS puts the URL in the text; Atom in href (prefer rel="alternate")
+            href = child.get('href')
+            if href and child.get('rel', 'alternate') == 'alternate':
+                fields['link'] = href.strip()
+            elif text.strip() and not fields['link']:
+                fields['link'] = text.strip()
+        elif name in ('pubDate', 'published', 'updated', 'date') and fields['published'] is None:
+            fields['published'] = parse_date(text)
+        elif name == 'source':
+            fields['source'] = clean_text(text)
+    return fields
+
+
+def iter_feed_items(chunks: Iterable[bytes], max_items: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield items from RSS or Atom bytes as they are parsed.
+
+    Stops reading after `max_items` items. A parse error ends the stream
+    quietly if some items were already produced (truncated feeds are common
+    when a byte cap applies); otherwise it is raised.
+    """
+    parser = ET.XMLPullParser(events=('end',))
+    produced = 0
+
+    def items():
+        for _, element in parser.read_events():
+            if _local(element.tag) not in ITEM_TAGS:
+                continue
+            item = _item_from_element(element)
+            # Drop the subtree so memory stays flat on long feeds
+            element.clear()
+            if item['title']:
+                yield item
+
+    def parsed():
+        for chunk in chunks:
+            parser.feed(chunk)
+            yield from items()
+        parser.close()
+        yield from items()
+
+    try:
+        for item in parsed():
+            yield item
+            produced += 1
+            if max_items is not None and produced >= max_items:
+                return
+    except ET.ParseError:
+        if not produced:
+            raise
+
+
+def _title_tokens(item: Dict[str, Any]) -> set:
+    title = item['title']
+    source = item.get('source')
+    # Aggregators append " - Outlet" to titles
+    if source and title.endswith(f' - {source}'):
+        title = title[:-len(source) - 3]
+    elif ' - ' in title:
+        title = title.rsplit(' - ', 1)[0]
+    return set(_WORD_RE.findall(title.lower()))
+
+
+def dedupe_items(items: Iterable[Dict[str, Any]], similarity: float = DUPLICATE_SIMILARITY) -> List[Dict[str, Any]]:
+    """Drop repeated links and near-identical titles, keeping the first occurrence."""
+    kept: List[Dict[str, Any]] = []
+    seen_links = set()
+    token_sets: List[set] = []
+    for item in items:
+        if item['link'] and item['link'] in seen_links:
+            continue
+        tokens = _title_tokens(item)
+        if tokens and any(len(tokens & other) / len(tokens | other) >= similarity for other in token_sets):
+            continue
+        if item['link']:
+            seen_links.add(item['link'])
+        token_sets.append(tokens)
+        kept.append(item)
+    return kept
+
+
+def read_feed(chunks: Iterable[bytes], limit: int = 5, scan: int = 30) -> List[Dict[str, Any]]:
+    """
+    The `limit` most recent distinct items among the first `scan` in the feed.
+
+    Items without a date sort after dated ones, keeping feed order.
+    """
+    items = dedupe_items(iter_feed_items(chunks, max_items=scan))
+    oldest = datetime.min.replace(tzinfo=timezone.utc)
+    items.sort(key=lambda item: item['published'] or oldest, reverse=True)
+    return items[:limit]
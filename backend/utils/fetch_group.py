@@ -0,0 +1,154 @@
+"""
+Concurrent fetching of independent sources under one overall deadline.
+
+Every source is submitted to a shared thread pool up front, so a request
+takes roughly as long as its slowest source instead of the sum of all of
+them. Sources that have not finished by the deadline are abandoned; their
+worker threads are not waited for. Each source ends with a status so callers
+can return partial results and say which sources are missing.
+"""
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+STATUS_OK = 'ok'
+STATUS_TIMEOUT = 'timeout'
+STATUS_ERROR = 'error'
+STATUS_SKIPPED = 'skipped'
+
+
+def is_timeout(exc: BaseException) -> bool:
+    """True for socket timeouts, including urllib's URLError wrapping one."""
+    return isinstance(exc, TimeoutError) or isinstance(getattr(exc, 'reason', None), TimeoutError)
+
+
+class FetchGroup:
+    """A set of named fetches sharing a thread pool and a deadline."""
+
+    def __init__(self, timeout: float, max_workers: int = 8, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            timeout: Seconds from now until results are collected regardless
+            max_workers: Upper bound on fetches running at once
+            clock: Monotonic time source (injectable for tests)
+        """
+        self._clock = clock
+        self.started = clock()
+        self.deadline = self.started + max(0.0, timeout)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._futures: Dict[str, Future] = {}
+        self._finished: Dict[str, float] = {}
+        self.report: Dict[str, Dict[str, Any]] = {}
+
+    def _track(self, name: str, future: Future) -> Future:
+        self._futures[name] = future
+        future.add_done_callback(lambda f: self._finished.setdefault(name, self._clock()))
+        return future
+
+    def submit(self, name: str, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """Start a single fetch; its return value becomes the result for `name`."""
+        return self._track(name, self._executor.submit(fn, *args, **kwargs))
+
+    def submit_race(self, name: str, calls: List[Callable[[], Any]],
+                    accept: Callable[[Any], bool] = lambda r: r is not None) -> Future:
+        """
+        Start several alternative fetches; the first accepted result wins.
+
+        Probes still queued when a winner arrives are cancelled. If no probe
+        produces an accepted result, the race fails with the last probe error
+        (or LookupError when the probes returned but none was accepted).
+        """
+        race: Future = Future()
+        probes: List[Future] = []
+        pending = [len(calls)]
+        last_error: List[BaseException] = [LookupError("no alternative succeeded")]
+
+        def on_done(probe: Future) -> None:
+            accepted = False
+            if not probe.cancelled():
+                if probe.exception() is None:
+                    result = probe.result()
+                    accepted = accept(result)
+                else:
+                    last_error[0] = probe.exception()
+            # set_result raises if another probe already won; losing probes just finish
+            try:
+                if accepted:
+                    race.set_result(result)
+                    for other in probes:
+                        other.cancel()
+                    return
+                pending[0] -= 1
+                if pending[0] == 0:
+                    race.set_exception(last_error[0])
+            except Exception:
+                pass
+
+        if not calls:
+            race.set_exception(last_error[0])
+        for call in calls:
+            probes.append(self._executor.submit(call))
+        for probe in probes:
+            probe.add_done_callback(on_done)
+
+        return self._track(name, race)
+
+    def skip(self, name: str, reason: str = '') -> None:
+        """Record a source that was not attempted."""
+        self.report[name] = {'status': STATUS_SKIPPED, 'elapsed_ms': 0}
+        if reason:
+            self.report[name]['error'] = reason
+
+    def wait_for(self, *names: str) -> None:
+        """Block until the named fetches finish or the deadline passes."""
+        futures = [self._futures[name] for name in names if name in self._futures]
+        wait(futures, timeout=self.remaining())
+
+    def peek(self, name: str, default: Any = None) -> Any:
+        """Result of a finished, successful fetch; `default` otherwise. Never blocks."""
+        future = self._futures.get(name)
+        if future is None or not future.done() or future.cancelled() or future.exception() is not None:
+            return default
+        return future.result()
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)."""
+        return max(0.0, self.deadline - self._clock())
+
+    def slice(self, limit: Optional[float] = None) -> float:
+        """Time a fetch started now may spend: the remaining budget, capped at `limit`."""
+        remaining = self.remaining()
+        return remaining if limit is None else min(limit, remaining)
+
+    def collect(self, default: Any = None) -> Dict[str, Any]:
+        """
+        Wait until every fetch finishes or the deadline passes, then return results.
+
+        Fetches that raised, were skipped or did not finish in time map to
+        `default`; `report` then holds each source's status, elapsed time and
+        error message.
+        """
+        wait(list(self._futures.values()), timeout=self.remaining())
+        now = self._clock()
+        results = {name: default for name in self.report}
+        for name, future in self._futures.items():
+            finished = self._finished.get(name, now)
+            entry = {'elapsed_ms': int((finished - self.started) * 1000)}
+            if not future.done():
+                future.cancel()
+                entry['status'] = STATUS_TIMEOUT
+                results[name] = default
+            elif future.cancelled():
+                entry['status'] = STATUS_SKIPPED
+                results[name] = default
+            elif future.exception() is not None:
+                exc = future.exception()
+                entry['status'] = STATUS_TIMEOUT if is_timeout(exc) else STATUS_ERROR
+                entry['error'] = str(exc)[:200]
+                results[name] = default
+            else:
+                entry['status'] = STATUS_OK
+                results[name] = future.result()
+            self.report[name] = entry
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        return results
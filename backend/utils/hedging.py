@@ -0,0 +1,140 @@
+"""
+Hedged requests: race a second request when the first is unusually slow.
+
+A LatencyTracker keeps a rolling window of recent call latencies per key
+(model and pipeline stage) and learns a threshold from it, by default the
+p90. run_hedged starts the primary request and waits for that threshold. If
+the primary has not answered by then, it sends the same request to a hedge
+target (the backup model or another region) and returns whichever succeeds
+first. About one call in ten pays for a second request, and in exchange the
+slowest tail no longer sets the pipeline's run time.
+
+An in-flight boto3 call cannot be interrupted, so the losing request is
+abandoned: its result is ignored and its thread finishes in the background.
+"""
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+try:
+    from config import (
+        BEDROCK_HEDGE_QUANTILE, BEDROCK_HEDGE_MIN_SAMPLES, BEDROCK_HEDGE_WINDOW, BEDROCK_HEDGE_MIN_DELAY
+    )
+except ImportError:
+    # Fallback for when running as standalone
+    import os
+    BEDROCK_HEDGE_QUANTILE = float(os.getenv('BEDROCK_HEDGE_QUANTILE', '0.9'))
+    BEDROCK_HEDGE_MIN_SAMPLES = int(os.getenv('BEDROCK_HEDGE_MIN_SAMPLES', '10'))
+    BEDROCK_HEDGE_WINDOW = int(os.getenv('BEDROCK_HEDGE_WINDOW', '100'))
+    BEDROCK_HEDGE_MIN_DELAY = float(os.getenv('BEDROCK_HEDGE_MIN_DELAY', '2.0'))
+
+
+class LatencyTracker:
+    """Rolling latency samples per key and the hedge threshold learned from them."""
+
+    def __init__(
+        self,
+        quantile: float = BEDROCK_HEDGE_QUANTILE,
+        min_samples: int = BEDROCK_HEDGE_MIN_SAMPLES,
+        window: int = BEDROCK_HEDGE_WINDOW,
+        min_delay: float = BEDROCK_HEDGE_MIN_DELAY
+    ):
+        """
+        Args:
+            quantile: Latency quantile used as the hedge threshold
+            min_samples: Samples needed before a key is hedged at all
+            window: Most recent samples kept per key
+            min_delay: Floor on the threshold, so fast calls are never hedged
+        """
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.window = window
+        self.min_delay = min_delay
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, key: str, quantile: Optional[float] = None) -> Optional[float]:
+        """Nearest-rank quantile of the recorded samples, or None without any."""
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if not samples:
+            return None
+        q = self.quantile if quantile is None else quantile
+        index = min(len(samples) - 1, max(0, int(round(q * len(samples))) - 1))
+        return samples[index]
+
+    def threshold(self, key: str) -> Optional[float]:
+        """Seconds to wait before hedging `key`, or None while too few samples are recorded."""
+        with self._lock:
+            count = len(self._samples.get(key, ()))
+        if count < self.min_samples:
+            return None
+        return max(self.min_delay, self.percentile(key))
+
+
+class HedgeStats:
+    """Counters for how often hedges fire and win."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {'calls': 0, 'hedged': 0, 'hedge_wins': 0}
+
+    def add(self, hedged: bool, hedge_won: bool) -> None:
+        with self._lock:
+            self.counts['calls'] += 1
+            self.counts['hedged'] += int(hedged)
+            self.counts['hedge_wins'] += int(hedge_won)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Counts plus hedge rate (hedged / calls) and win rate (wins / hedged)."""
+        with self._lock:
+            counts = dict(self.counts)
+        counts['hedge_rate'] = round(counts['hedged'] / counts['calls'], 3) if counts['calls'] else 0.0
+        counts['win_rate'] = round(counts['hedge_wins'] / counts['hedged'], 3) if counts['hedged'] else 0.0
+        return counts
+
+
+def run_hedged(
+    executor: Executor,
+    primary: Callable[[], Any],
+    hedge: Callable[[], Any],
+    delay: float
+) -> Tuple[Any, bool, bool]:
+    """
+    Run `primary`; if it has not finished after `delay` seconds, also run `hedge`.
+
+    If the primary fails before the delay, the hedge runs at once, acting as a
+    plain fallback. Once both are running, the first success wins, and if one
+    fails the other is awaited.
+
+    Returns:
+        (result, whether the hedge raced a still-running primary, whether the
+        result came from `hedge`)
+
+    Raises:
+        The error of whichever request failed last, if neither succeeds
+    """
+    first: Future = executor.submit(primary)
+    done, _ = wait([first], timeout=delay)
+    if done and first.exception() is None:
+        return first.result(), False, False
+    if done:
+        # Primary failed fast: the hedge is just a fallback
+        return hedge(), False, True
+
+    second: Future = executor.submit(hedge)
+    pending = {first, second}
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        # When both finish together, prefer the primary's answer
+        for future in sorted(done, key=lambda f: f is not first):
+            if future.exception() is None:
+                return future.result(), True, future is second
+            error = future.exception()
+    raise error
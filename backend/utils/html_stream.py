@@ -0,0 +1,77 @@
+"""
+Incremental reading of HTTP responses with byte and text caps.
+
+Scraped pages are cut to a few KB of text, so there is no point downloading a
+multi-megabyte homepage in full. The body is read in chunks, decoded
+incrementally and fed to an HTMLParser as it arrives; reading stops once the
+parser has collected enough text or a hard byte cap is reached.
+"""
+import codecs
+from html.parser import HTMLParser
+from typing import Any
+
+try:
+    from config import SCRAPER_MAX_BYTES, SCRAPER_CHUNK_BYTES
+except ImportError:
+    # Fallback for when running as standalone
+    import os
+    SCRAPER_MAX_BYTES = int(os.getenv('SCRAPER_MAX_BYTES', str(2 * 1024 * 1024)))
+    SCRAPER_CHUNK_BYTES = int(os.getenv('SCRAPER_CHUNK_BYTES', str(16 * 1024)))
+
+
+def _decoder(response: Any):
+    charset = 'utf-8'
+    headers = getattr(response, 'headers', None)
+    if headers is not None and hasattr(headers, 'get_content_charset'):
+        charset = headers.get_content_charset() or 'utf-8'
+    try:
+        return codecs.getincrementaldecoder(charset)(errors='ignore')
+    except LookupError:
+        return codecs.getincrementaldecoder('utf-8')(errors='ignore')
+
+
+def iter_chunks(response: Any, max_bytes: int = SCRAPER_MAX_BYTES, chunk_size: int = SCRAPER_CHUNK_BYTES):
+    """Yield raw byte chunks from a file-like response, stopping at max_bytes."""
+    read = 0
+    while read < max_bytes:
+        chunk = response.read(min(chunk_size, max_bytes - read))
+        if not chunk:
+            break
+        read += len(chunk)
+        yield chunk
+
+
+def iter_decoded(response: Any, max_bytes: int = SCRAPER_MAX_BYTES, chunk_size: int = SCRAPER_CHUNK_BYTES):
+    """Yield decoded text chunks from a file-like response, stopping at max_bytes."""
+    decoder = _decoder(response)
+    for chunk in iter_chunks(response, max_bytes, chunk_size):
+        yield decoder.decode(chunk)
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+def read_capped(response: Any, max_bytes: int = SCRAPER_MAX_BYTES, chunk_size: int = SCRAPER_CHUNK_BYTES) -> str:
+    """Read and decode at most max_bytes of a response body."""
+    return ''.join(iter_decoded(response, max_bytes, chunk_size))
+
+
+def stream_extract(
+    response: Any,
+    parser: HTMLParser,
+    max_chars: int,
+    max_bytes: int = SCRAPER_MAX_BYTES,
+    chunk_size: int = SCRAPER_CHUNK_BYTES
+) -> HTMLParser:
+    """
+    Feed a response to `parser` chunk by chunk until it has max_chars of text.
+
+    The parser must expose a `chars` attribute counting the text it has kept.
+    Returns the parser so the caller can assemble its output.
+    """
+    for text in iter_decoded(response, max_bytes, chunk_size):
+        parser.feed(text)
+        if parser.chars >= max_chars:
+            break
+    # No parser.close(): on a truncated body it would flush a half-read tag as text
+    return parser
@@ -0,0 +1,290 @@
+"""
+Per-host keep-alive HTTP connection pool with compressed transfer.
+
+urllib.request.urlopen opens a fresh TCP+TLS connection for every request.
+The scraper fetches several pages from the same host (homepage, /about,
+leadership candidates), so connections are kept open per (scheme, host, port)
+and handed back to the pool once a response has been read to the end. The
+pool lives at module level, so warm Lambda invocations reuse it as well.
+
+Requests advertise gzip/deflate and bodies are decoded incrementally, so
+callers can keep reading in chunks and stop early. Redirects are followed
+(across hosts too). Error statuses raise urllib.error.HTTPError, so callers
+written against urlopen keep working.
+"""
+import http.client
+import ssl
+import threading
+import time
+import urllib.error
+import urllib.parse
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+# Unread bodies up to this size are drained on close so the connection can be reused
+DRAIN_MAX_BYTES = 64 * 1024
+DECODE_CHUNK_BYTES = 16 * 1024
+# Failures that mean a pooled keep-alive connection was closed by the server
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError,
+                           http.client.BadStatusLine)
+
+PoolKey = Tuple[str, str, int]
+
+
+class _Decoder:
+    """
+    Streaming gzip/deflate decoder; deflate may arrive zlib-wrapped or raw.
+
+    Output is bounded per call: compressed input beyond what max_length bytes
+    of output need is kept and decoded by later calls, so a small compressed
+    body cannot expand into a large buffer the caller never asked for.
+    """
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        self._first = True
+        self._tail = b''
+        if encoding == 'gzip':
+            self._obj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        else:
+            self._obj = zlib.decompressobj(zlib.MAX_WBITS)
+
+    @property
+    def pending(self) -> bool:
+        """True while compressed input from earlier calls is still undecoded."""
+        return bool(self._tail)
+
+    def decompress(self, data: bytes, max_length: int = 0) -> bytes:
+        """Decode earlier leftover input plus `data`, returning at most max_length bytes (0 = no limit)."""
+        data = self._tail + data
+        if self._first and self.encoding == 'deflate':
+            self._first = False
+            try:
+                return self._decode(data, max_length)
+            except zlib.error:
+                # Some servers send raw deflate without the zlib header
+                self._obj = zlib.decompressobj(-zlib.MAX_WBITS)
+        return self._decode(data, max_length)
+
+    def _decode(self, data: bytes, max_length: int) -> bytes:
+        out = self._obj.decompress(data, max_length)
+        self._tail = self._obj.unconsumed_tail
+        return out
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+
+class PooledResponse:
+    """File-like response whose connection returns to the pool once fully read."""
+
+    def __init__(self, pool: 'HTTPPool', key: PoolKey, conn: http.client.HTTPConnection,
+                 raw: http.client.HTTPResponse, url: str):
+        self._pool = pool
+        self._key = key
+        self._conn = conn
+        self._raw = raw
+        self.url = url
+        self.status = raw.status
+        self.reason = raw.reason
+        self.headers = raw.headers
+        encoding = (raw.getheader('Content-Encoding') or '').strip().lower()
+        self._decoder = _Decoder(encoding) if encoding in ('gzip', 'deflate') else None
+        self._buffer = b''
+        self._eof = False
+        self._released = False
+
+    def read(self, amt: int = -1) -> bytes:
+        """Read up to `amt` decoded bytes (all remaining bytes if amt < 0)."""
+        if self._decoder is None:
+            data = self._raw.read() if amt is None or amt < 0 else self._raw.read(amt)
+            if not data or self._raw.isclosed():
+                self._finish()
+            return data
+
+        limited = amt is not None and amt >= 0
+        while not self._eof and (not limited or len(self._buffer) < amt):
+            # Leftover compressed input is decoded before more is read from the socket
+            chunk = b'' if self._decoder.pending else self._raw.read(DECODE_CHUNK_BYTES)
+            if not chunk and not self._decoder.pending:
+                self._buffer += self._decoder.flush()
+                self._finish()
+                break
+            # Never decode more than the caller asked for
+            self._buffer += self._decoder.decompress(chunk, amt - len(self._buffer) if limited else 0)
+        if amt is None or amt < 0:
+            data, self._buffer = self._buffer, b''
+        else:
+            data, self._buffer = self._buffer[:amt], self._buffer[amt:]
+        return data
+
+    def getheader(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self._raw.getheader(name, default)
+
+    def _finish(self) -> None:
+        self._eof = True
+        if not self._released:
+            self._released = True
+            self._pool._release(self._key, self._conn)
+
+    def close(self) -> None:
+        """
+        Release the connection. A partly read body is drained first when only
+        a little is left; otherwise the connection cannot be reused.
+        """
+        if self._released:
+            return
+        self._released = True
+        remaining = self._raw.length
+        if not self._raw.isclosed() and remaining is not None and remaining <= DRAIN_MAX_BYTES:
+            try:
+                self._raw.read()
+            except (OSError, http.client.HTTPException):
+                pass
+        if self._raw.isclosed():
+            self._pool._release(self._key, self._conn)
+        else:
+            self._conn.close()
+
+    def __enter__(self) -> 'PooledResponse':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class HTTPPool:
+    """Thread-safe pool of keep-alive connections keyed by (scheme, host, port)."""
+
+    def __init__(self, max_idle_per_host: int = 4, idle_timeout: float = 30.0,
+                 max_redirects: int = 5, ssl_context: Optional[ssl.SSLContext] = None,
+                 clock=time.monotonic):
+        """
+        Args:
+            max_idle_per_host: Idle connections kept per host; extras are closed
+            idle_timeout: Seconds an idle connection may sit before it is discarded
+            max_redirects: Redirect hops followed before giving up
+            ssl_context: TLS settings for https (default: system trust store)
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.max_idle_per_host = max_idle_per_host
+        self.idle_timeout = idle_timeout
+        self.max_redirects = max_redirects
+        self._ssl_context = ssl_context or ssl.create_default_context()
+        self._clock = clock
+        self._idle: Dict[PoolKey, List[Tuple[float, http.client.HTTPConnection]]] = {}
+        self._lock = threading.Lock()
+        self.stats = {'opened': 0, 'reused': 0}
+
+    # ── Connections ─────────────────────────────────────────
+
+    def _acquire(self, key: PoolKey, timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        now = self._clock()
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                released_at, conn = idle.pop()
+                if now - released_at < self.idle_timeout:
+                    self.stats['reused'] += 1
+                    conn.timeout = timeout
+                    if conn.sock is not None:
+                        conn.sock.settimeout(timeout)
+                    return conn, True
+                conn.close()
+            self.stats['opened'] += 1
+
+        scheme, host, port = key
+        if scheme == 'https':
+            conn = http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl_context)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        return conn, False
+
+    def _release(self, key: PoolKey, conn: http.client.HTTPConnection) -> None:
+        if conn.sock is None:
+            return
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append((self._clock(), conn))
+                return
+        conn.close()
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        with self._lock:
+            for idle in self._idle.values():
+                for _, conn in idle:
+                    conn.close()
+            self._idle.clear()
+
+    # ── Requests ────────────────────────────────────────────
+
+    def _send(self, url: str, headers: Dict[str, str], timeout: float) -> PooledResponse:
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ('http', 'https'):
+            raise urllib.error.URLError(f"unsupported URL scheme: {scheme}")
+        port = parts.port or (443 if scheme == 'https' else 80)
+        key = (scheme, (parts.hostname or '').lower(), port)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+
+        request_headers = {'Accept-Encoding': 'gzip, deflate', 'Connection': 'keep-alive'}
+        request_headers.update(headers)
+
+        conn, reused = self._acquire(key, timeout)
+        try:
+            conn.request('GET', path, headers=request_headers)
+            raw = conn.getresponse()
+        except STALE_CONNECTION_ERRORS:
+            conn.close()
+            if not reused:
+                raise
+            # The server dropped the idle connection; retry once on a fresh one
+            conn, _ = self._acquire_fresh(key, timeout)
+            try:
+                conn.request('GET', path, headers=request_headers)
+                raw = conn.getresponse()
+            except BaseException:
+                conn.close()
+                raise
+        except BaseException:
+            conn.close()
+            raise
+        return PooledResponse(self, key, conn, raw, url)
+
+    def _acquire_fresh(self, key: PoolKey, timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            for _, stale in self._idle.pop(key, []):
+                stale.close()
+        return self._acquire(key, timeout)
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 10.0) -> PooledResponse:
+        """
+        GET a URL, following redirects.
+
+        Raises:
+            urllib.error.HTTPError: for 304 and any 4xx/5xx status
+            OSError: for connection failures and socket timeouts
+        """
+        headers = dict(headers or {})
+        for _ in range(self.max_redirects + 1):
+            response = self._send(url, headers, timeout)
+            location = response.getheader('Location')
+            if response.status in REDIRECT_STATUSES and location:
+                response.close()
+                next_url = urllib.parse.urljoin(url, location)
+                if urllib.parse.urlsplit(next_url).netloc != urllib.parse.urlsplit(url).netloc:
+                    # Validators belong to the original resource only
+                    headers.pop('If-None-Match', None)
+                    headers.pop('If-Modified-Since', None)
+                url = next_url
+                continue
+            if response.status >= 300:
+                response.close()
+                raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, None)
+            return response
+        raise urllib.error.URLError(f"too many redirects fetching {url}")
@@ -0,0 +1,134 @@
+"""
+Find a company's about, leadership and investor pages from its own links.
+
+Instead of probing guessed paths (/team, /leadership, ...) and collecting
+404s, candidate URLs are taken from the homepage anchors and, optionally, the
+site's sitemap.xml. They are scored by anchor text and URL path, and only the
+best few per page kind are fetched.
+"""
+import re
+import urllib.parse
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+PAGE_KINDS = ('about', 'leadership', 'investors')
+
+TEXT_PATTERNS = {
+    'about': re.compile(r'\babout\b|our story|who we are|our company|company overview|our history|mission', re.I),
+    'leadership': re.compile(
+        r'leadership|management|executive|our team|meet the team|\bteam\b|board of directors|'
+        r'founders?\b|our people', re.I),
+    'investors': re.compile(r'investor|shareholder|annual report|financials|sec filings', re.I),
+}
+PATH_PATTERNS = {
+    'about': re.compile(r'/(about|company|who-we-are|our-story|history|overview)(?:[/._-]|$)', re.I),
+    'leadership': re.compile(r'leadership|management|executive|/team(?:[/._-]|$)|/people(?:[/._-]|$)|board|founder', re.I),
+    'investors': re.compile(r'investor|/ir(?:[/._-]|$)|shareholder|annual-report', re.I),
+}
+EXCLUDED = re.compile(
+    r'\.(pdf|jpe?g|png|gif|svg|zip|docx?|xlsx?|pptx?|mp4)$|'
+    r'/(login|signin|sign-in|cart|checkout|search|privacy|terms|cookie|legal)(?:[/._-]|$)',
+    re.I
+)
+
+TEXT_WEIGHT = 3.0
+PATH_WEIGHT = 2.0
+# Deep URLs are usually individual bios or news posts rather than the section page
+DEPTH_PENALTY = 0.5
+MAX_SITEMAP_URLS = 2000
+
+_LOC_RE = re.compile(r'<loc>\s*(.*?)\s*</loc>', re.I | re.S)
+
+
+def _site(netloc: str) -> str:
+    host = netloc.lower().split(':')[0]
+    return host[4:] if host.startswith('www.') else host
+
+
+def parse_sitemap(xml_text: str, limit: int = MAX_SITEMAP_URLS) -> List[str]:
+    """Return the <loc> URLs from a sitemap or sitemap index."""
+    urls = []
+    for match in _LOC_RE.finditer(xml_text or ''):
+        urls.append(match.group(1).replace('&amp;', '&'))
+        if len(urls) >= limit:
+            break
+    return urls
+
+
+def score_link(kind: str, path: str, text: str) -> float:
+    """Relevance of one link for a page kind; 0 means not a candidate."""
+    score = 0.0
+    if text and TEXT_PATTERNS[kind].search(text):
+        score += TEXT_WEIGHT
+    if PATH_PATTERNS[kind].search(path):
+        score += PATH_WEIGHT
+    if score == 0.0:
+        return 0.0
+    depth = len([segment for segment in path.split('/') if segment])
+    return score - DEPTH_PENALTY * max(0, depth - 1)
+
+
+def rank_links(
+    base_url: str,
+    links: Iterable[Tuple[str, str]],
+    kinds: Sequence[str] = PAGE_KINDS
+) -> Dict[str, List[str]]:
+    """
+    Rank same-site links for each page kind.
+
+    Args:
+        base_url: The company homepage; relative hrefs resolve against it
+        links: (href, anchor text) pairs; sitemap URLs can be passed with empty text
+        kinds: Page kinds to rank for
+
+    Returns:
+        {kind: [absolute URL, ...]} best first, excluding the homepage itself
+    """
+    if '://' not in base_url:
+        base_url = 'https://' + base_url
+    site = _site(urllib.parse.urlsplit(base_url).netloc)
+    home_path = urllib.parse.urlsplit(base_url).path.rstrip('/')
+
+    best: Dict[str, Dict[str, float]] = {kind: {} for kind in kinds}
+    for href, text in links:
+        if not href or href.startswith(('#', 'mailto:', 'tel:', 'javascript:')):
+            continue
+        parts = urllib.parse.urlsplit(urllib.parse.urljoin(base_url + '/', href))
+        if parts.scheme not in ('http', 'https') or _site(parts.netloc) != site:
+            continue
+        path = parts.path.rstrip('/') or '/'
+        if path.rstrip('/') == home_path or EXCLUDED.search(path):
+            continue
+        url = urllib.parse.urlunsplit((parts.scheme, parts.netloc, path, parts.query, ''))
+        for kind in kinds:
+            score = score_link(kind, path, text)
+            if score > best[kind].get(url, 0.0):
+                best[kind][url] = score
+
+    return {
+        kind: [url for url, _ in sorted(scores.items(), key=lambda item: (-item[1], len(item[0])))]
+        for kind, scores in best.items()
+    }
+
+
+def discover_pages(
+    base_url: str,
+    links: Iterable[Tuple[str, str]],
+    sitemap_urls: Optional[Iterable[str]] = None,
+    per_kind: int = 2
+) -> Dict[str, List[str]]:
+    """
+    Pick up to `per_kind` URLs per page kind, never the same URL for two kinds.
+
+    Homepage anchors come first; sitemap URLs only add path-matched candidates.
+    """
+    candidates = list(links) + [(url, '') for url in (sitemap_urls or [])]
+    ranked = rank_links(base_url, candidates)
+    chosen: Dict[str, List[str]] = {}
+    taken = set()
+    # Leadership pages are the scarcest, so they get first pick of shared URLs
+    for kind in ('leadership', 'about', 'investors'):
+        picks = [url for url in ranked.get(kind, []) if url not in taken][:per_kind]
+        # Fallback picks are fetched too, so they are reserved as well
+        taken.update(picks)
+        chosen[kind] = picks
+    return chosen
@@ -0,0 +1,98 @@
+"""
+Per-stage model routing and cost accounting.
+
+Pipeline stages differ widely in how much model they need. Synthesis and
+assembly write long, judgement-heavy text, while gaps and schema mostly fill
+structure from context they are handed. A routing table maps each stage to a
+model, the fallback models tried after it, and its output token limit. The
+mechanical stages can then run on a faster, cheaper tier. Stages missing from
+the table use the client's primary and backup models.
+"""
+import json
+from typing import Any, Dict, List, Optional
+
+try:
+    from config import BEDROCK_STAGE_ROUTING, BEDROCK_STAGE_ROUTING_OVERRIDES, BEDROCK_MODEL_PRICES
+except ImportError:
+    # Fallback for when running as standalone
+    import os
+    BEDROCK_STAGE_ROUTING = {}
+    BEDROCK_STAGE_ROUTING_OVERRIDES = os.getenv('BEDROCK_STAGE_ROUTING', '')
+    BEDROCK_MODEL_PRICES = {}
+
+
+class Route:
+    """The model, fallback chain and output token limit for one stage."""
+
+    def __init__(self, model: str, fallbacks: Optional[List[str]] = None, max_tokens: int = 4000):
+        self.model = model
+        # The chain never repeats a model, so a failing model is not retried as its own fallback
+        self.fallbacks: List[str] = []
+        for fallback in fallbacks or []:
+            if fallback != model and fallback not in self.fallbacks:
+                self.fallbacks.append(fallback)
+        self.max_tokens = max_tokens
+
+    @property
+    def models(self) -> List[str]:
+        """Models in the order they are tried."""
+        return [self.model] + self.fallbacks
+
+    def __repr__(self) -> str:
+        return f"Route({self.model!r}, fallbacks={self.fallbacks!r}, max_tokens={self.max_tokens})"
+
+
+def load_routing(
+    base: Optional[Dict[str, Dict[str, Any]]] = None,
+    overrides: Any = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    The routing table with overrides merged in per stage.
+
+    Args:
+        base: Stage → {'model', 'fallbacks', 'max_tokens'} (default BEDROCK_STAGE_ROUTING)
+        overrides: Same shape, as a dict or a JSON string; only the keys given
+            replace the base entry's (default: the BEDROCK_STAGE_ROUTING env var)
+    """
+    routing = {stage: dict(entry) for stage, entry in (BEDROCK_STAGE_ROUTING if base is None else base).items()}
+    if overrides is None:
+        overrides = BEDROCK_STAGE_ROUTING_OVERRIDES
+    if isinstance(overrides, str):
+        overrides = json.loads(overrides) if overrides.strip() else {}
+    for stage, entry in overrides.items():
+        routing[stage] = dict(routing.get(stage, {}), **entry)
+    return routing
+
+
+def resolve_route(
+    stage: Optional[str],
+    default: Route,
+    routing: Optional[Dict[str, Dict[str, Any]]] = None
+) -> Route:
+    """
+    The route for `stage`, with fields the table leaves out taken from `default`.
+
+    An entry that names a model but no fallbacks falls back to the default's
+    whole chain, so a routed stage is never left with a single model.
+    """
+    entry = (load_routing() if routing is None else routing).get(stage or '')
+    if not entry:
+        return default
+    model = entry.get('model') or default.model
+    fallbacks = entry.get('fallbacks')
+    if fallbacks is None:
+        fallbacks = default.models
+    return Route(model, fallbacks, int(entry.get('max_tokens') or default.max_tokens))
+
+
+def estimate_cost(
+    model_id: str,
+    input_tokens: int,
+    output_tokens: int,
+    prices: Optional[Dict[str, Dict[str, float]]] = None
+) -> Optional[float]:
+    """USD cost of one call from its token usage, or None for a model without a price."""
+    price = (BEDROCK_MODEL_PRICES if prices is None else prices).get(model_id)
+    if price is None:
+        return None
+    return (input_tokens * price['input'] + output_tokens * price['output']) / 1000.0
@@ -0,0 +1,209 @@
+"""
+Deduplication and token-budgeted packing of scraped content.
+
+The homepage, about page and Wikipedia often repeat the same paragraphs, and
+news blurbs repeat each other. Each source's text is split into passages,
+near-duplicates are removed across sources with word shingles, and passages
+are ranked by how much concrete information they carry. Passages are then
+packed into one token budget. Each source gets a guaranteed quota of the
+budget, and any budget left over goes to the best remaining passages
+regardless of source.
+"""
+import math
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .payloads import estimate_tokens
+
+try:
+    from config import SCRAPE_TOKEN_BUDGET, SCRAPE_SOURCE_QUOTAS
+except ImportError:
+    # Fallback for when running as standalone
+    import os
+    SCRAPE_TOKEN_BUDGET = int(os.getenv('SCRAPE_TOKEN_BUDGET', '2000'))
+    SCRAPE_SOURCE_QUOTAS = {
+        'website': 0.25, 'about': 0.15, 'leadership': 0.15, 'investors': 0.1,
+        'news': 0.15, 'wikipedia': 0.2,
+    }
+
+PASSAGE_MAX_CHARS = 400
+SHINGLE_SIZE = 3
+# Passages this similar (Jaccard on shingles), or this much contained in a kept one, are dropped
+DUPLICATE_JACCARD = 0.6
+DUPLICATE_CONTAINMENT = 0.8
+
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"“(])')
+_WORD_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9&'.-]*")
+_NUMBER_RE = re.compile(r'\d')
+# Words that usually mark a concrete fact about a company
+FACT_WORDS = {
+    'founded', 'headquartered', 'headquarters', 'revenue', 'employees', 'employs', 'ceo', 'president',
+    'chief', 'officer', 'founder', 'acquired', 'acquisition', 'million', 'billion', 'stores', 'plants',
+    'locations', 'subsidiary', 'merger', 'ipo', 'partnership', 'contract', 'launched', 'opened',
+    'expansion', 'announced', 'texas', 'customers', 'market', 'largest',
+}
+STOPWORDS = {
+    'the', 'a', 'an', 'and', 'or', 'of', 'to', 'in', 'on', 'for', 'with', 'by', 'at', 'from', 'is',
+    'are', 'was', 'were', 'be', 'our', 'we', 'you', 'your', 'it', 'its', 'that', 'this', 'as', 'their',
+}
+
+
+class Passage:
+    """A contiguous piece of one source's text."""
+
+    __slots__ = ('source', 'position', 'text', 'tokens', 'shingles', 'score')
+
+    def __init__(self, source: str, position: int, text: str):
+        self.source = source
+        self.position = position
+        self.text = text
+        self.tokens = estimate_tokens(text)
+        self.shingles = shingles(text)
+        self.score = informativeness(text) / (1.0 + 0.05 * position)
+
+
+def split_passages(text: str, max_chars: int = PASSAGE_MAX_CHARS) -> List[str]:
+    """
+    Split text on lines and sentences, regrouping sentences into passages of at most max_chars.
+
+    A sentence longer than max_chars (a run-on line, a table flattened to text)
+    is cut on word boundaries first, so no passage exceeds the limit.
+    """
+    passages: List[str] = []
+    for line in (text or '').splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        current = ''
+        for sentence in _SENTENCE_SPLIT.split(line):
+            for piece in _split_words(sentence.strip(), max_chars):
+                if current and len(current) + 1 + len(piece) > max_chars:
+                    passages.append(current)
+                    current = piece
+                else:
+                    current = f"{current} {piece}" if current else piece
+        if current:
+            passages.append(current)
+    return passages
+
+
+def _split_words(sentence: str, max_chars: int) -> List[str]:
+    """Cut a sentence into pieces of at most max_chars on spaces; a longer word is cut mid-word."""
+    if len(sentence) <= max_chars:
+        return [sentence] if sentence else []
+    pieces: List[str] = []
+    current = ''
+    for word in sentence.split():
+        while len(word) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ''
+            pieces.append(word[:max_chars])
+            word = word[max_chars:]
+        if current and len(current) + 1 + len(word) > max_chars:
+            pieces.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> frozenset:
+    """Lowercased word n-grams of a passage (the whole passage if it is shorter than n words)."""
+    words = [w.lower() for w in _WORD_RE.findall(text)]
+    if len(words) < size:
+        return frozenset([' '.join(words)]) if words else frozenset()
+    return frozenset(' '.join(words[i:i + size]) for i in range(len(words) - size + 1))
+
+
+def is_near_duplicate(a: frozenset, b: frozenset) -> bool:
+    """True if two shingle sets overlap heavily or one is mostly contained in the other."""
+    if not a or not b:
+        return False
+    common = len(a & b)
+    if not common:
+        return False
+    if common / len(a | b) >= DUPLICATE_JACCARD:
+        return True
+    return common / min(len(a), len(b)) >= DUPLICATE_CONTAINMENT
+
+
+def informativeness(text: str) -> float:
+    """
+    Rough information density of a passage.
+
+    Rewards numbers, proper nouns, fact words and lexical variety; long
+    passages score higher but with diminishing returns.
+    """
+    words = _WORD_RE.findall(text)
+    if not words:
+        return 0.0
+    lowered = [w.lower() for w in words]
+    content = [w for w in lowered if w not in STOPWORDS]
+    variety = len(set(content)) / len(words)
+    numbers = sum(1 for w in words if _NUMBER_RE.search(w))
+    proper = sum(1 for i, w in enumerate(words) if i and w[0].isupper())
+    facts = sum(1 for w in lowered if w in FACT_WORDS)
+    signal = numbers * 1.0 + proper * 0.5 + facts * 1.5
+    return (variety + signal / len(words) * 4) * math.log(1 + len(words))
+
+
+def pack_sources(
+    sections: Sequence[Tuple[str, str, str]],
+    budget_tokens: int = SCRAPE_TOKEN_BUDGET,
+    quotas: Optional[Dict[str, float]] = None,
+) -> Tuple[str, Dict[str, int]]:
+    """
+    Deduplicate and pack source texts into a token budget.
+
+    Args:
+        sections: (source name, header line, text) in priority order; when
+            two passages are near-duplicates the earlier source keeps it
+        budget_tokens: Total token budget for the packed text
+        quotas: Share of the budget reserved per source name
+
+    Returns:
+        (packed text with one header per source, {source: tokens used})
+    """
+    quotas = SCRAPE_SOURCE_QUOTAS if quotas is None else quotas
+
+    # Split and drop near-duplicates, earlier sources first
+    kept: List[Passage] = []
+    for source, _, text in sections:
+        for position, chunk in enumerate(split_passages(text)):
+            passage = Passage(source, position, chunk)
+            if any(is_near_duplicate(passage.shingles, other.shingles) for other in kept):
+                continue
+            kept.append(passage)
+
+    selected = set()
+    used: Dict[str, int] = {source: 0 for source, _, _ in sections}
+    total = 0
+
+    # First pass: each source fills its own quota with its best passages
+    for source, _, _ in sections:
+        quota = int(budget_tokens * quotas.get(source, 0.0))
+        for passage in sorted((p for p in kept if p.source == source), key=lambda p: -p.score):
+            if used[source] + passage.tokens > quota or total + passage.tokens > budget_tokens:
+                continue
+            selected.add(id(passage))
+            used[source] += passage.tokens
+            total += passage.tokens
+
+    # Second pass: leftover budget goes to the best remaining passages from any source
+    for passage in sorted(kept, key=lambda p: -p.score):
+        if id(passage) in selected or total + passage.tokens > budget_tokens:
+            continue
+        selected.add(id(passage))
+        used[passage.source] += passage.tokens
+        total += passage.tokens
+
+    # Emit in source order, passages in their original order
+    blocks = []
+    for source, header, _ in sections:
+        texts = [p.text for p in kept if p.source == source and id(p) in selected]
+        if texts:
+            blocks.append(f"{header}\n" + "\n".join(texts))
+    return "\n\n".join(blocks), used
@@ -0,0 +1,76 @@
+"""
+Normalization of model output before it is pasted into downstream prompts.
+
+Stage outputs are JSON wrapped in whatever the model added around it:
+markdown fences, a preamble, pretty-printing, and placeholder values such as
+"Unknown". Every character of that is paid for again in each prompt that
+includes the output, so it is parsed, pruned and re-serialized compactly.
+"""
+import json
+import re
+from typing import Any, Optional, Tuple
+
+# Placeholder values the prompts tell the model to use when it has nothing to say
+EMPTY_MARKERS = {'', 'unknown', 'unknown unless confirmed', 'n/a'}
+
+_FENCE_RE = re.compile(r'```(?:json)?\s*(.*?)```', re.DOTALL)
+
+
+def extract_json(text: str) -> Optional[Any]:
+    """Parse the JSON object or array in a model response, ignoring fences and preamble."""
+    if not isinstance(text, str):
+        return None
+    fenced = _FENCE_RE.search(text)
+    candidate = fenced.group(1) if fenced else text
+
+    starts = [i for i in (candidate.find('{'), candidate.find('[')) if i != -1]
+    if not starts:
+        return None
+    start = min(starts)
+    end = candidate.rfind('}' if candidate[start] == '{' else ']')
+    if end <= start:
+        return None
+    try:
+        return json.loads(candidate[start:end + 1])
+    except ValueError:
+        return None
+
+
+def prune_empty(value: Any) -> Any:
+    """Recursively drop empty containers, empty strings and "Unknown" placeholders."""
+    if isinstance(value, dict):
+        pruned = {k: prune_empty(v) for k, v in value.items()}
+        return {k: v for k, v in pruned.items() if not _is_empty(v)}
+    if isinstance(value, list):
+        pruned = [prune_empty(v) for v in value]
+        return [v for v in pruned if not _is_empty(v)]
+    return value
+
+
+def _is_empty(value: Any) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return value.strip().lower() in EMPTY_MARKERS
+    if isinstance(value, (dict, list)):
+        return len(value) == 0
+    return False
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for English prose and JSON)."""
+    return (len(text) + 3) // 4
+
+
+def compact_stage_output(text: str) -> Tuple[str, bool]:
+    """
+    Return a compact version of a stage output for use in later prompts.
+
+    Returns:
+        (compact text, whether the output parsed as JSON). Output that is not
+        JSON is returned stripped but otherwise unchanged.
+    """
+    parsed = extract_json(text)
+    if parsed is None:
+        return (text.strip() if isinstance(text, str) else text), False
+    return json.dumps(prune_empty(parsed), separators=(',', ':'), ensure_ascii=False), True
@@ -0,0 +1,287 @@
+"""
+Shared token-bucket rate limiting for Bedrock across concurrent Lambdas.
+
+Each model has two buckets, one for requests and one for tokens, sized from
+the configured per-minute quotas. Every bucket refills continuously at
+quota / 60 per second and holds at most one minute of quota. The buckets live
+in a store shared by every invocation (DynamoDB in production, memory in
+tests). Calls acquire capacity before they are sent, so concurrent pipelines
+queue briefly instead of being throttled together.
+
+Going to DynamoDB for every call would add two round trips per Bedrock
+request, so each process leases a slice of a bucket at once and spends it
+locally. Unused leased capacity expires after a few seconds. A Lambda that is
+frozen or dies cannot hoard capacity for longer than that.
+
+The limiter fails open. If the store is unreachable, or capacity does not
+arrive within the wait limit, the call goes ahead and the retry layer
+(utils/retry.py) handles any throttling.
+"""
+import threading
+import time
+from decimal import Decimal
+from typing import Callable, Dict, Optional, Tuple
+
+from .logger import StructuredLogger
+from .retry import error_code
+
+try:
+    from config import (
+        BEDROCK_RATE_LIMITS, BEDROCK_DEFAULT_RATE_LIMIT, BEDROCK_RATE_LIMIT_LEASE_FRACTION,
+        BEDROCK_RATE_LIMIT_LEASE_SECONDS, BEDROCK_RATE_LIMIT_MAX_WAIT
+    )
+except ImportError:
+    # Fallback for when running as standalone
+    import os
+    BEDROCK_RATE_LIMITS = {}
+    BEDROCK_DEFAULT_RATE_LIMIT = {
+        'requests_per_minute': int(os.getenv('BEDROCK_REQUESTS_PER_MINUTE', '50')),
+        'tokens_per_minute': int(os.getenv('BEDROCK_TOKENS_PER_MINUTE', '200000')),
+    }
+    BEDROCK_RATE_LIMIT_LEASE_FRACTION = float(os.getenv('BEDROCK_RATE_LIMIT_LEASE_FRACTION', '0.1'))
+    BEDROCK_RATE_LIMIT_LEASE_SECONDS = float(os.getenv('BEDROCK_RATE_LIMIT_LEASE_SECONDS', '10'))
+    BEDROCK_RATE_LIMIT_MAX_WAIT = float(os.getenv('BEDROCK_RATE_LIMIT_MAX_WAIT', '30'))
+
+REQUESTS = 'requests'
+TOKENS = 'tokens'
+# Optimistic-concurrency conflicts tolerated per take before backing off
+MAX_CONFLICT_RETRIES = 5
+# Shortest sleep while waiting for capacity
+MIN_WAIT_SECONDS = 0.05
+
+
+def refill(tokens: float, updated_at: float, now: float, capacity: float, rate: float) -> float:
+    """Bucket level at `now` given its level at `updated_at` (clock skew never drains it)."""
+    return min(capacity, tokens + max(0.0, now - updated_at) * rate)
+
+
+class InMemoryBucketStore:
+    """Process-local bucket store; a stand-in for DynamoDB in tests and local runs."""
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, amount: float, capacity: float, rate: float, now: float) -> Tuple[bool, float]:
+        """
+        Take `amount` from bucket `key` if it holds that much.
+
+        Returns:
+            (granted, seconds until `amount` would be available if not granted)
+        """
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            available = refill(tokens, updated_at, now, capacity, rate)
+            if available < amount:
+                self._buckets[key] = (available, now)
+                return False, (amount - available) / rate
+            self._buckets[key] = (available - amount, now)
+            return True, 0.0
+
+
+class DynamoDBBucketStore:
+    """
+    Buckets as DynamoDB items {bucket_id, tokens, updated_at}.
+
+    A take reads the item, computes the refill and writes the new level with a
+    condition on the updated_at it read. A concurrent writer makes the
+    condition fail, and the take starts again.
+    """
+
+    def __init__(self, table_name: str, region: Optional[str] = None):
+        self.table_name = table_name
+        self.region = region
+        # boto3 resources are not thread-safe; pipeline stages call Bedrock from a thread pool
+        self._local = threading.local()
+
+    def _table(self):
+        if not hasattr(self._local, 'table'):
+            import boto3
+            self._local.table = boto3.session.Session().resource('dynamodb', region_name=self.region) \
+                .Table(self.table_name)
+        return self._local.table
+
+    def take(self, key: str, amount: float, capacity: float, rate: float, now: float) -> Tuple[bool, float]:
+        """Same contract as InMemoryBucketStore.take."""
+        table = self._table()
+        for _ in range(MAX_CONFLICT_RETRIES):
+            item = table.get_item(Key={'bucket_id': key}, ConsistentRead=True).get('Item')
+            if item:
+                available = refill(float(item['tokens']), float(item['updated_at']), now, capacity, rate)
+            else:
+                available = capacity
+            if available < amount:
+                return False, (amount - available) / rate
+            try:
+                if item:
+                    table.update_item(
+                        Key={'bucket_id': key},
+                        UpdateExpression='SET tokens = :tokens, updated_at = :now',
+                        ConditionExpression='updated_at = :previous',
+                        ExpressionAttributeValues={
+                            ':tokens': Decimal(str(round(available - amount, 3))),
+                            ':now': Decimal(str(round(now, 3))),
+                            ':previous': item['updated_at']
+                        }
+                    )
+                else:
+                    table.put_item(
+                        Item={
+                            'bucket_id': key,
+                            'tokens': Decimal(str(round(capacity - amount, 3))),
+                            'updated_at': Decimal(str(round(now, 3)))
+                        },
+                        ConditionExpression='attribute_not_exists(bucket_id)'
+                    )
+                return True, 0.0
+            except Exception as e:
+                if error_code(e) != 'ConditionalCheckFailedException':
+                    raise
+        # Heavy contention: report a short wait instead of spinning
+        return False, amount / rate
+
+
+class _Lease:
+    __slots__ = ('remaining', 'expires_at')
+
+    def __init__(self):
+        self.remaining = 0.0
+        self.expires_at = 0.0
+
+
+class RateLimiter:
+    """Acquire request and token capacity per model before calling it."""
+
+    def __init__(
+        self,
+        store,
+        limits: Optional[Dict[str, Dict[str, int]]] = None,
+        default_limit: Optional[Dict[str, int]] = None,
+        lease_fraction: float = BEDROCK_RATE_LIMIT_LEASE_FRACTION,
+        lease_seconds: float = BEDROCK_RATE_LIMIT_LEASE_SECONDS,
+        max_wait: float = BEDROCK_RATE_LIMIT_MAX_WAIT,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Args:
+            store: Shared bucket store (DynamoDBBucketStore or InMemoryBucketStore)
+            limits: {model_id: {'requests_per_minute', 'tokens_per_minute'}}
+            default_limit: Quotas for models missing from `limits`
+            lease_fraction: Share of a bucket's capacity leased per store round trip
+            lease_seconds: How long unused leased capacity stays valid locally
+            max_wait: Longest acquire() waits before letting the call through
+            clock: Wall-clock time source; shared buckets need a clock every
+                invocation agrees on (injectable for tests)
+            sleep: Injectable for tests
+        """
+        self.store = store
+        self.limits = BEDROCK_RATE_LIMITS if limits is None else limits
+        self.default_limit = default_limit or BEDROCK_DEFAULT_RATE_LIMIT
+        self.lease_fraction = lease_fraction
+        self.lease_seconds = lease_seconds
+        self.max_wait = max_wait
+        self._clock = clock
+        self._sleep = sleep
+        self._leases: Dict[str, _Lease] = {}
+        self._lock = threading.Lock()
+        self.stats = {'store_calls': 0, 'waited_seconds': 0.0, 'timeouts': 0}
+
+    def _bucket(self, model_id: str, kind: str) -> Tuple[float, float]:
+        """
+        (capacity, refill rate per second) for one of a model's buckets.
+
+        Keys may carry a region (`model@region`): quotas are configured per
+        model and apply separately in each region.
+        """
+        limit = self.limits.get(model_id) or self.limits.get(model_id.split('@')[0], self.default_limit)
+        per_minute = float(limit[f'{kind}_per_minute'])
+        return per_minute, per_minute / 60.0
+
+    def _take(self, model_id: str, kind: str, amount: float) -> float:
+        """
+        Take `amount` from the local lease, topping it up from the store when short.
+
+        Returns:
+            0 when taken, else seconds to wait before trying again
+        """
+        key = f'{model_id}#{kind}'
+        capacity, rate = self._bucket(model_id, kind)
+        # A request larger than the whole bucket could never be granted; cap it
+        amount = min(amount, capacity)
+        now = self._clock()
+        with self._lock:
+            lease = self._leases.setdefault(key, _Lease())
+            if lease.expires_at <= now:
+                lease.remaining = 0.0
+            if lease.remaining >= amount:
+                lease.remaining -= amount
+                return 0.0
+            shortfall = amount - lease.remaining
+
+        # The store round trip happens outside the lock, so threads whose lease
+        # still covers them are never queued behind another thread's network call.
+        # Lease a slice of the bucket, or just the shortfall if the slice is not there.
+        wait = 0.0
+        for size in sorted({max(shortfall, capacity * self.lease_fraction), shortfall}, reverse=True):
+            granted, wait = self.store.take(key, size, capacity, rate, now)
+            with self._lock:
+                self.stats['store_calls'] += 1
+                if not granted:
+                    continue
+                # Another thread may have topped up or spent the lease meanwhile; granted
+                # capacity is added either way, so none of it is lost
+                if lease.expires_at <= now:
+                    lease.remaining = 0.0
+                lease.remaining += size
+                lease.expires_at = now + self.lease_seconds
+                if lease.remaining >= amount:
+                    lease.remaining -= amount
+                    return 0.0
+            return MIN_WAIT_SECONDS
+        return max(wait, MIN_WAIT_SECONDS)
+
+    def acquire(self, model_id: str, tokens: int = 0) -> bool:
+        """
+        Block until one request and `tokens` tokens are available for the model.
+
+        Returns:
+            True when capacity was acquired; False when the wait limit passed or
+            the store failed (the caller proceeds either way)
+        """
+        deadline = self._clock() + self.max_wait
+        needs = [(REQUESTS, 1.0)] + ([(TOKENS, float(tokens))] if tokens > 0 else [])
+        try:
+            for kind, amount in needs:
+                while True:
+                    wait = self._take(model_id, kind, amount)
+                    if not wait:
+                        break
+                    remaining = deadline - self._clock()
+                    if remaining <= 0:
+                        self.stats['timeouts'] += 1
+                        StructuredLogger.warning(
+                            "Rate limit wait exceeded; sending anyway",
+                            extra={'model_id': model_id, 'bucket': kind, 'max_wait': self.max_wait}
+                        )
+                        return False
+                    wait = min(wait, remaining)
+                    self.stats['waited_seconds'] += wait
+                    self._sleep(wait)
+        except Exception as e:
+            StructuredLogger.warning(
+                "Rate limiter store unavailable; sending without limit",
+                extra={'model_id': model_id, 'error': str(e)}
+            )
+            return False
+        return True
+
+    def release(self, model_id: str, tokens: int) -> None:
+        """Return over-reserved tokens (estimate minus actual usage) to the local lease."""
+        if tokens <= 0:
+            return
+        key = f'{model_id}#{TOKENS}'
+        with self._lock:
+            lease = self._leases.get(key)
+            if lease is not None and lease.expires_at > self._clock():
+                lease.remaining += tokens
@@ -0,0 +1,141 @@
+"""
+Latency- and error-aware routing of Bedrock calls across regions.
+
+Each Bedrock region has its own quota, so spreading calls over several
+regions raises total throughput. A RegionRouter keeps the health of every
+configured region as exponentially weighted moving averages (EWMAs) of
+successful call latency and of error rate. For each call it orders the
+regions by a weighted random draw: a region's weight is
+1 / (latency * (1 + penalty * error_rate)), scaled down a little for each
+place it sits later in the configured list. Fast, healthy regions take most
+of the calls, but slower ones keep receiving some. Their health data stays
+current, and a single region's quota is never the ceiling.
+
+A throttled region cools down for a few seconds. During that time it goes to
+the back of the order, so the next call fails over to another region instead
+of backing off where it was throttled. Routers live at module level, so
+health is kept per warm container.
+"""
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from .retry import FATAL, THROTTLED
+
+try:
+    from config import BEDROCK_REGION_EWMA_ALPHA, BEDROCK_REGION_THROTTLE_COOLDOWN
+except ImportError:
+    # Fallback for when running as standalone
+    import os
+    BEDROCK_REGION_EWMA_ALPHA = float(os.getenv('BEDROCK_REGION_EWMA_ALPHA', '0.2'))
+    BEDROCK_REGION_THROTTLE_COOLDOWN = float(os.getenv('BEDROCK_REGION_THROTTLE_COOLDOWN', '15'))
+
+# Latency assumed for a region with no successful call yet (seconds)
+DEFAULT_LATENCY = 10.0
+
+
+class RegionHealth:
+    __slots__ = ('latency', 'error_rate', 'cooldown_until', 'calls')
+
+    def __init__(self):
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.cooldown_until = 0.0
+        self.calls = 0
+
+
+class RegionRouter:
+    """Order regions per call by observed latency and error rate."""
+
+    def __init__(
+        self,
+        regions: List[str],
+        alpha: float = BEDROCK_REGION_EWMA_ALPHA,
+        throttle_cooldown: float = BEDROCK_REGION_THROTTLE_COOLDOWN,
+        error_penalty: float = 4.0,
+        preference: float = 0.8,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Callable[[], float] = random.random
+    ):
+        """
+        Args:
+            regions: Regions in order of preference
+            alpha: EWMA weight of the newest sample
+            throttle_cooldown: Seconds a throttled region is sent to the back
+            error_penalty: How strongly the error rate inflates a region's cost
+            preference: Weight factor per place down the configured list
+            clock: Injectable for tests
+            rng: Source of randomness in [0, 1) (injectable for tests)
+        """
+        if not regions:
+            raise ValueError("RegionRouter needs at least one region")
+        self.regions = list(regions)
+        self.alpha = alpha
+        self.throttle_cooldown = throttle_cooldown
+        self.error_penalty = error_penalty
+        self.preference = preference
+        self._clock = clock
+        self._rng = rng
+        self._health: Dict[str, RegionHealth] = {region: RegionHealth() for region in self.regions}
+        self._lock = threading.Lock()
+
+    def _cost(self, health: RegionHealth, fallback_latency: float) -> float:
+        latency = health.latency if health.latency is not None else fallback_latency
+        return max(latency, 1e-3) * (1 + self.error_penalty * health.error_rate)
+
+    def order(self) -> List[str]:
+        """Regions to try for one call, best first; cooling-down regions come last."""
+        if len(self.regions) == 1:
+            return list(self.regions)
+        now = self._clock()
+        with self._lock:
+            known = [h.latency for h in self._health.values() if h.latency is not None]
+            # Unmeasured regions look as fast as the best measured one, so they get probed
+            fallback = min(known) if known else DEFAULT_LATENCY
+            ready, cooling = [], []
+            for index, region in enumerate(self.regions):
+                health = self._health[region]
+                if health.cooldown_until > now:
+                    cooling.append((health.cooldown_until, region))
+                    continue
+                weight = (self.preference ** index) / self._cost(health, fallback)
+                # Weighted sampling without replacement: sort by u ** (1 / weight)
+                ready.append((self._rng() ** (1.0 / weight), region))
+        ready.sort(reverse=True)
+        cooling.sort()
+        return [region for _, region in ready] + [region for _, region in cooling]
+
+    def record_success(self, region: str, seconds: float) -> None:
+        with self._lock:
+            health = self._health.setdefault(region, RegionHealth())
+            health.calls += 1
+            health.latency = seconds if health.latency is None \
+                else (1 - self.alpha) * health.latency + self.alpha * seconds
+            health.error_rate *= (1 - self.alpha)
+
+    def record_failure(self, region: str, error_class: str) -> None:
+        """Count a throttled or transient failure; throttling also starts the region's cool-down."""
+        if error_class == FATAL:
+            # Fatal errors are about the request, not the region
+            return
+        with self._lock:
+            health = self._health.setdefault(region, RegionHealth())
+            health.calls += 1
+            health.error_rate = (1 - self.alpha) * health.error_rate + self.alpha
+            if error_class == THROTTLED:
+                health.cooldown_until = self._clock() + self.throttle_cooldown
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Per-region latency EWMA, error-rate EWMA, call count and whether it is cooling down."""
+        now = self._clock()
+        with self._lock:
+            return {
+                region: {
+                    'latency': round(h.latency, 3) if h.latency is not None else None,
+                    'error_rate': round(h.error_rate, 3),
+                    'calls': h.calls,
+                    'cooling_down': h.cooldown_until > now
+                }
+                for region, h in self._health.items()
+            }
@@ -0,0 +1,151 @@
+"""
+Content-addressed cache for Bedrock responses.
+
+Two tiers: an in-process LRU that survives warm Lambda invocations, backed by
+a shared S3 tier so reruns on other containers also hit.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from .logger import StructuredLogger
+
+try:
+    from config import (
+        BEDROCK_CACHE_ENABLED, BEDROCK_CACHE_MAX_ENTRIES, BEDROCK_CACHE_TTL_SECONDS,
+        BEDROCK_CACHE_MAX_TEMPERATURE, BEDROCK_CACHE_S3_PREFIX
+    )
+except ImportError:
+    # Fallback for when running as standalone
+    import os
+    BEDROCK_CACHE_ENABLED = os.getenv('BEDROCK_CACHE_ENABLED', 'true').lower() == 'true'
+    BEDROCK_CACHE_MAX_ENTRIES = int(os.getenv('BEDROCK_CACHE_MAX_ENTRIES', '256'))
+    BEDROCK_CACHE_TTL_SECONDS = int(os.getenv('BEDROCK_CACHE_TTL_SECONDS', '604800'))
+    BEDROCK_CACHE_MAX_TEMPERATURE = float(os.getenv('BEDROCK_CACHE_MAX_TEMPERATURE', '0.2'))
+    BEDROCK_CACHE_S3_PREFIX = os.getenv('BEDROCK_CACHE_S3_PREFIX', '_cache/bedrock/')
+
+
+def make_cache_key(
+    model_id: str,
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+    prompt_version: str = '',
+    prefix: str = ''
+) -> str:
+    """Hash everything that determines a completion into a stable key."""
+    parts = [model_id, prompt, round(float(temperature), 3), int(max_tokens), prompt_version]
+    if prefix:
+        parts.append(prefix)
+    material = json.dumps(parts, ensure_ascii=False)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + S3) cache for model completions."""
+
+    def __init__(
+        self,
+        s3_client: Any = None,
+        bucket: Optional[str] = None,
+        max_entries: int = BEDROCK_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = BEDROCK_CACHE_TTL_SECONDS,
+        max_temperature: float = BEDROCK_CACHE_MAX_TEMPERATURE,
+        prefix: str = BEDROCK_CACHE_S3_PREFIX,
+        enabled: bool = BEDROCK_CACHE_ENABLED
+    ):
+        """
+        Args:
+            s3_client: boto3 S3 client for the shared tier (None = memory only)
+            bucket: Bucket holding shared cache entries
+            max_entries: Capacity of the in-process LRU
+            ttl_seconds: Lifetime of an entry in both tiers
+            max_temperature: Only completions at or below this temperature are cached
+            prefix: S3 key prefix for shared entries
+            enabled: Master switch
+        """
+        self.s3 = s3_client
+        self.bucket = bucket
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_temperature = max_temperature
+        self.prefix = prefix
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 's3_hits': 0, 'misses': 0}
+
+    def is_cacheable(self, temperature: float) -> bool:
+        """Higher-temperature stages are meant to vary between runs, so skip them."""
+        return self.enabled and temperature <= self.max_temperature
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached completion, checking memory first and then S3."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                expires_at, text = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.stats['memory_hits'] += 1
+                    return text
+                del self._entries[key]
+
+        text, expires_at = self._get_shared(key, now)
+        if text is None:
+            with self._lock:
+                self.stats['misses'] += 1
+            return None
+
+        with self._lock:
+            self.stats['s3_hits'] += 1
+        self._put_local(key, text, expires_at)
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        """Store a completion in both tiers."""
+        expires_at = time.time() + self.ttl_seconds
+        self._put_local(key, text, expires_at)
+        self._put_shared(key, text, expires_at)
+
+    def _put_local(self, key: str, text: str, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, text)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _get_shared(self, key: str, now: float) -> Tuple[Optional[str], float]:
+        if not self.s3 or not self.bucket:
+            return None, 0.0
+        try:
+            response = self.s3.get_object(Bucket=self.bucket, Key=f'{self.prefix}{key}.json')
+            entry = json.loads(response['Body'].read())
+        except Exception:
+            # Missing key or unreachable tier both mean "not cached"
+            return None, 0.0
+        expires_at = float(entry.get('expires_at', 0))
+        if expires_at <= now:
+            return None, 0.0
+        return entry.get('text'), expires_at
+
+    def _put_shared(self, key: str, text: str, expires_at: float) -> None:
+        if not self.s3 or not self.bucket:
+            return
+        try:
+            self.s3.put_object(
+                Bucket=self.bucket,
+                Key=f'{self.prefix}{key}.json',
+                Body=json.dumps({'text': text, 'expires_at': expires_at}).encode('utf-8'),
+                ContentType='application/json'
+            )
+        except Exception as e:
+            # The shared tier is an optimisation; never fail the call over it
+            StructuredLogger.warning(
+                "Response cache S3 write failed",
+                extra={'cache_key': key, 'error_message': str(e)}
+            )
@@ -0,0 +1,200 @@
+"""
+Error-classified retries with capped exponential backoff and a circuit breaker.
+
+Bedrock failures are not all alike. Throttling and 5xx errors are transient:
+the same request usually succeeds a moment later, so they are retried on the
+same model with exponential backoff and full jitter (each wait is a random
+fraction of the capped exponential delay, so concurrent callers do not retry
+in lockstep). Validation and permission errors never succeed on retry and fail
+fast. A per-model circuit breaker stops sending requests to a model that keeps
+failing and lets one trial request through once a cool-down has passed.
+"""
+import random
+import re
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+try:
+    from config import (
+        BEDROCK_MAX_ATTEMPTS, BEDROCK_RETRY_BASE_DELAY, BEDROCK_RETRY_MAX_DELAY, BEDROCK_RETRY_MAX_ELAPSED,
+        BEDROCK_BREAKER_THRESHOLD, BEDROCK_BREAKER_COOLDOWN
+    )
+except ImportError:
+    # Fallback for when running as standalone
+    import os
+    BEDROCK_MAX_ATTEMPTS = int(os.getenv('BEDROCK_MAX_ATTEMPTS', '5'))
+    BEDROCK_RETRY_BASE_DELAY = float(os.getenv('BEDROCK_RETRY_BASE_DELAY', '0.5'))
+    BEDROCK_RETRY_MAX_DELAY = float(os.getenv('BEDROCK_RETRY_MAX_DELAY', '8'))
+    BEDROCK_RETRY_MAX_ELAPSED = float(os.getenv('BEDROCK_RETRY_MAX_ELAPSED', '45'))
+    BEDROCK_BREAKER_THRESHOLD = int(os.getenv('BEDROCK_BREAKER_THRESHOLD', '5'))
+    BEDROCK_BREAKER_COOLDOWN = float(os.getenv('BEDROCK_BREAKER_COOLDOWN', '60'))
+
+# Error classes
+THROTTLED = 'throttled'
+TRANSIENT = 'transient'
+FATAL = 'fatal'
+
+THROTTLE_CODES = {
+    'ThrottlingException', 'TooManyRequestsException', 'ServiceQuotaExceededException',
+    'RequestLimitExceeded', 'Throttling',
+}
+TRANSIENT_CODES = {
+    'InternalServerException', 'ServiceUnavailableException', 'ServiceUnavailable', 'ModelNotReadyException',
+    'ModelTimeoutException', 'RequestTimeout', 'RequestTimeoutException', 'InternalFailure',
+}
+# botocore raises these (not ClientError) for network-level failures
+TRANSIENT_EXCEPTIONS = {
+    'ReadTimeoutError', 'ConnectTimeoutError', 'EndpointConnectionError', 'ConnectionClosedError',
+    'ResponseStreamingError', 'IncompleteReadError',
+}
+
+
+def error_code(exc: BaseException) -> str:
+    """The AWS error code of a botocore ClientError, or '' for anything else."""
+    response = getattr(exc, 'response', None)
+    if not isinstance(response, dict):
+        return ''
+    return response.get('Error', {}).get('Code', '') or ''
+
+
+# Phrases in a ValidationException message that blame the prompt-cache checkpoint itself
+PROMPT_CACHE_ERROR = re.compile(r'cache_control|cache ?point|prompt[ _-]?cach|caching', re.IGNORECASE)
+
+
+def is_prompt_cache_rejection(exc: BaseException) -> bool:
+    """
+    True if a request was rejected because of its prompt-cache checkpoint.
+
+    Only a ValidationException whose message names caching counts. Other
+    validation errors (an over-long prompt, a bad max_tokens) fail the same
+    way without the checkpoint and say nothing about cache support.
+    """
+    if error_code(exc) != 'ValidationException':
+        return False
+    message = getattr(exc, 'response', {}).get('Error', {}).get('Message', '') or str(exc)
+    return bool(PROMPT_CACHE_ERROR.search(message))
+
+
+def classify_error(exc: BaseException) -> str:
+    """
+    Sort an exception into THROTTLED, TRANSIENT or FATAL.
+
+    ClientErrors are classified by error code, then by HTTP status (429 is
+    throttling, 5xx transient). Socket timeouts and botocore connection
+    errors are transient; anything else is fatal.
+    """
+    code = error_code(exc)
+    if code in THROTTLE_CODES:
+        return THROTTLED
+    if code in TRANSIENT_CODES:
+        return TRANSIENT
+    if code:
+        status = getattr(exc, 'response', {}).get('ResponseMetadata', {}).get('HTTPStatusCode') or 0
+        if status == 429:
+            return THROTTLED
+        return TRANSIENT if status >= 500 else FATAL
+    if isinstance(exc, (TimeoutError, ConnectionError)) or type(exc).__name__ in TRANSIENT_EXCEPTIONS:
+        return TRANSIENT
+    return FATAL
+
+
+def backoff_delay(attempt: int, base: float = BEDROCK_RETRY_BASE_DELAY, cap: float = BEDROCK_RETRY_MAX_DELAY,
+                  rng: Callable[[], float] = random.random) -> float:
+    """Full-jitter delay before retry number `attempt` (0-based): uniform in [0, min(cap, base * 2**attempt)]."""
+    return rng() * min(cap, base * (2 ** attempt))
+
+
+class RetryPolicy:
+    """How often, and for how long, one model is retried."""
+
+    def __init__(
+        self,
+        max_attempts: int = BEDROCK_MAX_ATTEMPTS,
+        base_delay: float = BEDROCK_RETRY_BASE_DELAY,
+        max_delay: float = BEDROCK_RETRY_MAX_DELAY,
+        max_elapsed: float = BEDROCK_RETRY_MAX_ELAPSED,
+        rng: Callable[[], float] = random.random
+    ):
+        """
+        Args:
+            max_attempts: Attempts per model, including the first
+            base_delay: Backoff ceiling before the first retry (seconds)
+            max_delay: Cap on any single backoff ceiling (seconds)
+            max_elapsed: No retry is started once this many seconds have
+                passed since the first attempt
+            rng: Source of jitter in [0, 1) (injectable for tests)
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_elapsed = max_elapsed
+        self._rng = rng
+
+    def next_delay(self, attempt: int, error_class: str, elapsed: float) -> Optional[float]:
+        """
+        Seconds to wait before retrying after failed attempt `attempt` (0-based),
+        or None when the caller should give up on this model.
+        """
+        if error_class == FATAL or attempt + 1 >= self.max_attempts:
+            return None
+        delay = backoff_delay(attempt, self.base_delay, self.max_delay, self._rng)
+        if elapsed + delay > self.max_elapsed:
+            return None
+        return delay
+
+
+class CircuitBreaker:
+    """
+    Per-key breaker: closed → open after `threshold` consecutive failures →
+    half-open (one trial request) after `cooldown` seconds.
+
+    Thread-safe; meant to live at module level so warm invocations and
+    concurrent stages share what they learn about a failing model.
+    """
+
+    def __init__(self, threshold: int = BEDROCK_BREAKER_THRESHOLD, cooldown: float = BEDROCK_BREAKER_COOLDOWN,
+                 clock: Callable[[], float] = time.monotonic):
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self._clock = clock
+        self._failures: Dict[str, int] = {}
+        self._opened_at: Dict[str, float] = {}
+        self._trial: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+
+    def state(self, key: str) -> str:
+        """'closed', 'open' or 'half-open'."""
+        with self._lock:
+            return self._state(key)
+
+    def _state(self, key: str) -> str:
+        opened = self._opened_at.get(key)
+        if opened is None:
+            return 'closed'
+        return 'half-open' if self._clock() - opened >= self.cooldown else 'open'
+
+    def allow(self, key: str) -> bool:
+        """Whether a request to `key` may be sent now; half-open lets a single trial through."""
+        with self._lock:
+            state = self._state(key)
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial.get(key):
+                self._trial[key] = True
+                return True
+            return False
+
+    def record_success(self, key: str) -> None:
+        with self._lock:
+            self._failures.pop(key, None)
+            self._opened_at.pop(key, None)
+            self._trial.pop(key, None)
+
+    def record_failure(self, key: str) -> None:
+        """Count a transient failure; a failed half-open trial reopens the breaker at once."""
+        with self._lock:
+            failures = self._failures.get(key, 0) + 1
+            self._failures[key] = failures
+            if self._trial.pop(key, False) or failures >= self.threshold:
+                self._opened_at[key] = self._clock()
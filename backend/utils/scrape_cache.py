@@ -0,0 +1,150 @@
+"""
+S3-backed cache of scraped page text with per-source TTLs.
+
+Entries are keyed by normalized URL, the character cap the text was
+extracted with and the extractor version, so a caller never receives text
+truncated for another caller or produced by an older extractor.
+
+Entries hold the extracted text together with the validators the origin sent
+(ETag / Last-Modified). A fresh entry is served without touching the network;
+a stale one is revalidated with If-None-Match / If-Modified-Since so an
+unchanged page costs a 304 instead of a full download and parse.
+"""
+import hashlib
+import json
+import time
+import urllib.parse
+from typing import Any, Dict, List, Optional
+
+from .content_extractor import EXTRACTOR_VERSION
+from .logger import StructuredLogger
+
+try:
+    from config import SCRAPE_CACHE_ENABLED, SCRAPE_CACHE_S3_PREFIX, SCRAPE_CACHE_TTLS
+except ImportError:
+    # Fallback for when running as standalone
+    import os
+    SCRAPE_CACHE_ENABLED = os.getenv('SCRAPE_CACHE_ENABLED', 'true').lower() == 'true'
+    SCRAPE_CACHE_S3_PREFIX = os.getenv('SCRAPE_CACHE_S3_PREFIX', '_cache/scrape/')
+    SCRAPE_CACHE_TTLS = {
+        'homepage': int(os.getenv('SCRAPE_CACHE_TTL_HOMEPAGE', '86400')),
+        'news': int(os.getenv('SCRAPE_CACHE_TTL_NEWS', '3600')),
+        'wiki': int(os.getenv('SCRAPE_CACHE_TTL_WIKI', '604800')),
+        'sitemap': int(os.getenv('SCRAPE_CACHE_TTL_SITEMAP', '604800')),
+    }
+
+# Query parameters that never change page content
+TRACKING_PARAMS = ('utm_', 'gclid', 'fbclid')
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL for cache keys: https default, lowercase host, no fragment or tracking params."""
+    if '://' not in url:
+        url = 'https://' + url
+    parts = urllib.parse.urlsplit(url.strip())
+    host = parts.netloc.lower()
+    path = parts.path.rstrip('/') or '/'
+    query = sorted(
+        (k, v) for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PARAMS)
+    )
+    return urllib.parse.urlunsplit((parts.scheme.lower(), host, path, urllib.parse.urlencode(query), ''))
+
+
+class ScrapeCache:
+    """Scraped-text cache in S3, keyed by normalized URL, max_chars and extractor version."""
+
+    def __init__(
+        self,
+        s3_client: Any = None,
+        bucket: Optional[str] = None,
+        ttls: Optional[Dict[str, int]] = None,
+        prefix: str = SCRAPE_CACHE_S3_PREFIX,
+        enabled: bool = SCRAPE_CACHE_ENABLED,
+        clock=time.time
+    ):
+        """
+        Args:
+            s3_client: boto3 S3 client (None disables the cache)
+            bucket: Bucket holding cache entries
+            ttls: Seconds an entry is served without revalidation, per source type
+            prefix: S3 key prefix for entries
+            enabled: Master switch
+            clock: Wall-clock time source (injectable for tests)
+        """
+        self.s3 = s3_client
+        self.bucket = bucket
+        self.ttls = dict(SCRAPE_CACHE_TTLS if ttls is None else ttls)
+        self.prefix = prefix
+        self.enabled = enabled and bool(s3_client) and bool(bucket)
+        self._clock = clock
+
+    def _key(self, url: str, max_chars: Optional[int] = None) -> str:
+        variant = f"{normalize_url(url)}|{max_chars or ''}|v{EXTRACTOR_VERSION}"
+        digest = hashlib.sha256(variant.encode('utf-8')).hexdigest()
+        return f'{self.prefix}{digest}.json'
+
+    def lookup(self, url: str, max_chars: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Return the stored entry for a URL extracted at max_chars, fresh or stale, or None."""
+        if not self.enabled:
+            return None
+        try:
+            response = self.s3.get_object(Bucket=self.bucket, Key=self._key(url, max_chars))
+            return json.loads(response['Body'].read())
+        except Exception:
+            # Missing key or unreachable bucket both mean "not cached"
+            return None
+
+    def is_fresh(self, entry: Optional[Dict[str, Any]], source_type: str) -> bool:
+        """True if the entry is young enough to serve without revalidating."""
+        if not entry:
+            return False
+        ttl = self.ttls.get(source_type, 0)
+        return self._clock() - float(entry.get('fetched_at', 0)) < ttl
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Request headers that let the origin answer 304 if the page is unchanged."""
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url: str, source_type: str, text: str,
+              etag: Optional[str] = None, last_modified: Optional[str] = None,
+              links: Optional[List[List[str]]] = None, max_chars: Optional[int] = None) -> None:
+        """Save freshly fetched text, its validators and (for homepages) its links."""
+        entry = {
+            'url': normalize_url(url),
+            'source_type': source_type,
+            'text': text,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': self._clock()
+        }
+        if links is not None:
+            entry['links'] = links
+        self._write(url, entry, max_chars)
+
+    def revalidated(self, url: str, entry: Dict[str, Any], max_chars: Optional[int] = None) -> None:
+        """Restart an entry's TTL after the origin answered 304 Not Modified."""
+        self._write(url, dict(entry, fetched_at=self._clock()), max_chars)
+
+    def _write(self, url: str, entry: Dict[str, Any], max_chars: Optional[int] = None) -> None:
+        if not self.enabled:
+            return
+        try:
+            self.s3.put_object(
+                Bucket=self.bucket,
+                Key=self._key(url, max_chars),
+                Body=json.dumps(entry).encode('utf-8'),
+                ContentType='application/json'
+            )
+        except Exception as e:
+            # The cache is an optimisation; never fail a scrape over it
+            StructuredLogger.warning(
+                "Scrape cache S3 write failed",
+                extra={'url': url, 'error_message': str(e)}
+            )
@@ -0,0 +1,154 @@
+"""
+Dependency-graph executor for multi-stage pipelines.
+
+Each stage declares the stages it depends on; stages whose inputs are all
+available run concurrently on a thread pool. When a stage fails, no further
+stages start, but siblings already running are allowed to finish and are
+reported like any other stage before the failure is raised.
+"""
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+
+class Stage:
+    """A named unit of work with declared upstream dependencies."""
+
+    def __init__(self, name: str, fn: Callable[[Dict[str, Any]], Any], deps: Iterable[str] = ()):
+        """
+        Args:
+            name: Unique stage name; its output is stored under this key
+            fn: Callable receiving the results dict of completed stages
+            deps: Names of stages that must finish before this one starts
+        """
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+
+    def __repr__(self) -> str:
+        return f"Stage({self.name!r}, deps={list(self.deps)!r})"
+
+
+class StageGraphError(Exception):
+    """Raised when a stage graph is malformed or a stage fails."""
+
+    def __init__(self, message: str, stage: Optional[str] = None):
+        super().__init__(message)
+        self.stage = stage
+
+
+def validate_graph(stages: List[Stage]) -> None:
+    """Check for duplicate names, unknown dependencies and cycles."""
+    names = [s.name for s in stages]
+    if len(names) != len(set(names)):
+        raise StageGraphError("Duplicate stage names in graph")
+
+    known = set(names)
+    for stage in stages:
+        for dep in stage.deps:
+            if dep not in known:
+                raise StageGraphError(f"Stage '{stage.name}' depends on unknown stage '{dep}'", stage=stage.name)
+
+    # Kahn's algorithm: every stage must eventually become runnable
+    done = set()
+    remaining = list(stages)
+    while remaining:
+        ready = [s for s in remaining if all(d in done for d in s.deps)]
+        if not ready:
+            raise StageGraphError(f"Cycle detected among stages: {[s.name for s in remaining]}")
+        for s in ready:
+            done.add(s.name)
+        remaining = [s for s in remaining if s.name not in done]
+
+
+def downstream_of(stages: List[Stage], names: Iterable[str]) -> Set[str]:
+    """Return the given stages plus every stage that transitively depends on them."""
+    affected = set(names)
+    changed = True
+    while changed:
+        changed = False
+        for stage in stages:
+            if stage.name not in affected and any(dep in affected for dep in stage.deps):
+                affected.add(stage.name)
+                changed = True
+    return affected
+
+
+def run_stage_graph(
+    stages: List[Stage],
+    max_workers: int = 4,
+    on_stage_start: Optional[Callable[[str], None]] = None,
+    on_stage_end: Optional[Callable[[str, Any, Optional[Exception]], None]] = None,
+    completed: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Run stages as soon as their dependencies complete.
+
+    Hooks run on the calling thread, so they can safely share clients that
+    are not thread-safe.
+
+    If a stage raises, no new stages are started. Stages already running run
+    to completion: on_stage_end receives their output (or error) as usual, so
+    a checkpointing hook keeps their work. Stages submitted but not yet
+    started are cancelled and reported to on_stage_end with a StageGraphError.
+    The failure is raised only once every submitted stage has been settled.
+
+    Args:
+        stages: Stages making up the graph
+        max_workers: Upper bound on stages running at the same time
+        on_stage_start: Called with the stage name just before it is submitted
+        on_stage_end: Called with (name, output, error) when a stage finishes,
+            fails or is abandoned after another stage failed
+        completed: Outputs of stages that already ran (e.g. loaded from a
+            checkpoint); those stages are not run again
+
+    Returns:
+        Dict mapping each stage name to its output
+
+    Raises:
+        StageGraphError: If the graph is invalid or any stage raises; `stage`
+            names the first stage that failed
+    """
+    validate_graph(stages)
+
+    results: Dict[str, Any] = dict(completed or {})
+    pending = {s.name: s for s in stages if s.name not in results}
+    running = {}
+    failed: Optional[str] = None
+    failure: Optional[Exception] = None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while running or (pending and failed is None):
+            # After a failure nothing new starts; stages already submitted are still settled below
+            for name, stage in list(pending.items()) if failed is None else []:
+                if all(dep in results for dep in stage.deps):
+                    if on_stage_start:
+                        on_stage_start(name)
+                    # Hand each stage a snapshot so concurrent stages never see a dict being mutated
+                    running[executor.submit(stage.fn, dict(results))] = name
+                    del pending[name]
+
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                if future.cancelled():
+                    error = StageGraphError(f"Stage '{name}' abandoned after '{failed}' failed", stage=name)
+                    if on_stage_end:
+                        on_stage_end(name, None, error)
+                    continue
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    if on_stage_end:
+                        on_stage_end(name, None, e)
+                    if failed is None:
+                        failed, failure = name, e
+                        # Stages queued behind the pool never start; running ones finish and are kept
+                        for other in running:
+                            other.cancel()
+                    continue
+                if on_stage_end:
+                    on_stage_end(name, results[name], None)
+
+    if failed is not None:
+        raise StageGraphError(f"Stage '{failed}' failed: {str(failure)}", stage=failed) from failure
+    return results
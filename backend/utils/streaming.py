@@ -0,0 +1,78 @@
+"""
+Helpers for publishing partial results while a completion is still streaming.
+"""
+import time
+from typing import Callable, Optional
+
+from .logger import StructuredLogger
+
+try:
+    from config import STREAM_FLUSH_INTERVAL_SECONDS, STREAM_FLUSH_MIN_CHARS
+except ImportError:
+    # Fallback for when running as standalone
+    import os
+    STREAM_FLUSH_INTERVAL_SECONDS = float(os.getenv('STREAM_FLUSH_INTERVAL_SECONDS', '2.0'))
+    STREAM_FLUSH_MIN_CHARS = int(os.getenv('STREAM_FLUSH_MIN_CHARS', '400'))
+
+
+class ProgressiveWriter:
+    """
+    Accumulates streamed text and hands snapshots to a writer, throttled so a
+    fast stream does not turn into one S3/DynamoDB write per token.
+    """
+
+    def __init__(
+        self,
+        write_fn: Callable[[str], None],
+        min_interval: float = STREAM_FLUSH_INTERVAL_SECONDS,
+        min_chars: int = STREAM_FLUSH_MIN_CHARS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            write_fn: Called with the full text accumulated so far
+            min_interval: Minimum seconds between writes
+            min_chars: Minimum new characters before a write is worthwhile
+            clock: Time source (injectable for tests)
+        """
+        self.write_fn = write_fn
+        self.min_interval = min_interval
+        self.min_chars = min_chars
+        self.clock = clock
+        self.parts = []
+        self.length = 0
+        self.flushed_length = 0
+        self.last_flush: Optional[float] = None
+        self.flush_count = 0
+
+    @property
+    def text(self) -> str:
+        return ''.join(self.parts)
+
+    def append(self, delta: str) -> bool:
+        """Add a delta; returns True if it triggered a write."""
+        self.parts.append(delta)
+        self.length += len(delta)
+
+        if self.length - self.flushed_length < self.min_chars:
+            return False
+        now = self.clock()
+        if self.last_flush is not None and now - self.last_flush < self.min_interval:
+            return False
+        self._write(now)
+        return True
+
+    def flush(self) -> None:
+        """Write whatever has not been written yet."""
+        if self.length != self.flushed_length:
+            self._write(self.clock())
+
+    def _write(self, now: float) -> None:
+        try:
+            self.write_fn(self.text)
+        except Exception as e:
+            # Progress writes are best effort; the final save still happens
+            StructuredLogger.warning("Progressive write failed", extra={'error_message': str(e)})
+        self.flushed_length = self.length
+        self.last_flush = now
+        self.flush_count += 1
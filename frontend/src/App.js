@@ -168,13 +168,8 @@ function Home() {
       },i*2000);
     });
     try {
-      const scrapeBody = { company, website: url, intervieweeName, intervieweeTitle, sector };
-      const scrapeUrl = `${API_URL}/scrape`;
-      console.log('[AXIS API] POST', scrapeUrl, scrapeBody);
-      const sr = await axios.post(scrapeUrl, scrapeBody);
-      const sd = typeof sr.data === 'string' ? JSON.parse(sr.data) : sr.data;
-      const scraped = sd.body ? JSON.parse(sd.body).scraped_content : (sd.scraped_content || `Company: ${company}`);
-      const generateBody = { company_name: company, scraped_content: scraped, tamu_notes: notes, interviewee_name: intervieweeName, interviewee_title: intervieweeTitle, sector };
+      // The pipeline scrapes server-side, so the scraped content never round-trips through the browser
+      const generateBody = { company_name: company, company_url: url, scrape: true, tamu_notes: notes, interviewee_name: intervieweeName, interviewee_title: intervieweeTitle, sector };
       const generateUrl = `${API_URL}/generate`;
       console.log('[AXIS API] POST', generateUrl, generateBody);
       const r = await axios.post(generateUrl, generateBody);
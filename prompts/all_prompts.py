@@ -4,6 +4,9 @@ Paste this entire file into lambda_pipeline/lambda_function.py
 Temperature settings are specified per prompt.
 """
 
+# Part of the Bedrock response cache key — bump whenever a prompt below changes meaning
+PROMPT_VERSION = "v3"
+
 SYNTHESIS_PROMPT = """You are a business intelligence analyst preparing a research brief 
 for a Texas A&M interviewer. You will be given raw text scraped from public sources 
 about a company.
@@ -100,9 +103,17 @@ Return ONLY the JSON. No preamble, no explanation."""
 
 # Temperature: 0.2
 
-QUESTIONS_PROMPT = """You are an expert qualitative researcher and interview coach who 
-has trained journalists, consultants, and academic researchers in evidence-based 
-interviewing.
+# ============================================================
+# SHARED CONTEXT PREFIX — Calls 3, 4, 5 and 6
+# ============================================================
+# Sent first, byte-for-byte identical across Calls 3-6, and marked as a Bedrock
+# prompt-cache checkpoint so later calls in the same run reuse it instead of
+# re-processing the full profile and Texas context. Each prompt below is the
+# stage-specific suffix that follows it.
+
+CONTEXT_PREFIX_PROMPT = """You are supporting a Texas A&M interviewer who is preparing 
+for a conversation with a company. The research gathered so far is below. The task 
+that follows refers to it as "the company profile" and "the Texas context".
 
 <company_profile>
 {{OUTPUT_FROM_CALL_1}}
@@ -110,7 +121,11 @@ interviewing.
 
 <texas_context>
 {{OUTPUT_FROM_CALL_2}}
-</texas_context>
+</texas_context>"""
+
+QUESTIONS_PROMPT = """You are an expert qualitative researcher and interview coach who 
+has trained journalists, consultants, and academic researchers in evidence-based 
+interviewing. Use the company profile and Texas context above.
 
 <interview_purpose>
 To understand the organization, their journey, their markets, challenges, opportunities, 
@@ -155,15 +170,8 @@ Return ONLY the JSON. No preamble."""
 # Temperature: 0.7
 
 GAPS_PROMPT = """You are a research quality analyst reviewing what is known and unknown 
-about a company before a high-stakes interview.
-
-<company_profile>
-{{OUTPUT_FROM_CALL_1}}
-</company_profile>
-
-<texas_context>
-{{OUTPUT_FROM_CALL_2}}
-</texas_context>
+about a company before a high-stakes interview. Review the company profile and Texas 
+context above.
 
 Identify what is MISSING, UNVERIFIABLE, or CONTRADICTORY — so the interviewer knows 
 exactly where their blind spots are.
@@ -218,10 +226,9 @@ Return ONLY the JSON. No preamble."""
 # Temperature: 0.2
 
 ASSEMBLY_PROMPT = """You are a senior research editor preparing final interview 
-documents for a Texas A&M interviewer.
+documents for a Texas A&M interviewer. Draw on the company profile and Texas context 
+above, plus the questions and knowledge gaps below.
 
-<company_profile>{{OUTPUT_FROM_CALL_1}}</company_profile>
-<texas_context>{{OUTPUT_FROM_CALL_2}}</texas_context>
 <questions>{{OUTPUT_FROM_CALL_3}}</questions>
 <knowledge_gaps>{{OUTPUT_FROM_CALL_4}}</knowledge_gaps>
 
@@ -307,9 +314,8 @@ intelligence schema for the Texas A&M business knowledge graph.
 
 This schema captures structured insights about a Texas company and will be stored
 to brief future interviewers about this sector. Flag unknown fields clearly.
+Draw on the company profile and Texas context above, plus the knowledge gaps below.
 
-<company_profile>{{OUTPUT_FROM_CALL_1}}</company_profile>
-<texas_context>{{OUTPUT_FROM_CALL_2}}</texas_context>
 <knowledge_gaps>{{OUTPUT_FROM_CALL_4}}</knowledge_gaps>
 
 Fill in as much as you can from available information.
@@ -369,3 +375,83 @@ NEVER fabricate data.
 Return ONLY the JSON. No preamble."""
 
 # Temperature: 0.2
+
+
+# ============================================================
+# EXPRESS — single-call reduced brief (mode: "express")
+# ============================================================
+# Replaces Calls 1-6 for walk-in and same-day interviews. The output keeps the
+# ===INTERVIEWEE_PACKET=== split used by Call 5 and appends a JSON block after
+# ===EXPRESS_DATA=== that fills raw_profile.json, questions.json and gaps.json.
+
+EXPRESS_PROMPT = """You are a research analyst preparing a same-day interview brief 
+for a Texas A&M interviewer who has only a few minutes to prepare. Work only from the 
+content below.
+
+<raw_content>
+{{SCRAPED_CONTENT}}
+</raw_content>
+
+<proprietary_context>
+{{TAMU_UPLOADED_NOTES}}
+</proprietary_context>
+
+Produce THREE parts separated by the delimiters shown, in this order.
+
+PART 1 — EXPRESS INTERVIEWER BRIEF
+
+# [Company Name] — Express Interview Brief
+*Prepared by AXIS Express | Texas A&M Interview Intelligence*
+
+## Company at a Glance
+[3-5 bullet points: what they do, where they are, size, market position, one recent development]
+
+## Top Knowledge Gaps
+[The 3 most important things we do not know, each with one question to fill the gap]
+
+## Interview Questions
+[5 numbered questions, opening → closing, each followed by one line on why it works]
+
+===INTERVIEWEE_PACKET===
+
+PART 2 — INTERVIEWEE PACKET
+
+[Warm, human tone. Short. Not academic.]
+Hello [Name],
+
+Thank you for agreeing to speak with us. Here is what our research found — please 
+tell us where we have it wrong:
+[3 specific, factual bullet points]
+
+Questions we'd love to explore with you:
+[5 numbered questions, warm tone, under 25 words each]
+
+[Interviewer Name]
+Texas A&M University
+
+===EXPRESS_DATA===
+
+PART 3 — JSON with exactly these fields:
+
+{
+  "profile_highlights": {
+    "company_name": "",
+    "headquarters": "",
+    "business_model": "",
+    "primary_products_services": [],
+    "recent_news": []
+  },
+  "interviewer_questions": [{"question": "", "why_this_works": ""}],
+  "interviewee_questions": [],
+  "top_gaps": [{"topic": "", "why_it_matters": "", "suggested_question_to_fill_gap": ""}]
+}
+
+Rules:
+- Only include facts you can support from the provided content; use "Unknown" otherwise
+- Never start a question with "What are your..." and never ask yes/no questions
+- Exactly 5 interviewer questions and 5 interviewee questions
+- Keep it short — this brief is read in under five minutes
+
+Return only the three parts. No preamble."""
+
+# Temperature: 0.4
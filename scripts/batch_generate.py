@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Prepare briefs for a cohort of companies against the deployed AXIS API.
+
+Each company goes through POST /scrape and an async POST /generate, then
+GET /brief/{id} is polled until the run finishes. Companies are processed on a
+bounded worker pool and every outcome is appended to a JSONL state file, so a
+rerun with the same --state picks up where the last one stopped. The
+interview id is recorded as soon as /generate accepts a job: a rerun polls
+jobs that were in flight instead of generating again, and --retry-failed
+resumes a failed run from its checkpoints (resume_interview_id).
+
+Usage:
+    python scripts/batch_generate.py companies.csv --api-url https://.../prod
+    python scripts/batch_generate.py companies.json --api-url ... --retry-failed
+
+Input is a CSV with columns company_name, company_url, tamu_notes (the last two
+optional) or a JSON list of objects with the same keys.
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+# Get project root
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.utils.batch_runner import STATUS_SUBMITTED, BatchState, run_batch  # noqa: E402
+
+# Each pipeline run keeps up to this many Bedrock calls in flight (PIPELINE_MAX_WORKERS)
+BEDROCK_CALLS_PER_PIPELINE = 2
+# Interview statuses that mean the brief exists (later ones follow the interview itself)
+READY_STATUSES = ('brief_ready', 'complete', 'interview_completed')
+
+
+def load_companies(path):
+    """Read companies from CSV or JSON"""
+    with open(path, 'r') as f:
+        if path.endswith('.json'):
+            companies = json.load(f)
+        else:
+            companies = list(csv.DictReader(f))
+    return [c for c in companies if (c.get('company_name') or '').strip()]
+
+
+def company_key(company):
+    return company['company_name'].strip().lower()
+
+
+def api_request(api_url, method, path, body=None, timeout=30):
+    """Call the AXIS API and return the decoded JSON body"""
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    req = urllib.request.Request(
+        f"{api_url.rstrip('/')}{path}",
+        data=data,
+        method=method,
+        headers={'Content-Type': 'application/json'}
+    )
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+
+def make_worker(args, state):
+    """
+    Build the per-company worker: scrape, submit async generate, poll to completion.
+
+    A company whose interview id is already in `state` is not generated again:
+    a run still in flight is polled, a failed one is resumed, and a finished
+    one is returned as is.
+    """
+    def submit(company):
+        name = company['company_name'].strip()
+        scraped = api_request(args.api_url, 'POST', '/scrape', {
+            'company_name': name,
+            'company_url': (company.get('company_url') or '').strip()
+        }, timeout=args.scrape_timeout)
+        submitted = api_request(args.api_url, 'POST', '/generate', {
+            'company_name': name,
+            'scraped_content': scraped.get('scraped_content', ''),
+            'tamu_notes': company.get('tamu_notes') or 'No proprietary notes provided.',
+            'async': True
+        })
+        return submitted['interview_id']
+
+    def existing_status(interview_id):
+        try:
+            return api_request(args.api_url, 'GET', f'/brief/{interview_id}').get('status')
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            raise
+
+    def worker(company):
+        key = company_key(company)
+        interview_id = (state.checkpoint(key) or {}).get('interview_id')
+        status = existing_status(interview_id) if interview_id else None
+        if status is None:
+            interview_id = submit(company)
+            # Recorded before polling, so a killed batch polls this job on restart instead of paying for a new one
+            state.record(key, STATUS_SUBMITTED, checkpoint={'interview_id': interview_id})
+        elif status == 'failed':
+            print(f"🔁 {key}: resuming {interview_id}")
+            api_request(args.api_url, 'POST', '/generate', {'resume_interview_id': interview_id, 'async': True})
+        else:
+            print(f"⏳ {key}: polling {interview_id} ({status})")
+
+        deadline = time.time() + args.job_timeout
+        while time.time() < deadline:
+            brief = api_request(args.api_url, 'GET', f'/brief/{interview_id}')
+            status = brief.get('status')
+            if status in READY_STATUSES:
+                return {'interview_id': interview_id, 'elapsed_seconds': brief.get('elapsed_seconds')}
+            if status == 'failed':
+                raise RuntimeError(f"Pipeline failed for {interview_id}: {brief.get('error', '')}")
+            time.sleep(args.poll_interval)
+        raise TimeoutError(f"Pipeline for {interview_id} did not finish within {args.job_timeout}s")
+
+    return worker
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate AXIS briefs for a list of companies')
+    parser.add_argument('companies', help='CSV or JSON file of companies')
+    parser.add_argument('--api-url', required=True, help='API Gateway base URL')
+    parser.add_argument('--state', default='batch_state.jsonl', help='Resumable state log (JSONL)')
+    parser.add_argument('--max-bedrock-concurrency', type=int, default=8,
+                        help='Bedrock calls allowed in flight across the batch; sets the worker count')
+    parser.add_argument('--submit-interval', type=float, default=2.0,
+                        help='Seconds between starting two companies')
+    parser.add_argument('--retry-failed', action='store_true', help='Retry companies that failed before')
+    parser.add_argument('--max-attempts', type=int, default=3)
+    parser.add_argument('--poll-interval', type=float, default=10.0)
+    parser.add_argument('--job-timeout', type=float, default=600.0)
+    parser.add_argument('--scrape-timeout', type=float, default=35.0)
+    args = parser.parse_args()
+
+    companies = load_companies(args.companies)
+    workers = max(1, args.max_bedrock_concurrency // BEDROCK_CALLS_PER_PIPELINE)
+    print(f"🔧 {len(companies)} companies, {workers} workers, state: {args.state}")
+
+    def report(record):
+        icon = '✅' if record['status'] == 'done' else '❌'
+        detail = record['result'] if record['status'] == 'done' else record['error']
+        print(f"{icon} {record['key']}: {detail}")
+
+    state = BatchState(args.state)
+    summary = run_batch(
+        companies,
+        make_worker(args, state),
+        state,
+        key_fn=company_key,
+        concurrency=workers,
+        submit_interval=args.submit_interval,
+        retry_failed=args.retry_failed,
+        max_attempts=args.max_attempts,
+        on_result=report
+    )
+
+    print(f"✅ Done: {len(summary['done'])}  ❌ Failed: {len(summary['failed'])}  "
+          f"⏭️  Skipped: {len(summary['skipped'])}")
+    sys.exit(1 if summary['failed'] else 0)
+
+
+if __name__ == '__main__':
+    main()
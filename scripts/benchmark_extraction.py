@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark HTML text extraction on the saved page corpus.
+
+Compares the scraper's previous extractor (strip script/style/nav/footer/
+head/header, keep everything else) with utils.content_extractor on every page
+in backend/tests/fixtures/extraction. Each page has a .json file listing
+phrases that should survive extraction ("useful") and phrases that should not
+("boilerplate").
+
+Reported per extractor and page:
+    ms       - mean extraction time over --repeat runs
+    chars    - output length after the --max-chars budget
+    useful   - share of useful phrases present in the output
+    leaked   - boilerplate phrases present in the output
+
+Usage:
+    python scripts/benchmark_extraction.py
+    python scripts/benchmark_extraction.py --max-chars 600 --repeat 200
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from html.parser import HTMLParser
+from pathlib import Path
+
+# Get project root
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.utils.content_extractor import extract_content  # noqa: E402
+
+CORPUS_DIR = project_root / 'backend' / 'tests' / 'fixtures' / 'extraction'
+
+
+class LegacyTextExtractor(HTMLParser):
+    """The scraper's extractor before content scoring, kept here as the baseline."""
+
+    def __init__(self):
+        super().__init__()
+        self.text = []
+        self.skip_tags = {'script', 'style', 'nav', 'footer', 'head', 'header'}
+        self.current_skip = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.skip_tags:
+            self.current_skip = True
+
+    def handle_endtag(self, tag):
+        if tag in self.skip_tags:
+            self.current_skip = False
+
+    def handle_data(self, data):
+        if not self.current_skip and data.strip():
+            self.text.append(data.strip())
+
+
+def legacy_extract(html, max_chars):
+    parser = LegacyTextExtractor()
+    parser.feed(html)
+    return re.sub(r'\s+', ' ', ' '.join(parser.text)).strip()[:max_chars]
+
+
+EXTRACTORS = {
+    'legacy': legacy_extract,
+    'content': extract_content,
+}
+
+
+def load_corpus():
+    pages = []
+    for html_path in sorted(CORPUS_DIR.glob('*.html')):
+        expected = json.loads(html_path.with_suffix('.json').read_text())
+        pages.append((html_path.stem, html_path.read_text(), expected))
+    return pages
+
+
+def measure(extract, html, expected, max_chars, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        text = extract(html, max_chars)
+    elapsed_ms = (time.perf_counter() - started) * 1000 / repeat
+    useful = sum(1 for phrase in expected['useful'] if phrase in text)
+    leaked = sum(1 for phrase in expected['boilerplate'] if phrase in text)
+    return {
+        'ms': elapsed_ms,
+        'chars': len(text),
+        'useful': useful / len(expected['useful']) if expected['useful'] else 1.0,
+        'leaked': leaked
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HTML content extraction')
+    parser.add_argument('--max-chars', type=int, default=3000, help='Output budget per page')
+    parser.add_argument('--repeat', type=int, default=50, help='Runs per page for timing')
+    args = parser.parse_args()
+
+    pages = load_corpus()
+    if not pages:
+        print(f"❌ No pages found in {CORPUS_DIR}")
+        sys.exit(1)
+
+    print(f"📄 {len(pages)} pages, budget {args.max_chars} chars, {args.repeat} runs each\n")
+    print(f"{'page':<22} {'extractor':<9} {'ms':>7} {'chars':>6} {'useful':>7} {'leaked':>6}")
+    totals = {name: {'ms': 0.0, 'useful': 0.0, 'leaked': 0} for name in EXTRACTORS}
+    for name, html, expected in pages:
+        for extractor, extract in EXTRACTORS.items():
+            result = measure(extract, html, expected, args.max_chars, args.repeat)
+            totals[extractor]['ms'] += result['ms']
+            totals[extractor]['useful'] += result['useful']
+            totals[extractor]['leaked'] += result['leaked']
+            print(f"{name:<22} {extractor:<9} {result['ms']:>7.2f} {result['chars']:>6} "
+                  f"{result['useful']:>6.0%} {result['leaked']:>6}")
+
+    print()
+    for extractor, total in totals.items():
+        print(f"{extractor:<9} total {total['ms']:.2f} ms, mean useful {total['useful'] / len(pages):.0%}, "
+              f"boilerplate leaked {total['leaked']}")
+
+
+if __name__ == '__main__':
+    main()
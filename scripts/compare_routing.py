@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Compare per-stage latency and cost of model routings on recorded pipeline runs.
+
+A recording is an interview's S3 folder copied locally, for example with
+`aws s3 sync s3://<bucket>/<interview_id> recordings/<interview_id>`. It holds
+input.json plus the stage checkpoints (raw_profile.json, texas_context.json,
+questions.json, gaps.json) and institutional_memory.json. Each stage is
+replayed on its recorded upstream outputs, so the stages are compared
+independently of each other. Every routing sends the stage's prompt to the
+stage's routed model only (no fallbacks) with its max_tokens. Prompt caching
+is off, so repeated runs are comparable.
+
+Reported per routing and stage:
+    model    - model the routing sends the stage to
+    s        - mean latency over recordings and --repeat runs
+    in/out   - mean input and output tokens
+    $        - mean cost (config BEDROCK_MODEL_PRICES)
+    failed   - calls that raised
+Followed by each routing's cost per full run and estimated run latency along
+the stage graph's critical path, and the same for an express run.
+
+Routings are `configured` (BEDROCK_STAGE_ROUTING), `strong` (every stage on
+BEDROCK_MODEL_ID) and any number of `--routing NAME=overrides`, where the
+overrides are JSON or a path to a JSON file, merged onto the configured table.
+
+Usage:
+    python scripts/compare_routing.py recordings/*
+    python scripts/compare_routing.py recordings/* --routing all-fast='{"questions": {"model": "anthropic.claude-3-5-haiku-20241022-v1:0"}}'
+    python scripts/compare_routing.py recordings/* --stages gaps schema --repeat 3 --output results.json
+    python scripts/compare_routing.py recordings/* --dry-run
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Get project root
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+# The Bedrock client imports its siblings as utils.* and config, as inside a Lambda zip
+sys.path.insert(0, str(project_root / 'backend'))
+
+from config import BEDROCK_MODEL_ID, BEDROCK_REGION  # noqa: E402
+from prompts import all_prompts as prompts  # noqa: E402
+from utils.model_routing import Route, estimate_cost, load_routing, resolve_route  # noqa: E402
+from utils.payloads import compact_stage_output, estimate_tokens  # noqa: E402
+
+# Same files as the pipeline's STAGE_ARTIFACTS / MEMORY_SNAPSHOT_FILE / PIPELINE_INPUT_FILE
+ARTIFACTS = {
+    'synthesis': 'raw_profile.json',
+    'texas': 'texas_context.json',
+    'questions': 'questions.json',
+    'gaps': 'gaps.json',
+}
+MEMORY_FILE = 'institutional_memory.json'
+INPUT_FILE = 'input.json'
+
+DEFAULT_ROUTE = Route(BEDROCK_MODEL_ID, max_tokens=4000)
+
+
+def fill(template, replacements):
+    result = template
+    for key, value in replacements.items():
+        result = result.replace(f"{{{{{key}}}}}", str(value))
+    return result
+
+
+def compact(text):
+    return compact_stage_output(text)[0]
+
+
+def shared_context(rec):
+    return fill(prompts.CONTEXT_PREFIX_PROMPT, {
+        "OUTPUT_FROM_CALL_1": compact(rec['synthesis']),
+        "OUTPUT_FROM_CALL_2": compact(rec['texas'])
+    })
+
+
+# Stage → (recorded inputs it needs, temperature, builder returning (prompt, prefix)).
+# Mirrors build_pipeline_stages / build_express_stages in lambda_pipeline.
+STAGE_CALLS = {
+    'synthesis': (['scraped_content'], 0.2, lambda rec: (fill(prompts.SYNTHESIS_PROMPT, {
+        "SCRAPED_CONTENT": rec['scraped_content'],
+        "TAMU_UPLOADED_NOTES": rec['tamu_notes']
+    }), None)),
+    'texas': (['synthesis', 'memory'], 0.2, lambda rec: (fill(prompts.TEXAS_PROMPT, {
+        "OUTPUT_FROM_CALL_1": compact(rec['synthesis']),
+        "INSTITUTIONAL_MEMORY": rec['memory']
+    }), None)),
+    'questions': (['synthesis', 'texas'], 0.7, lambda rec: (prompts.QUESTIONS_PROMPT, shared_context(rec))),
+    'gaps': (['synthesis', 'texas'], 0.2, lambda rec: (prompts.GAPS_PROMPT, shared_context(rec))),
+    'assembly': (['synthesis', 'texas', 'questions', 'gaps'], 0.4, lambda rec: (fill(prompts.ASSEMBLY_PROMPT, {
+        "OUTPUT_FROM_CALL_3": compact(rec['questions']),
+        "OUTPUT_FROM_CALL_4": compact(rec['gaps'])
+    }), shared_context(rec))),
+    'schema': (['synthesis', 'texas', 'gaps'], 0.2, lambda rec: (fill(prompts.SCHEMA_PROMPT, {
+        "OUTPUT_FROM_CALL_4": compact(rec['gaps'])
+    }), shared_context(rec))),
+    'express': (['scraped_content'], 0.4, lambda rec: (fill(prompts.EXPRESS_PROMPT, {
+        "SCRAPED_CONTENT": rec['scraped_content'],
+        "TAMU_UPLOADED_NOTES": rec['tamu_notes']
+    }), None)),
+}
+
+
+def load_recording(path):
+    """Inputs and checkpointed stage outputs of one recorded run"""
+    path = Path(path)
+    rec = {'name': path.name}
+    inputs = json.loads((path / INPUT_FILE).read_text()) if (path / INPUT_FILE).exists() else {}
+    rec['scraped_content'] = inputs.get('scraped_content')
+    rec['tamu_notes'] = inputs.get('tamu_notes', '')
+    if (path / MEMORY_FILE).exists():
+        rec['memory'] = (path / MEMORY_FILE).read_text()
+    for stage, filename in ARTIFACTS.items():
+        if (path / filename).exists():
+            rec[stage] = (path / filename).read_text()
+    return rec
+
+
+def parse_routings(specs):
+    routings = {
+        'configured': load_routing(),
+        'strong': load_routing(overrides={
+            stage: {'model': BEDROCK_MODEL_ID} for stage in STAGE_CALLS
+        }),
+    }
+    for spec in specs:
+        name, _, value = spec.partition('=')
+        if Path(value).exists():
+            value = Path(value).read_text()
+        routings[name] = load_routing(overrides=value)
+    return routings
+
+
+def critical_path(latency):
+    """Run latency along the full pipeline's stage graph from per-stage latencies"""
+    if not {'synthesis', 'texas', 'questions', 'gaps', 'assembly', 'schema'} <= latency.keys():
+        return None
+    head = latency['synthesis'] + latency['texas']
+    return head + max(
+        max(latency['questions'], latency['gaps']) + latency['assembly'],
+        latency['gaps'] + latency['schema']
+    )
+
+
+def invoke(client, build_request_body, model_id, prompt, prefix, temperature, max_tokens):
+    """One uncached call: (seconds, input tokens, output tokens)"""
+    started = time.time()
+    response = client.invoke_model(
+        modelId=model_id,
+        body=build_request_body(prompt, temperature, max_tokens, prefix, False)
+    )
+    usage = json.loads(response['body'].read()).get('usage', {})
+    return time.time() - started, usage.get('input_tokens', 0), usage.get('output_tokens', 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-stage model routings on recorded runs')
+    parser.add_argument('recordings', nargs='+', help='Local copies of interview S3 folders')
+    parser.add_argument('--routing', action='append', default=[], metavar='NAME=OVERRIDES',
+                        help='Extra routing: JSON overrides or a JSON file, merged onto the configured table')
+    parser.add_argument('--stages', nargs='+', default=list(STAGE_CALLS), choices=list(STAGE_CALLS))
+    parser.add_argument('--repeat', type=int, default=1, help='Calls per recording, stage and routing')
+    parser.add_argument('--region', default=BEDROCK_REGION)
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Estimate input tokens and worst-case cost without calling Bedrock')
+    parser.add_argument('--output', help='Write the per-stage results as JSON')
+    args = parser.parse_args()
+
+    routings = parse_routings(args.routing)
+    recordings = [load_recording(path) for path in args.recordings]
+    if not recordings:
+        print("❌ No recordings given")
+        sys.exit(1)
+
+    client = build_request_body = None
+    if not args.dry_run:
+        import boto3
+        from utils.bedrock_client import BEDROCK_CLIENT_CONFIG, build_request_body
+        client = boto3.client('bedrock-runtime', region_name=args.region, config=BEDROCK_CLIENT_CONFIG)
+
+    print(f"📼 {len(recordings)} recordings, {len(routings)} routings, {args.repeat} runs each"
+          f"{' (dry run)' if args.dry_run else ''}\n")
+    print(f"{'routing':<12} {'stage':<10} {'model':<44} {'s':>6} {'in':>6} {'out':>6} {'$':>8} {'failed':>6}")
+    results = {}
+    for name, routing in routings.items():
+        results[name] = {}
+        for stage in args.stages:
+            needs, temperature, build = STAGE_CALLS[stage]
+            route = resolve_route(stage, DEFAULT_ROUTE, routing)
+            samples, failed = [], 0
+            for rec in recordings:
+                if any(rec.get(key) is None for key in needs):
+                    continue
+                prompt, prefix = build(rec)
+                if args.dry_run:
+                    tokens = estimate_tokens(prompt + (prefix or ''))
+                    samples.append((0.0, tokens, route.max_tokens))
+                    continue
+                for _ in range(args.repeat):
+                    try:
+                        samples.append(invoke(client, build_request_body, route.model, prompt, prefix,
+                                              temperature, route.max_tokens))
+                    except Exception as e:
+                        failed += 1
+                        print(f"⚠️  {name}/{stage} on {rec['name']}: {e}")
+            if not samples:
+                continue
+            seconds = sum(s[0] for s in samples) / len(samples)
+            tokens_in = sum(s[1] for s in samples) / len(samples)
+            tokens_out = sum(s[2] for s in samples) / len(samples)
+            cost = estimate_cost(route.model, tokens_in, tokens_out)
+            results[name][stage] = {
+                'model': route.model, 'seconds': seconds, 'input_tokens': tokens_in,
+                'output_tokens': tokens_out, 'cost': cost, 'calls': len(samples), 'failed': failed
+            }
+            cost_text = f"{cost:>8.4f}" if cost is not None else f"{'?':>8}"
+            print(f"{name:<12} {stage:<10} {route.model[:44]:<44} {seconds:>6.1f} {tokens_in:>6.0f} "
+                  f"{tokens_out:>6.0f} {cost_text} {failed:>6}")
+
+    print()
+    for name, stages in results.items():
+        full = {stage: r for stage, r in stages.items() if stage != 'express'}
+        if full:
+            cost = sum(r['cost'] or 0 for r in full.values())
+            path = critical_path({stage: r['seconds'] for stage, r in full.items()})
+            path_text = f", est. run latency {path:.1f}s" if path is not None and not args.dry_run else ''
+            print(f"{name:<12} full    ${cost:.4f} per run{path_text}")
+        if 'express' in stages:
+            express = stages['express']
+            print(f"{name:<12} express ${express['cost'] or 0:.4f} per run, {express['seconds']:.1f}s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
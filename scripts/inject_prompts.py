@@ -21,8 +21,9 @@ def extract_prompts():
         content = f.read()
     
     prompts = {}
-    prompt_names = ['SYNTHESIS_PROMPT', 'TEXAS_PROMPT', 'QUESTIONS_PROMPT', 
-                   'GAPS_PROMPT', 'ASSEMBLY_PROMPT', 'SCHEMA_PROMPT']
+    prompt_names = ['SYNTHESIS_PROMPT', 'TEXAS_PROMPT', 'CONTEXT_PREFIX_PROMPT',
+                   'QUESTIONS_PROMPT', 'GAPS_PROMPT', 'ASSEMBLY_PROMPT', 'SCHEMA_PROMPT',
+                   'EXPRESS_PROMPT']
     
     for prompt_name in prompt_names:
         # Match triple-quoted strings
@@ -35,6 +36,12 @@ def extract_prompts():
     
     return prompts
 
+def extract_prompt_version():
+    """Extract PROMPT_VERSION (used in the Bedrock response cache key)"""
+    with open(prompts_file, 'r') as f:
+        match = re.search(r'^PROMPT_VERSION\s*=\s*"(.*?)"', f.read(), re.MULTILINE)
+    return match.group(1) if match else None
+
 def inject_prompts(prompts):
     """Inject prompts into lambda_function.py"""
     if not lambda_file.exists():
@@ -62,6 +69,11 @@ def inject_prompts(prompts):
             else:
                 print(f"⚠️  Warning: Could not find placeholder for {prompt_name}")
     
+    version = extract_prompt_version()
+    if version:
+        content = re.sub(r'^PROMPT_VERSION\s*=\s*".*?"', f'PROMPT_VERSION = "{version}"', content, flags=re.MULTILINE)
+        print(f"✅ Injected PROMPT_VERSION ({version})")
+    
     # Write back
     with open(lambda_file, 'w') as f:
         f.write(content)